@@ -0,0 +1,6 @@
+# cc_common/__init__.py
+"""
+Modules shared by cc-new, cc-v3 and content-concierge, kept in one place so
+they cannot drift apart. Nothing here imports from an app; the apps import
+from here and install it from their requirements (-e ../cc-common).
+"""
@@ -0,0 +1,276 @@
+# cc_common/cassette.py
+"""
+Record/replay of upstream HTTP exchanges at the httpx transport level.
+
+A cassette is one gzip'd JSONL file per upstream (e.g. cassettes/benzinga.jsonl.gz),
+one line per exchange. Requests are matched on method, URL (with credential
+query params redacted) and a hash of the body; identical requests replay their
+recordings in order and then keep returning the last one. Request headers are
+never stored, so API keys do not end up on disk.
+
+Modes: "record" calls upstream and appends every exchange; "replay" serves only
+from the cassette and raises CassetteMiss otherwise; "auto" replays when it can
+and records when it cannot. Replay timing is "none" (immediate) or "original"
+(sleeps for the recorded upstream time).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+logger = logging.getLogger("cc.cassette")
+
+MODES = ("off", "record", "replay", "auto")
+TIMINGS = ("none", "original")
+
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token", "secret"}
+_DROP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+class CassetteMiss(httpx.TransportError):
+    """Replay mode got a request that is not on the cassette."""
+
+
+def redact_url(url: httpx.URL | str) -> str:
+    parts = urlsplit(str(url))
+    query = [(k, "REDACTED" if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+def request_key(method: str, url: httpx.URL | str, body: bytes) -> str:
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8") if body else b""
+    except ValueError:
+        canonical = body
+    h = hashlib.sha256()
+    h.update(method.upper().encode("ascii"))
+    h.update(b" ")
+    h.update(redact_url(url).encode("utf-8"))
+    h.update(b"\n")
+    h.update(canonical)
+    return h.hexdigest()
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    if "b64" in entry:
+        return base64.b64decode(entry["b64"])
+    return (entry.get("text") or "").encode("utf-8")
+
+
+class Cassette:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+        logger.info("cassette=%s loaded exchanges=%d", self.path, sum(len(v) for v in self._entries.values()))
+
+    def next(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Each append is its own gzip member; gzip readers concatenate them.
+            with gzip.open(self.path, "at", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+
+class CassetteTransport(httpx.BaseTransport):
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        mode: str = "replay",
+        timing: str = "none",
+        inner: httpx.BaseTransport | None = None,
+    ) -> None:
+        if mode not in MODES or mode == "off":
+            raise ValueError(f"cassette mode must be one of record/replay/auto, got {mode!r}")
+        if timing not in TIMINGS:
+            raise ValueError(f"cassette timing must be one of {TIMINGS}, got {timing!r}")
+        self.cassette = cassette
+        self.mode = mode
+        self.timing = timing
+        self.inner = inner or httpx.HTTPTransport()
+
+    def _lookup(self, request: httpx.Request, body: bytes) -> tuple[str, Dict[str, Any] | None]:
+        """(key, recorded entry to replay or None to go upstream)."""
+        key = request_key(request.method, request.url, body)
+        if self.mode in ("replay", "auto"):
+            entry = self.cassette.next(key)
+            if entry is not None:
+                return key, entry
+            if self.mode == "replay":
+                raise CassetteMiss(
+                    f"no recording for {request.method} {redact_url(request.url)} in {self.cassette.path}",
+                    request=request,
+                )
+        return key, None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        key, entry = self._lookup(request, body)
+        if entry is not None:
+            if self.timing == "original":
+                time.sleep(entry.get("elapsed_ms", 0) / 1000.0)
+            return self._replay(entry, request)
+        return self._record(key, request, body)
+
+    def _replay(self, entry: Dict[str, Any], request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            entry["status"],
+            headers=entry.get("headers") or {},
+            content=_decode_body(entry),
+            request=request,
+        )
+
+    def _record(self, key: str, request: httpx.Request, body: bytes) -> httpx.Response:
+        start = time.perf_counter()
+        upstream = self.inner.handle_request(request)
+        try:
+            content = upstream.read()
+        finally:
+            upstream.close()
+        return self._store(key, request, body, upstream, content, time.perf_counter() - start)
+
+    def _store(
+        self,
+        key: str,
+        request: httpx.Request,
+        body: bytes,
+        upstream: httpx.Response,
+        content: bytes,
+        elapsed_s: float,
+    ) -> httpx.Response:
+        elapsed_ms = elapsed_s * 1000.0
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _DROP_RESPONSE_HEADERS}
+        self.cassette.append(
+            {
+                "key": key,
+                "method": request.method,
+                "url": redact_url(request.url),
+                "request": _encode_body(body) if body else {},
+                "status": upstream.status_code,
+                "headers": headers,
+                "elapsed_ms": round(elapsed_ms, 1),
+                **_encode_body(content),
+            }
+        )
+        return httpx.Response(upstream.status_code, headers=headers, content=content, request=request)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncCassetteTransport(CassetteTransport, httpx.AsyncBaseTransport):
+    """CassetteTransport for httpx.AsyncClient; `inner` is an async transport."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        mode: str = "replay",
+        timing: str = "none",
+        inner: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        super().__init__(cassette, mode=mode, timing=timing, inner=inner or httpx.AsyncHTTPTransport())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        key, entry = self._lookup(request, body)
+        if entry is not None:
+            if self.timing == "original":
+                await asyncio.sleep(entry.get("elapsed_ms", 0) / 1000.0)
+            return self._replay(entry, request)
+
+        start = time.perf_counter()
+        upstream = await self.inner.handle_async_request(request)
+        try:
+            content = await upstream.aread()
+        finally:
+            await upstream.aclose()
+        return self._store(key, request, body, upstream, content, time.perf_counter() - start)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def cassette_for(directory: str, name: str) -> Cassette:
+    """One Cassette object per file, shared by every client of that upstream."""
+    path = os.path.join(directory, f"{name}.jsonl.gz")
+    with _cassettes_lock:
+        c = _cassettes.get(path)
+        if c is None:
+            c = _cassettes[path] = Cassette(path)
+        return c
+
+
+def wrap_transport(
+    name: str,
+    inner: httpx.BaseTransport,
+    *,
+    mode: str,
+    directory: str,
+    timing: str = "none",
+) -> httpx.BaseTransport:
+    """`inner` unchanged when mode is "off", else a cassette transport around it."""
+    if mode == "off":
+        return inner
+    logger.info("cassette upstream=%s mode=%s timing=%s dir=%s", name, mode, timing, directory)
+    return CassetteTransport(cassette_for(directory, name), mode=mode, timing=timing, inner=inner)
+
+
+def wrap_async_transport(
+    name: str,
+    inner: httpx.AsyncBaseTransport,
+    *,
+    mode: str,
+    directory: str,
+    timing: str = "none",
+) -> httpx.AsyncBaseTransport:
+    """Async counterpart of wrap_transport; shares the upstream's cassette file."""
+    if mode == "off":
+        return inner
+    logger.info("cassette upstream=%s mode=%s timing=%s dir=%s async=True", name, mode, timing, directory)
+    return AsyncCassetteTransport(cassette_for(directory, name), mode=mode, timing=timing, inner=inner)
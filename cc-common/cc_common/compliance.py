@@ -0,0 +1,261 @@
+# cc_common/compliance.py
+"""
+Single-pass compliance phrase scanning.
+
+Every rule of a policy is compiled into one alternation wrapped in a
+lookahead, so a text is walked once no matter how many rules or rule sets
+there are. Where the combined pattern fires, the remaining rules are checked
+at that offset only, so overlapping hits ("buy" inside "should buy") are all
+reported. When every rule starts with a known set of characters (and/or a
+word boundary) that prefix is hoisted in front of the lookahead, which lets
+the regex engine skip most offsets without trying any rule.
+
+A policy file, when configured, is plain JSON and is re-read whenever its
+mtime changes:
+
+    {
+      "ignore_case": true,
+      "rule_sets": {
+        "non_advisory": [{"id": "trade_verbs", "pattern": "\\\\b(buy|sell)\\\\b"}]
+      }
+    }
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence
+
+logger = logging.getLogger("cc.compliance")
+
+
+DEFAULT_POLICY: Dict[str, Any] = {
+    "ignore_case": True,
+    "rule_sets": {
+        "non_advisory": [
+            {"id": "trade_verbs", "pattern": r"\b(buy|sell|short|long)\b"},
+            {"id": "allocation", "pattern": r"\b(allocate|reallocate|rebalance|shift\s+\d+%|move\s+\d+%)\b"},
+            {"id": "directive", "pattern": r"\b(you should|we recommend|do this now|must)\b"},
+        ],
+        "prescriptive": [
+            {"id": "should_buy", "pattern": r"\bshould buy\b"},
+            {"id": "should_sell", "pattern": r"\bshould sell\b"},
+            {"id": "buy_now", "pattern": r"\bbuy now\b"},
+            {"id": "sell_now", "pattern": r"\bsell now\b"},
+            {"id": "recommend", "pattern": r"\brecommend\b"},
+            {"id": "you_should", "pattern": r"\byou should\b"},
+            {"id": "strong_buy", "pattern": r"\bstrong buy\b"},
+            {"id": "strong_sell", "pattern": r"\bstrong sell\b"},
+            {"id": "target_price", "pattern": r"\btarget price\b"},
+        ],
+    },
+}
+
+
+@dataclass(frozen=True)
+class ComplianceRule:
+    rule_set: str
+    id: str
+    pattern: str
+    regex: re.Pattern
+
+
+@dataclass(frozen=True)
+class ComplianceHit:
+    rule_set: str
+    rule_id: str
+    pattern: str
+    start: int
+    end: int
+    match: str
+
+
+def _leading(pattern: str) -> tuple[bool, frozenset[str] | None]:
+    """
+    (starts with \\b, possible first characters) for a rule, or None for the
+    characters when they cannot be determined. Only used to build a prefilter,
+    so giving up is always safe.
+    """
+    try:
+        from re import _constants as c, _parser
+    except ImportError:  # pragma: no cover - layout of the stdlib regex internals
+        return False, None
+
+    def first(items: Any) -> frozenset[str] | None:
+        for op, av in items:
+            if op is c.AT:
+                continue
+            if op is c.LITERAL:
+                return frozenset(chr(av))
+            if op is c.IN:
+                chars: set[str] = set()
+                for iop, iav in av:
+                    if iop is c.LITERAL:
+                        chars.add(chr(iav))
+                    elif iop is c.RANGE and iav[1] - iav[0] < 64:
+                        chars.update(chr(x) for x in range(iav[0], iav[1] + 1))
+                    else:
+                        return None
+                return frozenset(chars)
+            if op is c.SUBPATTERN:
+                return first(av[-1])
+            if op is c.BRANCH:
+                alts = [first(alt) for alt in av[1]]
+                return None if any(a is None for a in alts) else frozenset().union(*alts)
+            return None
+        return None
+
+    try:
+        parsed = list(_parser.parse(pattern))
+    except Exception:
+        return False, None
+    boundary = bool(parsed) and parsed[0] == (c.AT, c.AT_BOUNDARY)
+    return boundary, first(parsed)
+
+
+def _prefix(rules: Sequence[ComplianceRule]) -> str:
+    leads = [_leading(r.pattern) for r in rules]
+    prefix = ""
+    if all(chars for _, chars in leads):
+        chars = frozenset().union(*(chars for _, chars in leads))
+        prefix += "(?=[" + "".join(re.escape(ch) for ch in sorted(chars)) + "])"
+    if all(boundary for boundary, _ in leads):
+        prefix += r"\b"
+    return prefix
+
+
+class CompiledPolicy:
+    def __init__(self, rules: Sequence[ComplianceRule], flags: int) -> None:
+        self.rules = list(rules)
+        self.rule_sets = {r.rule_set for r in self.rules}
+        body = "|".join(f"(?P<r{i}>{r.pattern})" for i, r in enumerate(self.rules))
+        # An empty policy compiles to a pattern that never matches.
+        self._combined = re.compile(f"{_prefix(self.rules)}(?=(?:{body}))" if body else r"(?!)", flags)
+
+    @classmethod
+    def from_dict(cls, doc: Dict[str, Any]) -> "CompiledPolicy":
+        flags = re.IGNORECASE if doc.get("ignore_case", True) else 0
+        rules: List[ComplianceRule] = []
+        for rule_set, entries in (doc.get("rule_sets") or {}).items():
+            for n, entry in enumerate(entries):
+                pattern = entry["pattern"]
+                regex = re.compile(pattern, flags)
+                # Rules are spliced into one pattern: their own group names and
+                # numeric backreferences would no longer mean the same thing.
+                if regex.groupindex or re.search(r"\\[1-9]|\(\?P=", pattern):
+                    raise ValueError(f"rule {rule_set}[{n}] must not use named groups or backreferences")
+                rules.append(ComplianceRule(rule_set, entry.get("id") or f"{rule_set}_{n}", pattern, regex))
+        return cls(rules, flags)
+
+    def _candidates(self, text: str, rule_sets: Iterable[str] | None) -> Iterable[tuple[int, ComplianceRule, re.Match]]:
+        wanted = None if rule_sets is None else set(rule_sets)
+        for m in self._combined.finditer(text):
+            pos = m.start()
+            first = int(m.lastgroup[1:])
+            for i in range(first, len(self.rules)):
+                rule = self.rules[i]
+                if wanted is not None and rule.rule_set not in wanted:
+                    continue
+                hit = rule.regex.match(text, pos)
+                if hit is not None:
+                    yield i, rule, hit
+
+    def scan(self, text: str, rule_sets: Iterable[str] | None = None) -> List[ComplianceHit]:
+        """Every hit in `text`, ordered by offset then rule order."""
+        if not text:
+            return []
+        return [
+            ComplianceHit(rule.rule_set, rule.id, rule.pattern, hit.start(), hit.end(), hit.group(0))
+            for _, rule, hit in self._candidates(text, rule_sets)
+        ]
+
+    def matched_rules(self, text: str, rule_sets: Iterable[str] | None = None) -> List[ComplianceRule]:
+        """Distinct rules with at least one hit in `text`, in policy order."""
+        if not text:
+            return []
+        seen = {i for i, _, _ in self._candidates(text, rule_sets)}
+        return [self.rules[i] for i in sorted(seen)]
+
+    def has_hit(self, text: str, rule_sets: Iterable[str] | None = None) -> bool:
+        if not text:
+            return False
+        return next(iter(self._candidates(text, rule_sets)), None) is not None
+
+
+def load_policy_file(path: str) -> CompiledPolicy:
+    with open(path, encoding="utf-8") as fh:
+        return CompiledPolicy.from_dict(json.load(fh))
+
+
+class ComplianceScanner:
+    """
+    Scans with the policy file at `path`, falling back to DEFAULT_POLICY when no
+    file is configured or it cannot be read. The file's mtime is checked at most
+    every `check_interval_s`; a file that fails to parse is logged and the last
+    good policy stays in effect.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        default_policy: Dict[str, Any] | None = None,
+        check_interval_s: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.check_interval_s = check_interval_s
+        self._policy = CompiledPolicy.from_dict(default_policy or DEFAULT_POLICY)
+        self._mtime_ns: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def policy(self) -> CompiledPolicy:
+        if self.path and time.monotonic() - self._checked_at >= self.check_interval_s:
+            self.reload()
+        return self._policy
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-reads the policy file if it changed; returns True when a new policy was loaded."""
+        if not self.path:
+            return False
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._mtime_ns is None:
+                    logger.warning("compliance policy %s not found; using built-in policy", self.path)
+                    self._mtime_ns = -1
+                return False
+            if mtime_ns == self._mtime_ns and not force:
+                return False
+            self._mtime_ns = mtime_ns
+            try:
+                policy = load_policy_file(self.path)
+            except (OSError, ValueError, KeyError, re.error) as e:
+                logger.error("compliance policy %s rejected, keeping previous: %s", self.path, e)
+                return False
+            self._policy = policy
+            logger.info("compliance policy loaded path=%s rules=%d", self.path, len(policy.rules))
+            return True
+
+    def scan(self, text: str, rule_sets: Iterable[str] | None = None) -> List[ComplianceHit]:
+        return self.policy.scan(text, rule_sets)
+
+    def scan_many(self, texts: Iterable[str], rule_sets: Iterable[str] | None = None) -> List[List[ComplianceHit]]:
+        policy = self.policy
+        sets = None if rule_sets is None else tuple(rule_sets)
+        return [policy.scan(t, sets) for t in texts]
+
+    def matched_rules(self, text: str, rule_sets: Iterable[str] | None = None) -> List[ComplianceRule]:
+        return self.policy.matched_rules(text, rule_sets)
+
+    def has_hit(self, text: str, rule_sets: Iterable[str] | None = None) -> bool:
+        return self.policy.has_hit(text, rule_sets)
@@ -0,0 +1,143 @@
+# cc_common/ticker_catalog.py
+"""
+Curated ticker catalog: a pipe-delimited file of `SYMBOL|Name|change|note`
+lines, parsed once and re-read when its mtime changes.
+
+Each load also pre-renders the suggestion for every inactivity-month bucket
+(None, 1..max_months) with the caller's `render`, so serving a dormant account
+is a dict lookup rather than file I/O and string building. Months past that
+range are rendered per call; a snapshot is never modified once built.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger("cc.ticker_catalog")
+
+T = TypeVar("T")
+
+DEFAULT_NOTE = "strong recent momentum"
+
+
+@dataclass(frozen=True)
+class TickerEntry:
+    symbol: str
+    name: str
+    change: str = ""
+    note: str = DEFAULT_NOTE
+
+
+def parse_catalog(lines: Iterable[str]) -> List[TickerEntry]:
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        parts = [p.strip() for p in line.split("|")]
+        symbol = parts[0].upper()
+        entries.append(
+            TickerEntry(
+                symbol=symbol,
+                name=parts[1] if len(parts) > 1 and parts[1] else symbol,
+                change=parts[2] if len(parts) > 2 else "",
+                note=parts[3] if len(parts) > 3 else DEFAULT_NOTE,
+            )
+        )
+    return entries
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot(Generic[T]):
+    """One parsed version of the file; `available` is False when it is missing."""
+
+    available: bool
+    entries: Tuple[TickerEntry, ...]
+    top: Tuple[TickerEntry, ...]
+    render: Callable[[Tuple[TickerEntry, ...], Optional[int]], T]
+    rendered: Dict[Optional[int], T] = field(default_factory=dict)
+
+    def suggestion(self, months: Optional[int]) -> Optional[T]:
+        """Pre-rendered suggestion for `months` inactive (None = unknown); None without candidates."""
+        if not self.top:
+            return None
+        hit = self.rendered.get(months)
+        if hit is None:
+            # Past the pre-rendered buckets; rare enough to build on demand.
+            # Not cached: the snapshot is shared across threads, and caching
+            # every month value would let `rendered` grow without bound.
+            hit = self.render(self.top, months)
+        return hit
+
+
+class TickerCatalog(Generic[T]):
+    """
+    Serves the catalog at `path`. The mtime is checked at most every
+    `check_interval_s`; a file that fails to read keeps the last good snapshot.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        render: Callable[[Tuple[TickerEntry, ...], Optional[int]], T],
+        *,
+        top_n: int = 3,
+        max_months: int = 120,
+        check_interval_s: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.render = render
+        self.top_n = top_n
+        self.max_months = max_months
+        self.check_interval_s = check_interval_s
+        self._snapshot: CatalogSnapshot[T] = CatalogSnapshot(False, (), (), render)
+        self._mtime_ns: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot[T]:
+        if time.monotonic() - self._checked_at >= self.check_interval_s:
+            self.reload()
+        return self._snapshot
+
+    def suggestion(self, months: Optional[int]) -> Optional[T]:
+        return self.snapshot.suggestion(months)
+
+    def _build(self, entries: List[TickerEntry]) -> CatalogSnapshot[T]:
+        top = tuple(entries[: self.top_n])
+        rendered: Dict[Optional[int], T] = {}
+        if top:
+            for months in (None, *range(1, self.max_months + 1)):
+                rendered[months] = self.render(top, months)
+        return CatalogSnapshot(True, tuple(entries), top, self.render, rendered)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-reads the file if it changed; returns True when a new snapshot was built."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._mtime_ns != -1:
+                    logger.warning("ticker catalog %s not found", self.path)
+                    self._mtime_ns = -1
+                    self._snapshot = CatalogSnapshot(False, (), (), self.render)
+                return False
+            if mtime_ns == self._mtime_ns and not force:
+                return False
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    entries = parse_catalog(fh)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error("ticker catalog %s unreadable, keeping previous: %s", self.path, e)
+                return False
+            self._mtime_ns = mtime_ns
+            self._snapshot = self._build(entries)
+            logger.info("ticker catalog loaded path=%s entries=%d", self.path, len(entries))
+            return True
@@ -0,0 +1,42 @@
+import gzip
+
+import httpx
+import pytest
+
+from cc_common.cassette import Cassette, CassetteMiss, CassetteTransport
+
+
+def _upstream(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200, json={"n": len(calls)})
+
+    return httpx.MockTransport(handler)
+
+
+def test_record_then_replay_in_order_without_secrets(tmp_path):
+    path = str(tmp_path / "benzinga.jsonl.gz")
+    calls = []
+    recorder = httpx.Client(transport=CassetteTransport(Cassette(path), mode="record", inner=_upstream(calls)))
+    for _ in range(2):
+        recorder.get("https://api.example.com/insights", params={"symbols": "AAPL", "token": "secret"})
+
+    assert "secret" not in gzip.open(path, "rt").read()
+
+    replayer = httpx.Client(transport=CassetteTransport(Cassette(path), mode="replay", inner=_upstream(calls)))
+    got = [
+        replayer.get("https://api.example.com/insights", params={"token": "other", "symbols": "AAPL"}).json()["n"]
+        for _ in range(3)
+    ]
+
+    assert got == [1, 2, 2]
+    assert len(calls) == 2
+
+
+def test_replay_miss_raises(tmp_path):
+    client = httpx.Client(
+        transport=CassetteTransport(Cassette(str(tmp_path / "x.jsonl.gz")), mode="replay", inner=_upstream([]))
+    )
+
+    with pytest.raises(CassetteMiss):
+        client.get("https://api.example.com/unknown")
@@ -0,0 +1,48 @@
+import json
+import os
+
+from cc_common.compliance import CompiledPolicy, ComplianceScanner, DEFAULT_POLICY
+
+
+def test_scan_reports_overlapping_hits_with_offsets():
+    policy = CompiledPolicy.from_dict(DEFAULT_POLICY)
+
+    hits = policy.scan("You should buy AAPL.")
+
+    assert [(h.rule_set, h.rule_id, h.start, h.end) for h in hits] == [
+        ("non_advisory", "directive", 0, 10),
+        ("prescriptive", "you_should", 0, 10),
+        ("prescriptive", "should_buy", 4, 14),
+        ("non_advisory", "trade_verbs", 11, 14),
+    ]
+    assert [h.rule_id for h in policy.scan("You should buy AAPL.", ["prescriptive"])] == [
+        "you_should",
+        "should_buy",
+    ]
+
+
+def test_matches_separate_pattern_passes():
+    policy = CompiledPolicy.from_dict(DEFAULT_POLICY)
+    text = "Analysts set a target price; some may rebalance or move 5% but nobody must sell now."
+
+    expected = [r for r in policy.rules if r.regex.search(text)]
+
+    assert policy.matched_rules(text) == expected
+
+
+def test_policy_file_is_reloaded_on_change(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"rule_sets": {"prescriptive": [{"id": "hodl", "pattern": r"\bhodl\b"}]}}))
+    scanner = ComplianceScanner(str(path), check_interval_s=0)
+
+    assert scanner.has_hit("just HODL it")
+    assert not scanner.has_hit("you should buy")
+
+    path.write_text("{not json")
+    os.utime(path, ns=(1, 1))
+    assert scanner.has_hit("just HODL it")  # bad file keeps the last good policy
+
+    path.write_text(json.dumps({"rule_sets": {"prescriptive": [{"pattern": r"\bmoon\b"}]}}))
+    os.utime(path, ns=(2, 2))
+    assert scanner.has_hit("to the moon")
+    assert not scanner.has_hit("just HODL it")
@@ -0,0 +1,48 @@
+import os
+
+from cc_common.ticker_catalog import DEFAULT_NOTE, TickerCatalog, TickerEntry, parse_catalog
+
+
+def _render(top, months):
+    return f"{months}:" + ",".join(e.symbol for e in top)
+
+
+def test_parse_fills_defaults_and_skips_blank_lines():
+    assert parse_catalog(["nvda|NVIDIA|+4%|AI demand", "", "spy"]) == [
+        TickerEntry("NVDA", "NVIDIA", "+4%", "AI demand"),
+        TickerEntry("SPY", "SPY", "", DEFAULT_NOTE),
+    ]
+
+
+def test_suggestions_are_prerendered_and_reloaded_on_mtime_change(tmp_path):
+    path = tmp_path / "tickers.txt"
+    path.write_text("AAA|A\nBBB|B\nCCC|C\nDDD|D\n")
+    calls = []
+    catalog = TickerCatalog(str(path), lambda top, m: calls.append(m) or _render(top, m), check_interval_s=0)
+
+    assert catalog.suggestion(3) == "3:AAA,BBB,CCC"
+    rendered = len(calls)
+    assert catalog.suggestion(7) == "7:AAA,BBB,CCC"
+    assert len(calls) == rendered  # served from the pre-rendered buckets
+
+    path.write_text("ZZZ|Z\n")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert catalog.suggestion(3) == "3:ZZZ"
+
+
+def test_missing_file_serves_nothing(tmp_path):
+    catalog = TickerCatalog(str(tmp_path / "missing.txt"), _render, check_interval_s=0)
+    assert not catalog.snapshot.available
+    assert catalog.suggestion(None) is None
+
+
+def test_months_past_the_prerendered_buckets_are_not_cached(tmp_path):
+    path = tmp_path / "tickers.txt"
+    path.write_text("AAA|A\n")
+    catalog = TickerCatalog(str(path), _render, max_months=2, check_interval_s=0)
+    rendered = dict(catalog.snapshot.rendered)
+
+    assert catalog.suggestion(2) == "2:AAA"
+    assert catalog.suggestion(500) == "500:AAA"
+    assert catalog.snapshot.rendered == rendered
@@ -1,14 +1,26 @@
 #app.api.routes.py
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from typing import Iterator
 
-from app.api.schemas import GenerateInsightsRequest, GenerateInsightsResponse, ErrorResponse
-from app.engine.generator import generate_insights
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.schemas import Audit, GenerateInsightsRequest, GenerateInsightsResponse, ErrorResponse
+from app.core.metrics import render_latest
+from app.engine.generator import agenerate_insights, generate_insights_stream
 import logging
 logger = logging.getLogger("cc.api")
 
 router = APIRouter(prefix="/v1/insights", tags=["insights"])
+ops_router = APIRouter(tags=["ops"])
+
+
+@ops_router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape endpoint (stage and request latency histograms)."""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
 
 
 @router.post(
@@ -16,9 +28,9 @@ router = APIRouter(prefix="/v1/insights", tags=["insights"])
     response_model=GenerateInsightsResponse,
     responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
-def generate(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
+async def generate(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
     try:
-        return generate_insights(req)
+        return await agenerate_insights(req)
     except ValueError as e:
         logger.exception("bad_request in /generate")
         raise HTTPException(status_code=400, detail={"error": "bad_request", "details": str(e)})
@@ -26,3 +38,50 @@ def generate(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
         logger.exception("internal_error in /generate")
         raise HTTPException(status_code=500, detail={"error": "internal_error", "details": str(e)})
 
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+def generate_stream(req: GenerateInsightsRequest) -> StreamingResponse:
+    """
+    Server-sent events: one `insight` event per Insight as soon as it passes
+    safety and the judge, then a final `audit` event. Failures after the
+    stream has started are reported as an `error` event.
+    """
+    try:
+        events = generate_insights_stream(req)
+    except ValueError as e:
+        logger.exception("bad_request in /generate/stream")
+        raise HTTPException(status_code=400, detail={"error": "bad_request", "details": str(e)})
+    except Exception as e:
+        logger.exception("internal_error in /generate/stream")
+        raise HTTPException(status_code=500, detail={"error": "internal_error", "details": str(e)})
+
+    def _body() -> Iterator[str]:
+        try:
+            for ev in events:
+                name = "audit" if isinstance(ev, Audit) else "insight"
+                yield _sse(name, ev.model_dump_json())
+        except Exception as e:
+            logger.exception("stream_error in /generate/stream")
+            err = ErrorResponse(
+                error="bad_request" if isinstance(e, ValueError) else "internal_error",
+                details=str(e),
+            )
+            yield _sse("error", err.model_dump_json())
+
+    return StreamingResponse(
+        _body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
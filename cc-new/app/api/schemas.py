@@ -100,6 +100,8 @@ class Audit(BaseModel):
     model: str
     providers_used: list[str]
     trace_id: str
+    # Stage wall times for this request, e.g. {"normalize": 0.4, "provider_fetch.benzinga": 212.0}
+    timings_ms: dict[str, float] = Field(default_factory=dict)
 
 
 class GenerateInsightsResponse(BaseModel):
@@ -0,0 +1,354 @@
+# app/core/cache.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+logger = logging.getLogger("cc.cache")
+
+# Longest a shared-tier hit is kept in the local LRU; never past the shared expiry.
+LOCAL_COPY_TTL_S = 60.0
+
+
+class CacheBackend(Protocol):
+    """Key/value store with per-entry TTL. Values must be JSON-serializable."""
+
+    def get(self, key: str) -> Optional[Any]: ...
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, seconds left or None for no expiry), or None on a miss."""
+        ...
+    def set(self, key: str, value: Any, ttl_s: float) -> None: ...
+    def delete(self, key: str) -> None: ...
+
+
+class LRUCache:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires_at, value = hit
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Shared backend on Redis (or any Redis-protocol stand-in). Requires the
+    optional `redis` package; values are stored as JSON.
+    """
+
+    def __init__(self, url: str, prefix: str = "cc:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("redis package is required for a redis:// cache backend") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self.prefix + key)
+        pipe.pttl(self.prefix + key)
+        raw, pttl = pipe.execute()
+        if raw is None:
+            return None
+        return json.loads(raw), (pttl / 1000 if pttl >= 0 else None)
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl_s * 1000)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def try_lock(self, key: str, ttl_s: float) -> bool:
+        return bool(self.client.set(self.prefix + "lock:" + key, b"1", nx=True, px=int(ttl_s * 1000)))
+
+    def unlock(self, key: str) -> None:
+        self.client.delete(self.prefix + "lock:" + key)
+
+
+class SqliteCache:
+    """Persistent single-host backend (sqlite:///path/to/file.db); values stored as JSON."""
+
+    def __init__(self, path: str) -> None:
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self.get_with_ttl(key)
+        return None if hit is None else hit[0]
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        left = row[1] - time.time()
+        if left <= 0:
+            self.delete(key)
+            return None
+        return json.loads(row[0]), left
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl_s),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+
+def build_cache_backend(url: str | None) -> Optional[CacheBackend]:
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    if url.startswith("sqlite:///"):
+        return SqliteCache(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional shared backend.
+
+    get_or_compute() collapses concurrent misses for the same key into one
+    compute call (in-process single-flight); with a Redis backend, other
+    processes wait briefly on a short lock instead of all hitting upstream.
+    aget_or_compute() is the same for coroutines on one event loop, including
+    the Redis lock; the shared backend is reached on a worker thread so it
+    never blocks the loop. If the
+    leading coroutine is cancelled (e.g. its client went away), its waiters are
+    not: the first of them takes over the compute and the rest wait on it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int = 1024,
+        shared: Optional[CacheBackend] = None,
+        lock_ttl_s: float = 10.0,
+    ) -> None:
+        self.name = name
+        self.local = LRUCache(max_entries)
+        self.shared = shared
+        self.lock_ttl_s = lock_ttl_s
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._ainflight: Dict[str, asyncio.Future] = {}
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        k = self._key(key)
+        value = self.local.get(k)
+        if value is not None or self.shared is None:
+            return value
+        try:
+            hit = self.shared.get_with_ttl(k)
+        except Exception:
+            logger.exception("cache=%s shared get failed key=%s", self.name, key)
+            return None
+        if hit is None:
+            return None
+        value, ttl_left = hit
+        # The shared entry carries the real expiry; keep the local copy short
+        # and never let it outlive the shared one.
+        ttl_s = LOCAL_COPY_TTL_S if ttl_left is None else min(LOCAL_COPY_TTL_S, ttl_left)
+        self.local.set(k, value, ttl_s)
+        return value
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        k = self._key(key)
+        self.local.set(k, value, ttl_s)
+        if self.shared is not None:
+            try:
+                self.shared.set(k, value, ttl_s)
+            except Exception:
+                logger.exception("cache=%s shared set failed key=%s", self.name, key)
+
+    def delete(self, key: str) -> None:
+        k = self._key(key)
+        self.local.delete(k)
+        if self.shared is not None:
+            self.shared.delete(k)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl_s: float | Callable[[], float],
+        *,
+        cache_if: Callable[[Any], bool] = lambda v: v is not None,
+    ) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+
+        if not leader:
+            return fut.result()
+
+        try:
+            value = self._compute_shared(key, compute)
+            if cache_if(value):
+                self.set(key, value, ttl_s() if callable(ttl_s) else ttl_s)
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        if self.shared is None:
+            return self.local.get(self._key(key))
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl_s: float) -> None:
+        if self.shared is None:
+            self.local.set(self._key(key), value, ttl_s)
+        else:
+            await asyncio.to_thread(self.set, key, value, ttl_s)
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_s: float | Callable[[], float],
+        *,
+        cache_if: Callable[[Any], bool] = lambda v: v is not None,
+    ) -> Any:
+        value = await self.aget(key)
+        if value is not None:
+            return value
+
+        loop = asyncio.get_running_loop()
+        while True:
+            fut = self._ainflight.get(key)
+            if fut is None or fut.get_loop() is not loop:
+                break
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                # Our own cancellation propagates; the leader's sends us round again.
+                if not fut.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        fut = loop.create_future()
+        self._ainflight[key] = fut
+        try:
+            value = await self._acompute_shared(key, compute)
+            if cache_if(value):
+                await self.aset(key, value, ttl_s() if callable(ttl_s) else ttl_s)
+            fut.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        finally:
+            if self._ainflight.get(key) is fut:
+                del self._ainflight[key]
+
+    def _compute_shared(self, key: str, compute: Callable[[], Any]) -> Any:
+        shared = self.shared
+        if not isinstance(shared, RedisCache):
+            return compute()
+
+        k = self._key(key)
+        if shared.try_lock(k, self.lock_ttl_s):
+            try:
+                return compute()
+            finally:
+                shared.unlock(k)
+
+        # Another process is fetching this key; give it a moment before
+        # falling back to our own call.
+        deadline = time.monotonic() + self.lock_ttl_s
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = shared.get(k)
+            if value is not None:
+                return value
+        return compute()
+
+    async def _acompute_shared(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """_compute_shared for coroutines: same Redis lock, waits off the event loop."""
+        shared = self.shared
+        if not isinstance(shared, RedisCache):
+            return await compute()
+
+        k = self._key(key)
+        if await asyncio.to_thread(shared.try_lock, k, self.lock_ttl_s):
+            try:
+                return await compute()
+            finally:
+                await asyncio.to_thread(shared.unlock, k)
+
+        deadline = time.monotonic() + self.lock_ttl_s
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            value = await asyncio.to_thread(shared.get, k)
+            if value is not None:
+                return value
+        return await compute()
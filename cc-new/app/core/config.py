@@ -14,6 +14,19 @@ class Settings(BaseSettings):
     # LLM toggle
     llm_provider: str = "openai"  # anthropic | openai | bedrock
 
+    # Hedging: when set, realize/judge calls to llm_provider that are still
+    # pending after the hedge delay are duplicated to this provider and the
+    # first valid answer wins. The delay is the given percentile of the
+    # primary's recent latencies (last llm_latency_window calls), clamped to
+    # [min, max]; llm_hedge_initial_delay_s applies until min_samples exist.
+    llm_hedge_provider: str | None = None
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_delay_s: float = 0.5
+    llm_hedge_max_delay_s: float = 8.0
+    llm_hedge_initial_delay_s: float = 3.0
+    llm_hedge_min_samples: int = 20
+    llm_latency_window: int = 512
+
     # Keys
     anthropic_api_key: str | None = None
     openai_api_key: str | None = None
@@ -21,8 +34,32 @@ class Settings(BaseSettings):
     # Market data providers
     benzinga_api_key: str | None = None
     benzinga_analyst_base_url: str = "https://api.benzinga.com/api/v1/analyst/insights"
+    # Per-symbol analyst insight cache; misses are batched into few upstream calls
+    benzinga_cache_ttl_s: int = 900
+    benzinga_cache_max_entries: int = 4096
+    benzinga_symbols_per_call: int = 50
+    benzinga_page_size: int = 500
+    benzinga_items_per_symbol: int = 10
 
     alphavantage_api_key: str | None = None
+    alphavantage_cache_max_entries: int = 2048
+    # Minutes after the 16:00 ET close before a new daily bar is expected
+    alphavantage_bar_delay_min: int = 30
+
+    # Optional shared cache (e.g. redis://localhost:6379/0); in-process only when unset
+    cache_backend_url: str | None = None
+
+    # Shared HTTP clients (app lifetime, keep-alive)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_s: float = 30.0
+    http2_enabled: bool = True
+
+    # Record/replay of upstream HTTP (off | record | replay | auto); replay timing
+    # "none" returns immediately, "original" sleeps for the recorded latency.
+    cassette_mode: str = "off"
+    cassette_dir: str = "cassettes"
+    cassette_timing: str = "none"
 
     # Bedrock
     aws_region: str | None = None
@@ -30,15 +67,111 @@ class Settings(BaseSettings):
     
     insights_count: int = 3 
 
+    # Realization cache: identical facts/audience/style/model reuse one LLM output.
+    # realize_cache_url adds a persistent tier (sqlite:///path or redis://...).
+    realize_cache_enabled: bool = True
+    realize_cache_ttl_s: int = 86400
+    realize_cache_max_entries: int = 4096
+    realize_cache_url: str | None = None
+
+    # Judge: "batch" scores all of a request's insights in one call, "per_insight"
+    # makes one call each. PASS verdicts are cached by normalized text.
+    judge_mode: str = "batch"
+    verdict_cache_ttl_s: int = 86400
+    verdict_cache_max_entries: int = 8192
+
+    # Offline precompute: results stored per customer/placement/trigger/focus and
+    # served online while the payload hash matches and the entry is still valid.
+    precompute_enabled: bool = True
+    precompute_placements: str = "INVESTMENT_DASHBOARD"
+    precompute_validity_s: int = 6 * 3600
+    precompute_store_url: str | None = None  # sqlite:///path or redis://...
+    precompute_workers: int = 8
+
+    @property
+    def precompute_placements_list(self) -> list[str]:
+        return [p.strip() for p in self.precompute_placements.split(",") if p.strip()]
+
+    # Fact compaction before realize: per-bundle token budget for the facts,
+    # per-fact cap, and word-overlap above which same-number facts are merged.
+    fact_compaction_enabled: bool = True
+    fact_token_budget: int = 400
+    fact_max_tokens: int = 80
+    fact_dedup_threshold: float = 0.85
+
+    # Bundle realization: max bundles realized/judged at once per request
+    llm_max_concurrency: int = 3
+    llm_max_workers: int = 32
+
+    # Prompt-prefix caching: the fixed instructions go out as a cacheable
+    # system prefix (Anthropic/Bedrock cache_control, OpenAI prompt_cache_key).
+    llm_prompt_cache_enabled: bool = True
+
+    # Streamed realize: each field is checked (repeat headline, compliance) as
+    # soon as it closes and the generation is cancelled on a failure. A repeat
+    # skips the bundle; a compliance hit is retried realize_abort_retries times.
+    realize_streaming_enabled: bool = True
+    realize_abort_retries: int = 1
+
     default_llm_provider: str = "openai" 
 
     default_market_providers: str = "benzinga,alphavantage"
 
+    # Request coalescing: identical concurrent generate requests share one run,
+    # and its response is reused for coalesce_window_s after it completes.
+    coalesce_enabled: bool = True
+    coalesce_window_s: float = 5.0
+    coalesce_max_entries: int = 2048
+
+    # Template realization: requests whose trigger and placement are both listed
+    # are written from pre-approved templates (app/engine/templates.py) without
+    # provider fan-out, LLM or judge calls.
+    template_enabled: bool = True
+    template_triggers: str = "HOVER_TICKER,DWELL_NO_ACTION"
+    template_placements: str = "INVESTMENT_DASHBOARD,POSITIONS,PERFORMANCE"
+
+    @property
+    def template_triggers_list(self) -> list[str]:
+        return [t.strip() for t in self.template_triggers.split(",") if t.strip()]
+
+    @property
+    def template_placements_list(self) -> list[str]:
+        return [p.strip() for p in self.template_placements.split(",") if p.strip()]
+
+    # Provider fan-out: per-provider deadline and overall fetch budget (seconds)
+    provider_timeout_s: float = 4.0
+    provider_fetch_budget_s: float = 6.0
+    # Shared pool for all requests' fetches: size for peak concurrent requests
+    # times providers, or queued fetches eat into provider_fetch_budget_s.
+    provider_max_workers: int = 64
+
+    # Per-upstream resilience (LLM providers and market-data providers): an
+    # AIMD concurrency limit between min and max, and a circuit breaker that
+    # opens for breaker_open_s when, over the last breaker_window calls (at
+    # least breaker_min_calls), the error or slow-call rate hits its threshold.
+    # LLM calls count as slow after llm_slow_call_s, providers after
+    # provider_timeout_s. Calls refused by either fail fast to a degraded path.
+    resilience_enabled: bool = True
+    resilience_initial_limit: int = 20
+    resilience_min_limit: int = 2
+    resilience_max_limit: int = 200
+    resilience_backoff: float = 0.7
+    llm_slow_call_s: float = 10.0
+    breaker_window: int = 50
+    breaker_min_calls: int = 10
+    breaker_error_rate: float = 0.5
+    breaker_slow_rate: float = 0.5
+    breaker_open_s: float = 30.0
+
     @property
     def default_market_providers_list(self) -> list[str]:
         return [p.strip() for p in self.default_market_providers.split(",") if p.strip()]
 
     risk_mode: str = "strict"
 
+    # Compliance phrase policy (JSON); built-in rules when unset. Re-read on change.
+    compliance_policy_path: str | None = None
+    compliance_reload_interval_s: float = 2.0
+
 
 settings = Settings()
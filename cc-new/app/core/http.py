@@ -0,0 +1,123 @@
+# app/core/http.py
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from typing import Dict, Tuple
+
+import httpx
+
+from app.core.config import settings
+from cc_common.cassette import wrap_async_transport, wrap_transport
+
+logger = logging.getLogger("cc.http")
+
+# Upstreams known to negotiate HTTP/2; everything else stays on HTTP/1.1 keep-alive.
+HTTP2_UPSTREAMS = {"anthropic", "openai", "benzinga"}
+
+_H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_s,
+    )
+
+
+class HttpClientPool:
+    """
+    One long-lived httpx.Client per upstream, shared by every request, plus
+    one httpx.AsyncClient per upstream for the async LLM path. Async clients
+    belong to the event loop that first used them; a different loop (tests,
+    scripts) gets its own. Clients are created lazily and closed together on
+    app shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, name: str) -> httpx.Client:
+        http2 = settings.http2_enabled and _H2_AVAILABLE and name in HTTP2_UPSTREAMS
+        logger.info("http client=%s created http2=%s", name, http2)
+        transport = httpx.HTTPTransport(http2=http2, limits=_limits())
+        return httpx.Client(
+            timeout=httpx.Timeout(30.0),
+            transport=wrap_transport(
+                name,
+                transport,
+                mode=settings.cassette_mode,
+                directory=settings.cassette_dir,
+                timing=settings.cassette_timing,
+            ),
+        )
+
+    def client(self, name: str) -> httpx.Client:
+        c = self._clients.get(name)
+        if c is not None and not c.is_closed:
+            return c
+        with self._lock:
+            c = self._clients.get(name)
+            if c is None or c.is_closed:
+                c = self._build(name)
+                self._clients[name] = c
+            return c
+
+    def _build_async(self, name: str) -> httpx.AsyncClient:
+        http2 = settings.http2_enabled and _H2_AVAILABLE and name in HTTP2_UPSTREAMS
+        logger.info("http async client=%s created http2=%s", name, http2)
+        transport = httpx.AsyncHTTPTransport(http2=http2, limits=_limits())
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            transport=wrap_async_transport(
+                name,
+                transport,
+                mode=settings.cassette_mode,
+                directory=settings.cassette_dir,
+                timing=settings.cassette_timing,
+            ),
+        )
+
+    def async_client(self, name: str) -> httpx.AsyncClient:
+        """Must be called from inside the event loop that will use the client."""
+        loop = asyncio.get_running_loop()
+        hit = self._async_clients.get(name)
+        if hit is not None and hit[0] is loop and not hit[1].is_closed:
+            return hit[1]
+        with self._lock:
+            hit = self._async_clients.get(name)
+            if hit is None or hit[0] is not loop or hit[1].is_closed:
+                hit = (loop, self._build_async(name))
+                self._async_clients[name] = hit
+            return hit[1]
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, c in clients.items():
+            try:
+                c.close()
+            except Exception:
+                logger.exception("http client=%s close failed", name)
+
+    async def aclose(self) -> None:
+        """Closes the async clients owned by the running loop, then the sync ones."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients, self._async_clients = self._async_clients, {}
+        for name, (owner, c) in clients.items():
+            if owner is not loop:
+                continue
+            try:
+                await c.aclose()
+            except Exception:
+                logger.exception("http async client=%s close failed", name)
+        self.close()
+
+
+http_pool = HttpClientPool()
@@ -0,0 +1,40 @@
+# app/core/lifecycle.py
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.http import http_pool
+from app.llm.registry import resolve_serving_llm, shutdown_llm_registry
+from app.providers.registry import shutdown_provider_registry, start_provider_registry
+
+logger = logging.getLogger("cc.lifecycle")
+
+
+def startup() -> None:
+    start_provider_registry()
+    try:
+        resolve_serving_llm()
+    except Exception as e:
+        # Keep serving; the same error is raised per request until fixed.
+        logger.warning("llm=%s not ready at startup: %s", settings.llm_provider, e)
+
+
+def shutdown() -> None:
+    shutdown_provider_registry()
+    shutdown_llm_registry()
+    http_pool.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup()
+    try:
+        yield
+    finally:
+        shutdown_provider_registry()
+        shutdown_llm_registry()
+        await http_pool.aclose()
@@ -15,3 +15,9 @@ def setup_logging() -> None:
     # quiet noisy libs
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.access").setLevel(logging.INFO)
+
+
+def safe_sample(text: str | None, n: int = 120) -> str:
+    """Single-line, truncated preview of provider/LLM text for log lines."""
+    t = (text or "").replace("\n", " ").strip()
+    return t[:n] + ("…" if len(t) > n else "")
@@ -0,0 +1,88 @@
+# app/core/market_calendar.py
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+NY = ZoneInfo("America/New_York")
+MARKET_CLOSE = time(16, 0)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    d = date(year, month, 1)
+    d += timedelta(days=(weekday - d.weekday()) % 7)
+    return d + timedelta(weeks=n - 1)
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    d = date(year, month + 1, 1) - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=16)
+def nyse_holidays(year: int) -> frozenset[date]:
+    """Full-day NYSE closures for `year` (rule-based; early closes are ignored)."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # MLK Day
+        _nth_weekday(year, 2, 0, 3),  # Presidents' Day
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    # New Year's Day falling on a Saturday is not observed on the prior Friday.
+    if date(year, 1, 1).weekday() != 5:
+        days.add(_observed(date(year, 1, 1)))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+
+def is_trading_day(d: date) -> bool:
+    return d.weekday() < 5 and d not in nyse_holidays(d.year)
+
+
+def next_daily_bar_at(now: datetime | None = None, buffer: timedelta = timedelta(minutes=30)) -> datetime:
+    """
+    The next moment a new daily bar should be available: the next trading
+    session's close (16:00 New York) plus `buffer` for the vendor to publish it.
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(NY)
+    d = now.date()
+    while True:
+        if is_trading_day(d):
+            ready = datetime.combine(d, MARKET_CLOSE, tzinfo=NY) + buffer
+            if ready > now:
+                return ready
+        d += timedelta(days=1)
+
+
+def seconds_until_next_daily_bar(now: datetime | None = None, buffer: timedelta = timedelta(minutes=30)) -> float:
+    now = now or datetime.now(timezone.utc)
+    return max(1.0, (next_daily_bar_at(now, buffer) - now).total_seconds())
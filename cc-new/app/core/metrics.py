@@ -0,0 +1,105 @@
+# app/core/metrics.py
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+STAGE_SECONDS = Histogram(
+    "cc_stage_duration_seconds",
+    "Wall time of one generate_insights stage.",
+    ["stage", "target"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+REQUEST_SECONDS = Histogram(
+    "cc_request_duration_seconds",
+    "End-to-end generate_insights latency.",
+    ["route", "source"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+
+PROMPT_FACT_TOKENS = Histogram(
+    "cc_prompt_fact_tokens",
+    "Tokens of a bundle's facts as sent to realize, before and after compaction.",
+    ["phase"],
+    buckets=(25, 50, 100, 200, 400, 800, 1600, 3200),
+)
+
+LLM_CALL_SECONDS = Histogram(
+    "cc_llm_call_seconds",
+    "Latency of successful LLM calls made through the hedging layer.",
+    ["provider", "op"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 12.0, 20.0, 30.0),
+)
+
+LLM_INPUT_TOKENS = Counter(
+    "cc_llm_input_tokens_total",
+    "LLM input tokens by kind: cached (prompt-cache read), uncached, cache_write.",
+    ["provider", "op", "kind"],
+)
+
+REALIZE_ABORTED_TOTAL = Counter(
+    "cc_realize_aborted_total",
+    "Streamed realizations cancelled early because a finished field failed its check.",
+    ["reason"],
+)
+
+HEDGE_TOTAL = Counter(
+    "cc_llm_hedge_total",
+    "Hedged LLM calls by outcome (primary, primary_after_hedge, secondary).",
+    ["op", "outcome"],
+)
+
+
+class StageTimings:
+    """
+    Per-request span recorder. Every span is observed in STAGE_SECONDS and
+    kept (in milliseconds) for the request's Audit. Safe to share with the
+    provider and LLM worker threads of the same request.
+    """
+
+    def __init__(self) -> None:
+        self._spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, target: str = "") -> None:
+        STAGE_SECONDS.labels(stage=stage, target=target).observe(seconds)
+        key = f"{stage}.{target}" if target else stage
+        with self._lock:
+            # Repeated spans of the same stage/target (e.g. two realizes of one
+            # bundle kind) get a numeric suffix instead of overwriting.
+            n, name = 2, key
+            while name in self._spans:
+                name, n = f"{key}#{n}", n + 1
+            self._spans[name] = round(seconds * 1000.0, 2)
+
+    @contextmanager
+    def span(self, stage: str, target: str = "") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, target)
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._spans)
+
+
+@contextmanager
+def maybe_span(timings: StageTimings | None, stage: str, target: str = "") -> Iterator[None]:
+    if timings is None:
+        yield
+        return
+    with timings.span(stage, target):
+        yield
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Prometheus text exposition of the default registry, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
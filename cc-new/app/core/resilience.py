@@ -0,0 +1,290 @@
+# app/core/resilience.py
+"""
+Per-upstream admission control: an AIMD concurrency limit plus a circuit
+breaker, shared by every request that calls that upstream.
+
+A call is admitted only while the breaker allows it and fewer than `limit`
+calls are in flight; otherwise UpstreamUnavailable is raised at once so the
+caller can take its degraded path instead of queueing behind a slow vendor.
+
+The limit grows by 1/limit per good call (about +1 per limit's worth of calls)
+and is multiplied by `backoff` on an error or a call slower than `slow_call_s`.
+The breaker looks at the last `window` calls and opens when, with at least
+`min_calls` of them, the error rate or the slow-call rate reaches its
+threshold. After `open_s` it lets `half_open_probes` calls through; one good
+probe closes it, a bad one opens it again.
+
+A call cancelled by its caller (a hedge loser, a dropped client) says nothing
+about the upstream: it frees its slot and is left out of both the limit and
+the breaker window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Tuple, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+
+logger = logging.getLogger("cc.resilience")
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Raised into a call by its caller, not by the upstream.
+_CANCELLED: Tuple[type[BaseException], ...] = (asyncio.CancelledError, GeneratorExit)
+
+CONCURRENCY_LIMIT = Gauge(
+    "cc_upstream_concurrency_limit",
+    "Current adaptive concurrency limit per upstream.",
+    ["upstream"],
+)
+CIRCUIT_STATE = Gauge(
+    "cc_upstream_circuit_state",
+    "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open).",
+    ["upstream"],
+)
+REJECTED_TOTAL = Counter(
+    "cc_upstream_rejected_total",
+    "Calls refused before reaching the upstream.",
+    ["upstream", "reason"],
+)
+
+
+class UpstreamUnavailable(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open or whose limit is reached."""
+
+    def __init__(self, upstream: str, reason: str) -> None:
+        super().__init__(f"upstream {upstream} unavailable: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class ResilienceConfig:
+    initial_limit: int = 20
+    min_limit: int = 2
+    max_limit: int = 200
+    backoff: float = 0.7
+    slow_call_s: float = 10.0
+    window: int = 50
+    min_calls: int = 10
+    error_rate: float = 0.5
+    slow_rate: float = 0.5
+    open_s: float = 30.0
+    half_open_probes: int = 1
+
+
+class AIMDLimiter:
+    def __init__(self, cfg: ResilienceConfig) -> None:
+        self.cfg = cfg
+        self.limit = float(cfg.initial_limit)
+        self.inflight = 0
+
+    def try_acquire(self) -> bool:
+        if self.inflight >= int(self.limit):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, good: bool | None) -> None:
+        """good=None: the call was cancelled; only its slot is freed."""
+        self.inflight -= 1
+        if good is None:
+            return
+        if good:
+            self.limit = min(self.cfg.max_limit, self.limit + 1.0 / self.limit)
+        else:
+            self.limit = max(self.cfg.min_limit, self.limit * self.cfg.backoff)
+
+
+class CircuitBreaker:
+    def __init__(self, cfg: ResilienceConfig) -> None:
+        self.cfg = cfg
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=cfg.window)  # (error, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+
+    def allow(self, now: float) -> bool:
+        if self.state == OPEN:
+            if now - self._opened_at < self.cfg.open_s:
+                return False
+            self.state, self._probes = HALF_OPEN, 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.cfg.half_open_probes:
+                return False
+            self._probes += 1
+        return True
+
+    def release_probe(self) -> None:
+        """Gives back a half-open probe slot taken by a call that did not complete."""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, error: bool, slow: bool, now: float) -> str | None:
+        """Returns the new state when this outcome changed it."""
+        if self.state == HALF_OPEN:
+            if error or slow:
+                return self._open(now)
+            self.state = CLOSED
+            self._outcomes.clear()
+            return CLOSED
+        if self.state == OPEN:
+            return None
+
+        self._outcomes.append((error, slow))
+        n = len(self._outcomes)
+        if n < self.cfg.min_calls:
+            return None
+        errors = sum(1 for e, _ in self._outcomes if e)
+        slows = sum(1 for _, s in self._outcomes if s)
+        if errors / n >= self.cfg.error_rate or slows / n >= self.cfg.slow_rate:
+            return self._open(now)
+        return None
+
+    def _open(self, now: float) -> str:
+        self.state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        return OPEN
+
+
+class Upstream:
+    """Limiter + breaker for one upstream; guard()/call()/acall() wrap a call to it."""
+
+    def __init__(self, name: str, cfg: ResilienceConfig) -> None:
+        self.name = name
+        self.cfg = cfg
+        self.limiter = AIMDLimiter(cfg)
+        self.breaker = CircuitBreaker(cfg)
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self) -> None:
+        CONCURRENCY_LIMIT.labels(upstream=self.name).set(int(self.limiter.limit))
+        CIRCUIT_STATE.labels(upstream=self.name).set(_STATE_VALUE[self.breaker.state])
+
+    def _admit(self) -> None:
+        with self._lock:
+            if not self.breaker.allow(time.monotonic()):
+                reason = "circuit_open"
+            elif not self.limiter.try_acquire():
+                reason = "concurrency_limit"
+                # A half-open probe slot was taken but the call will not run.
+                self.breaker.release_probe()
+            else:
+                return
+        REJECTED_TOTAL.labels(upstream=self.name, reason=reason).inc()
+        raise UpstreamUnavailable(self.name, reason)
+
+    def _done(self, error: bool | None, elapsed_s: float) -> None:
+        """error=None: the caller cancelled the call; no outcome is recorded."""
+        if error is None:
+            with self._lock:
+                self.limiter.release(good=None)
+                self.breaker.release_probe()
+            return
+        slow = elapsed_s >= self.cfg.slow_call_s
+        with self._lock:
+            self.limiter.release(good=not (error or slow))
+            changed = self.breaker.record(error, slow, time.monotonic())
+            self._publish()
+        if changed is not None:
+            log = logger.warning if changed == OPEN else logger.info
+            log("upstream=%s circuit %s limit=%d", self.name, changed, int(self.limiter.limit))
+
+    @contextmanager
+    def guard(self, ok_errors: Tuple[type[BaseException], ...] = ()) -> Iterator[None]:
+        """ok_errors: exceptions raised by the caller's own checks, not the upstream."""
+        self._admit()
+        start = time.perf_counter()
+        error: bool | None = True
+        try:
+            yield
+            error = False
+        except _CANCELLED:
+            error = None
+            raise
+        except ok_errors:
+            error = False
+            raise
+        finally:
+            self._done(error, time.perf_counter() - start)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        with self.guard():
+            return fn()
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        with self.guard():
+            return await fn()
+
+
+class UpstreamRegistry:
+    def __init__(self) -> None:
+        self._upstreams: Dict[str, Upstream] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, *, slow_call_s: float | None = None) -> Upstream:
+        u = self._upstreams.get(name)
+        if u is not None:
+            return u
+        with self._lock:
+            u = self._upstreams.get(name)
+            if u is None:
+                u = self._upstreams[name] = Upstream(name, _config(slow_call_s))
+            return u
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": u.breaker.state,
+                "limit": int(u.limiter.limit),
+                "inflight": u.limiter.inflight,
+            }
+            for name, u in list(self._upstreams.items())
+        }
+
+
+def _config(slow_call_s: float | None) -> ResilienceConfig:
+    return ResilienceConfig(
+        initial_limit=settings.resilience_initial_limit,
+        min_limit=settings.resilience_min_limit,
+        max_limit=settings.resilience_max_limit,
+        backoff=settings.resilience_backoff,
+        slow_call_s=slow_call_s if slow_call_s is not None else settings.llm_slow_call_s,
+        window=settings.breaker_window,
+        min_calls=settings.breaker_min_calls,
+        error_rate=settings.breaker_error_rate,
+        slow_rate=settings.breaker_slow_rate,
+        open_s=settings.breaker_open_s,
+    )
+
+
+upstreams = UpstreamRegistry()
+
+
+@contextmanager
+def guarded(
+    name: str,
+    *,
+    slow_call_s: float | None = None,
+    ok_errors: Tuple[type[BaseException], ...] = (),
+) -> Iterator[None]:
+    """upstreams.get(name).guard(), or a no-op when resilience is disabled."""
+    if not settings.resilience_enabled:
+        yield
+        return
+    with upstreams.get(name, slow_call_s=slow_call_s).guard(ok_errors):
+        yield
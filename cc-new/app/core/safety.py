@@ -6,13 +6,21 @@ import re
 from dataclasses import dataclass
 from typing import Iterable
 
+from app.core.config import settings
+from cc_common.compliance import DEFAULT_POLICY, ComplianceScanner
+
+
+NON_ADVISORY = "non_advisory"
 
 DEFAULT_BANNED_PATTERNS: list[re.Pattern] = [
-    re.compile(r"\b(buy|sell|short|long)\b", re.IGNORECASE),
-    re.compile(r"\b(allocate|reallocate|rebalance|shift\s+\d+%|move\s+\d+%)\b", re.IGNORECASE),
-    re.compile(r"\b(you should|we recommend|do this now|must)\b", re.IGNORECASE),
+    re.compile(rule["pattern"], re.IGNORECASE) for rule in DEFAULT_POLICY["rule_sets"][NON_ADVISORY]
 ]
 
+compliance_scanner = ComplianceScanner(
+    settings.compliance_policy_path,
+    check_interval_s=settings.compliance_reload_interval_s,
+)
+
 
 @dataclass(frozen=True)
 class SafetyResult:
@@ -22,10 +30,10 @@ class SafetyResult:
 
 def check_non_advisory(texts: Iterable[str]) -> SafetyResult:
     reasons: list[str] = []
+    policy = compliance_scanner.policy
     for t in texts:
-        for pat in DEFAULT_BANNED_PATTERNS:
-            if pat.search(t or ""):
-                reasons.append(f"Blocked pattern: {pat.pattern}")
+        for rule in policy.matched_rules(t or "", (NON_ADVISORY,)):
+            reasons.append(f"Blocked pattern: {rule.pattern}")
     return SafetyResult(ok=(len(reasons) == 0), reasons=reasons)
 
 
@@ -0,0 +1,109 @@
+# app/engine/coalesce.py
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Awaitable, Callable, Tuple
+
+from app.api.schemas import GenerateInsightsRequest, GenerateInsightsResponse
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.engine.precompute import payload_fingerprint
+from app.llm.cache import canonical_hash
+
+logger = logging.getLogger("cc.coalesce")
+
+
+def coalesce_key(req: GenerateInsightsRequest) -> str:
+    """
+    Everything that shapes the response: customer, placement, trigger, focus
+    ticker, the headlines to avoid and the payload itself. session_id is left
+    out so widgets of one app open share a computation.
+    """
+    rc = req.request_context
+    return canonical_hash(
+        [
+            req.payload.user.customer_id,
+            rc.placement.value,
+            rc.trigger.value,
+            (rc.focus_ticker or "").upper(),
+            sorted(rc.recent_headlines or []),
+            payload_fingerprint(req.payload),
+        ]
+    )
+
+
+class RequestCoalescer:
+    """
+    Single-flight for whole generate_insights runs. Identical concurrent
+    requests wait on the first one's computation, and a finished response is
+    reused for window_s afterwards. Each caller gets its own copy of the
+    response; followers get a fresh trace_id that points back to the leader's.
+    Failures are shared with the waiting followers but never reused.
+    """
+
+    def __init__(self, cache: TieredCache, window_s: float) -> None:
+        self.cache = cache
+        self.window_s = window_s
+
+    def run(
+        self,
+        req: GenerateInsightsRequest,
+        compute: Callable[[], GenerateInsightsResponse],
+    ) -> Tuple[GenerateInsightsResponse, bool]:
+        """(response, led): led is False when the response came from another caller."""
+        if not settings.coalesce_enabled:
+            return compute(), True
+
+        led: list[GenerateInsightsResponse] = []
+
+        def _leader() -> dict:
+            resp = compute()
+            led.append(resp)
+            return resp.model_dump(mode="json")
+
+        raw = self.cache.get_or_compute(coalesce_key(req), _leader, self.window_s)
+        if led:
+            return led[0], True
+        return self._follower(req, raw), False
+
+    async def arun(
+        self,
+        req: GenerateInsightsRequest,
+        compute: Callable[[], Awaitable[GenerateInsightsResponse]],
+    ) -> Tuple[GenerateInsightsResponse, bool]:
+        """run() for the async route; followers wait on the event loop."""
+        if not settings.coalesce_enabled:
+            return await compute(), True
+
+        led: list[GenerateInsightsResponse] = []
+
+        async def _leader() -> dict:
+            resp = await compute()
+            led.append(resp)
+            return resp.model_dump(mode="json")
+
+        raw = await self.cache.aget_or_compute(coalesce_key(req), _leader, self.window_s)
+        if led:
+            return led[0], True
+        return self._follower(req, raw), False
+
+    def _follower(self, req: GenerateInsightsRequest, raw: dict) -> GenerateInsightsResponse:
+        resp = GenerateInsightsResponse.model_validate(raw)
+        trace_id = f"trace_{uuid.uuid4()}"
+        logger.info(
+            "[%s] coalesced with source_trace=%s customer_id=%s session_id=%s",
+            trace_id,
+            resp.audit.trace_id,
+            req.payload.user.customer_id,
+            req.session_id,
+        )
+        resp.audit.trace_id = trace_id
+        return resp
+
+
+request_coalescer = RequestCoalescer(
+    TieredCache("coalesce", max_entries=settings.coalesce_max_entries),
+    window_s=settings.coalesce_window_s,
+)
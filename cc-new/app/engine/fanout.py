@@ -0,0 +1,150 @@
+# app/engine/fanout.py
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import StageTimings, maybe_span
+from app.core.resilience import UpstreamUnavailable, guarded
+from app.providers.base import Provider, ProviderRequest, ProviderResponse
+
+logger = logging.getLogger("cc.fanout")
+
+# Shared across requests, so sized for concurrent requests times providers.
+# Each fetch's HTTP calls are capped at its deadline (ProviderRequest.timeout_s),
+# so a late provider gives its worker back shortly after the request drops it,
+# and per-upstream limits (app.core.resilience) refuse calls past the limit
+# before they take a worker.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.provider_max_workers,
+    thread_name_prefix="cc-provider",
+)
+
+
+@dataclass
+class _ProviderCall:
+    provider: Provider
+    timeout_s: float
+    budget_deadline: float
+    started_at: Optional[float] = None
+
+    def deadline(self) -> float:
+        """The budget deadline until the call starts, then its own timeout within it."""
+        if self.started_at is None:
+            return self.budget_deadline
+        return min(self.budget_deadline, self.started_at + self.timeout_s)
+
+
+def _run_provider(
+    call: _ProviderCall,
+    preq: ProviderRequest,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> ProviderResponse | None:
+    call.started_at = time.monotonic()
+    provider = call.provider
+    preq = replace(preq, deadline=call.deadline())
+
+    with maybe_span(timings, "provider_healthcheck", provider.name):
+        status = provider.healthcheck()
+    logger.info(
+        "[%s] provider=%s health ok=%s configured=%s msg=%s",
+        trace_id,
+        provider.name,
+        status.ok,
+        status.configured,
+        status.message,
+    )
+    if not status.ok:
+        return None
+
+    # A provider whose breaker is open or whose concurrency limit is reached
+    # is dropped like an unhealthy one, so its bundle is simply not planned.
+    try:
+        with guarded(f"provider:{provider.name}", slow_call_s=settings.provider_timeout_s):
+            with maybe_span(timings, "provider_fetch", provider.name):
+                return provider.fetch(preq)
+    except UpstreamUnavailable as e:
+        logger.warning("[%s] provider=%s skipped: %s", trace_id, provider.name, e.reason)
+        return None
+
+
+def fan_out_providers(
+    providers: List[Provider],
+    preq: ProviderRequest,
+    trace_id: str,
+    *,
+    timeout_s: float | None = None,
+    budget_s: float | None = None,
+    timings: StageTimings | None = None,
+) -> List[ProviderResponse]:
+    """
+    Runs healthcheck + fetch for every provider concurrently.
+
+    Each provider gets `timeout_s` from the moment it starts running, and the
+    whole stage is capped at `budget_s`. Providers that fail, are unhealthy,
+    are refused by their upstream guard or miss their deadline are dropped;
+    the rest are returned in the order given.
+    """
+    timeout_s = settings.provider_timeout_s if timeout_s is None else timeout_s
+    budget_s = settings.provider_fetch_budget_s if budget_s is None else budget_s
+
+    budget_deadline = time.monotonic() + budget_s
+
+    calls: Dict[Future, _ProviderCall] = {}
+    order: Dict[Future, int] = {}
+    for i, provider in enumerate(providers):
+        call = _ProviderCall(provider=provider, timeout_s=timeout_s, budget_deadline=budget_deadline)
+        fut = _executor.submit(_run_provider, call, preq, trace_id, timings)
+        calls[fut] = call
+        order[fut] = i
+
+    results: Dict[int, ProviderResponse] = {}
+    pending = set(calls)
+
+    while pending:
+        now = time.monotonic()
+
+        for fut in [f for f in pending if calls[f].deadline() <= now]:
+            pending.discard(fut)
+            fut.cancel()
+            logger.warning(
+                "[%s] provider=%s dropped: deadline exceeded",
+                trace_id,
+                calls[fut].provider.name,
+            )
+        if not pending:
+            break
+
+        # Re-check at least every timeout_s so queued providers that start late
+        # still get their own deadline enforced.
+        next_deadline = min(calls[f].deadline() for f in pending)
+        done, pending = wait(
+            pending,
+            timeout=max(0.0, min(next_deadline - now, timeout_s)),
+            return_when=FIRST_COMPLETED,
+        )
+
+        for fut in done:
+            provider = calls[fut].provider
+            try:
+                resp = fut.result()
+            except Exception:
+                logger.exception("[%s] provider=%s fetch failed", trace_id, provider.name)
+                continue
+            if resp is not None:
+                results[order[fut]] = resp
+
+    payloads = [results[i] for i in sorted(results)]
+    logger.info(
+        "[%s] providers_done ok_payloads=%d requested=%d",
+        trace_id,
+        len(payloads),
+        len(providers),
+    )
+    return payloads
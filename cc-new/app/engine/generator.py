@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 import uuid
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
 
 from app.api.schemas import (
     GenerateInsightsRequest,
@@ -23,22 +26,39 @@ from app.engine.signals import (
     build_everyday_performance_signals,
     build_everyday_positions_signals,
     build_advanced_performance_signals,
-    build_advanced_positions_signals
+    build_advanced_positions_signals,
+    SignalBundle,
 )
 
 from app.core.config import settings
-from app.core.safety import enforce_non_advisory_or_raise
+from app.core.logging import safe_sample
+from app.core.metrics import REQUEST_SECONDS, StageTimings
+from app.engine.coalesce import request_coalescer
+from app.engine.fanout import fan_out_providers
+from app.engine.index import ItemIndex
 from app.engine.normalize import normalize_pipeline_payload
-from app.llm.registry import resolve_llm
-from app.providers.base import ProviderRequest
+from app.engine.precompute import precompute_store
+from app.engine.realize import RealizedBundle, arealize_bundles, iter_realize_bundles, realize_bundles
+from app.engine.templates import has_templates, realize_bundles_from_templates, use_templates
+from app.llm.base import LLMProvider
+from app.llm.registry import resolve_serving_llm
+from app.providers.base import ProviderRequest, ProviderResponse
 from app.providers.registry import resolve_providers
 import logging
 logger = logging.getLogger("cc.generator")
 
 
-def _safe_sample(text: str | None, n: int = 120) -> str:
-    t = (text or "").replace("\n", " ").strip()
-    return t[:n] + ("…" if len(t) > n else "")
+KIND_TO_TYPE = {
+    "goal_portfolio": InsightType.GOAL_PROGRESS,
+    "market_trend": InsightType.MARKET_TREND,
+    "positions_ticker": InsightType.MARKET_TREND,
+    "performance": InsightType.PORTFOLIO_COMPOSITION,
+    "inactive_activation": InsightType.PORTFOLIO_COMPOSITION,
+    "everyday_performance": InsightType.PORTFOLIO_COMPOSITION,
+    "everyday_positions": InsightType.PORTFOLIO_COMPOSITION,
+    "advanced_performance": InsightType.PORTFOLIO_COMPOSITION,
+    "advanced_positions": InsightType.PORTFOLIO_COMPOSITION,
+}
 
 def plan_bundles(context, rc, provider_payloads):
     arch = (context.get("archetype") or "").strip().upper()
@@ -100,8 +120,42 @@ def plan_bundles(context, rc, provider_payloads):
     return [build_goal_portfolio_signals(context)]
 
     
-def generate_insights(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
+@dataclass
+class PreparedRequest:
+    """Everything generate_insights needs before the LLM stage."""
+
+    req: GenerateInsightsRequest
+    trace_id: str
+    context: Dict[str, Any]
+    provider_payloads: List[ProviderResponse]
+    bundles: List[SignalBundle]
+    llm: LLMProvider | None
+    timings: StageTimings
+    templated: bool = False
+
+    @property
+    def scope(self) -> InsightScope:
+        rc = self.req.request_context
+        return (
+            InsightScope.TICKER
+            if rc.placement.value == "POSITIONS" and rc.focus_ticker
+            else InsightScope.PORTFOLIO
+        )
+
+
+def prepare_request(
+    req: GenerateInsightsRequest,
+    timings: StageTimings | None = None,
+    *,
+    templated: bool = False,
+) -> PreparedRequest:
+    """
+    normalize -> provider fan-out -> plan_bundles -> resolve LLM.
+    templated skips the fan-out and the LLM and keeps only bundles that have
+    templates.
+    """
     rc = req.request_context
+    timings = timings or StageTimings()
 
     trace_id = f"trace_{uuid.uuid4()}"
     logger.info(
@@ -111,7 +165,8 @@ def generate_insights(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
         req.session_id,
     )
 
-    context = normalize_pipeline_payload(req.payload)
+    with timings.span("normalize"):
+        context = normalize_pipeline_payload(req.payload)
     
     arch = (context.get("archetype") or "").strip().upper()
     logger.info("[%s] archetype=%s tier=%s", trace_id, arch, context.get("tier"))
@@ -124,193 +179,281 @@ def generate_insights(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
         context.get("goal_progress_pct"),
     )
 
-    provider_payloads = []
-    providers = resolve_providers(settings.default_market_providers_list)
-
-    preq = ProviderRequest(
-        customer_id=context["customer_id"],
-        as_of=req.payload.wealth_snapshot.as_of,
-        context=context,
-    )
+    provider_payloads: List[ProviderResponse] = []
+    if not templated:
+        providers = resolve_providers(settings.default_market_providers_list)
+        preq = ProviderRequest(
+            customer_id=context["customer_id"],
+            as_of=req.payload.wealth_snapshot.as_of,
+            context=context,
+        )
+        provider_payloads = fan_out_providers(providers, preq, trace_id, timings=timings)
 
-    for provider in providers:
-        status = provider.healthcheck()
+    for resp in provider_payloads:
         logger.info(
-            "[%s] provider=%s health ok=%s configured=%s msg=%s",
+            "[%s] provider=%s fetched items=%d citations=%d",
             trace_id,
-            provider.name,
-            status.ok,
-            status.configured,
-            status.message,
+            resp.provider,
+            len(resp.items),
+            len(resp.citations),
         )
 
-        if not status.ok:
-            continue
-
-        try:
-            resp = provider.fetch(preq)
+        if resp.items:
+            first = resp.items[0]
             logger.info(
-                "[%s] provider=%s fetched items=%d citations=%d",
+                "[%s] provider=%s sample kind=%s title=%s summary=%s",
                 trace_id,
-                provider.name,
-                len(resp.items),
-                len(resp.citations),
+                resp.provider,
+                first.kind,
+                safe_sample(first.title, 80),
+                safe_sample(first.summary, 140),
             )
 
-            if resp.items:
-                first = resp.items[0]
-                logger.info(
-                    "[%s] provider=%s sample kind=%s title=%s summary=%s",
-                    trace_id,
-                    provider.name,
-                    first.kind,
-                    _safe_sample(first.title, 80),
-                    _safe_sample(first.summary, 140),
-                )
-
-            provider_payloads.append(resp)
-
-        except Exception:
-            logger.info(
-                "[%s] providers_done ok_payloads=%d requested=%d",
-                trace_id,
-                len(provider_payloads),
-                len(providers),
-            )
-
-    bundles = plan_bundles(context, rc, provider_payloads)
+    with timings.span("plan_bundles"):
+        context["item_index"] = ItemIndex.build(provider_payloads)
+        bundles = plan_bundles(context, rc, provider_payloads)
+        if templated:
+            bundles = [b for b in bundles if has_templates(b.kind)]
 
     logger.info(
         "[%s] llm_provider=%s bundles=%d",
         trace_id,
-        settings.llm_provider,
+        "template" if templated else settings.llm_provider,
         len(bundles),
     )
 
-    llm = resolve_llm(settings.llm_provider)
-    insights: List[Insight] = []
+    return PreparedRequest(
+        req=req,
+        trace_id=trace_id,
+        context=context,
+        provider_payloads=provider_payloads,
+        bundles=bundles[: settings.insights_count],
+        llm=None if templated else resolve_serving_llm(),
+        timings=timings,
+        templated=templated,
+    )
 
-    for bundle in bundles[: settings.insights_count]:
-        logger.info(
-            "[%s] bundle kind=%s facts=%d",
-            trace_id,
-            bundle.kind,
-            len(bundle.facts),
-        )
 
-        try:
-            realized = llm.realize(
-                {
-                    "facts": bundle.facts,
-                    "allowed_claims": [],
-                    "audience": "long-term investor",
-                    "style": "educational exploration",
-                }
+def build_insight(prep: PreparedRequest, rb: RealizedBundle, priority: int) -> Insight:
+    rc = prep.req.request_context
+    bundle, realized = rb.bundle, rb.realized
+    scope = prep.scope
+    return Insight(
+        id=str(uuid.uuid4()),
+        type=KIND_TO_TYPE.get(bundle.kind, InsightType.MARKET_TREND),
+        headline=realized["headline"],
+        explanation=realized["explanation"],
+        personal_relevance=realized["personal_relevance"],
+        placement=rc.placement,
+        trigger=rc.trigger,
+        scope=scope,
+        ticker=rc.focus_ticker if scope == InsightScope.TICKER else None,
+        priority=priority,
+        citations=[
+            Citation(
+                source=c.source,
+                title=c.title,
+                url=c.url,
+                published_at=c.published_at,
             )
+            for c in (bundle.citations or [])
+        ],
+    )
 
-            logger.info(
-                "[%s] realized keys=%s headline=%s",
-                trace_id,
-                list(realized.keys()),
-                _safe_sample(realized.get("headline"), 120),
-            )
 
-            if realized.get("headline") in (rc.recent_headlines or []):
-                logger.info("[%s] skipped repeated headline", trace_id)
-                continue
+def build_audit(prep: PreparedRequest) -> Audit:
+    return Audit(
+        model="template" if prep.templated else settings.llm_provider,
+        providers_used=[p.provider for p in prep.provider_payloads],
+        trace_id=prep.trace_id,
+        timings_ms=prep.timings.as_dict(),
+    )
 
-        except Exception:
-            logger.exception("[%s] llm.realize failed", trace_id)
-            raise
 
-        enforce_non_advisory_or_raise(
-            [
-                realized["headline"],
-                realized["explanation"],
-                realized["personal_relevance"],
-            ]
-        )
+def _lookup_precomputed(req: GenerateInsightsRequest, timings: StageTimings) -> GenerateInsightsResponse | None:
+    with timings.span("precompute_lookup"):
+        precomputed = precompute_store.lookup(req)
+    if precomputed is not None:
+        precomputed.audit.timings_ms = timings.as_dict()
+    return precomputed
 
-        try:
-            verdict = llm.judge(
-                f'{realized["headline"]}\n'
-                f'{realized["explanation"]}\n'
-                f'{realized["personal_relevance"]}'
-            )
 
-            logger.info(
-                "[%s] llm=%s judge verdict=%s reason=%s",
-                trace_id,
-                llm.name,
-                verdict.get("verdict"),
-                _safe_sample(verdict.get("reason"), 160),
-            )
+def generate_insights(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
+    start = time.perf_counter()
+    timings = StageTimings()
+
+    precomputed = _lookup_precomputed(req, timings)
+    if precomputed is not None:
+        REQUEST_SECONDS.labels(route="generate", source="precomputed").observe(time.perf_counter() - start)
+        return precomputed
+
+    if use_templates(req.request_context):
+        resp = generate_insights_templated(req, timings)
+        REQUEST_SECONDS.labels(route="generate", source="template").observe(time.perf_counter() - start)
+        return resp
+
+    # Identical concurrent requests (several widgets on one app open) share
+    # one pipeline run; a follower's Audit shows only its own wait.
+    with timings.span("coalesce"):
+        resp, led = request_coalescer.run(req, lambda: generate_insights_live(req, timings))
+    if not led:
+        resp.audit.timings_ms = timings.as_dict()
+    REQUEST_SECONDS.labels(route="generate", source="live" if led else "coalesced").observe(
+        time.perf_counter() - start
+    )
+    return resp
+
+
+def generate_insights_live(
+    req: GenerateInsightsRequest,
+    timings: StageTimings | None = None,
+) -> GenerateInsightsResponse:
+    """Runs the full pipeline, bypassing the precompute store."""
+    prep = prepare_request(req, timings)
+
+    accepted = realize_bundles(
+        prep.llm,
+        prep.bundles,
+        req.request_context,
+        prep.trace_id,
+        timings=prep.timings,
+    )
+    with prep.timings.span("build_response"):
+        insights = [build_insight(prep, rb, priority=i) for i, rb in enumerate(accepted)]
 
-        except Exception:
-            logger.exception("[%s] llm.judge failed", trace_id)
-            raise
+    return GenerateInsightsResponse(
+        customer_id=req.payload.user.customer_id,
+        as_of=req.payload.wealth_snapshot.as_of,
+        insights=insights,
+        audit=build_audit(prep),
+    )
 
-        if verdict.get("verdict") != "PASS":
-            logger.warning(
-                "[%s] insight blocked by judge reason=%s",
-                trace_id,
-                verdict.get("reason"),
-            )
-            continue
 
-        scope = (
-            InsightScope.TICKER
-            if rc.placement.value == "POSITIONS" and rc.focus_ticker
-            else InsightScope.PORTFOLIO
-        )
+def generate_insights_templated(
+    req: GenerateInsightsRequest,
+    timings: StageTimings | None = None,
+) -> GenerateInsightsResponse:
+    """
+    normalize -> plan_bundles -> templates: no provider, LLM or judge calls,
+    for triggers where an LLM round trip is too slow (see app.engine.templates).
+    """
+    prep = prepare_request(req, timings, templated=True)
+
+    accepted = realize_bundles_from_templates(
+        prep.bundles,
+        prep.context,
+        req.request_context,
+        prep.trace_id,
+        timings=prep.timings,
+    )
+    with prep.timings.span("build_response"):
+        insights = [build_insight(prep, rb, priority=i) for i, rb in enumerate(accepted)]
 
-        kind_to_type = {
-            "goal_portfolio": InsightType.GOAL_PROGRESS,
-            "market_trend": InsightType.MARKET_TREND,
-            "positions_ticker": InsightType.MARKET_TREND,
-            "performance": InsightType.PORTFOLIO_COMPOSITION,
-            "inactive_activation": InsightType.PORTFOLIO_COMPOSITION,
-            "everyday_performance": InsightType.PORTFOLIO_COMPOSITION,
-            "everyday_positions": InsightType.PORTFOLIO_COMPOSITION,
-            "advanced_performance": InsightType.PORTFOLIO_COMPOSITION,
-            "advanced_positions": InsightType.PORTFOLIO_COMPOSITION,
-
-        }
-        
-        insight_type = kind_to_type.get(bundle.kind, InsightType.MARKET_TREND)
-        
-        insights.append(
-            Insight(
-                id=str(uuid.uuid4()),
-                type=insight_type,
-                headline=realized["headline"],
-                explanation=realized["explanation"],
-                personal_relevance=realized["personal_relevance"],
-                placement=rc.placement,
-                trigger=rc.trigger,
-                scope=scope,
-                ticker=rc.focus_ticker if scope == InsightScope.TICKER else None,
-                priority=len(insights),
-                citations=[
-                    Citation(
-                        source=c.source,
-                        title=c.title,
-                        url=c.url,
-                        published_at=c.published_at,
-                    )
-                    for c in (bundle.citations or [])
-                ],
-            )
-        )
+    return GenerateInsightsResponse(
+        customer_id=req.payload.user.customer_id,
+        as_of=req.payload.wealth_snapshot.as_of,
+        insights=insights,
+        audit=build_audit(prep),
+    )
+
+
+async def agenerate_insights(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
+    """
+    Async generate_insights for the async routes. Normalization and provider
+    fan-out run on a worker thread; realization and judging stay on the event
+    loop, so waiting on the LLM does not hold a thread.
+    """
+    start = time.perf_counter()
+    timings = StageTimings()
+
+    if precompute_store.cache.shared is None:
+        precomputed = _lookup_precomputed(req, timings)
+    else:
+        precomputed = await asyncio.to_thread(_lookup_precomputed, req, timings)
+    if precomputed is not None:
+        REQUEST_SECONDS.labels(route="generate", source="precomputed").observe(time.perf_counter() - start)
+        return precomputed
+
+    # CPU-only and a few milliseconds: not worth a thread hop.
+    if use_templates(req.request_context):
+        resp = generate_insights_templated(req, timings)
+        REQUEST_SECONDS.labels(route="generate", source="template").observe(time.perf_counter() - start)
+        return resp
+
+    with timings.span("coalesce"):
+        resp, led = await request_coalescer.arun(req, lambda: agenerate_insights_live(req, timings))
+    if not led:
+        resp.audit.timings_ms = timings.as_dict()
+    REQUEST_SECONDS.labels(route="generate", source="live" if led else "coalesced").observe(
+        time.perf_counter() - start
+    )
+    return resp
+
+
+async def agenerate_insights_live(
+    req: GenerateInsightsRequest,
+    timings: StageTimings | None = None,
+) -> GenerateInsightsResponse:
+    """Async generate_insights_live."""
+    prep = await asyncio.to_thread(prepare_request, req, timings)
+
+    accepted = await arealize_bundles(
+        prep.llm,
+        prep.bundles,
+        req.request_context,
+        prep.trace_id,
+        timings=prep.timings,
+    )
+    with prep.timings.span("build_response"):
+        insights = [build_insight(prep, rb, priority=i) for i, rb in enumerate(accepted)]
 
     return GenerateInsightsResponse(
         customer_id=req.payload.user.customer_id,
         as_of=req.payload.wealth_snapshot.as_of,
         insights=insights,
-        audit=Audit(
-            model=settings.llm_provider,
-            providers_used=[p.name for p in providers],
-            trace_id=trace_id,
-        ),
+        audit=build_audit(prep),
     )
 
+
+def generate_insights_stream(req: GenerateInsightsRequest) -> Iterator[Insight | Audit]:
+    """
+    Streaming variant: normalization, provider fan-out and planning run
+    eagerly (so request errors surface before any bytes are sent), then each
+    Insight is yielded as soon as it passes safety and the judge, followed by
+    the Audit. Priority reflects arrival order.
+    """
+    start = time.perf_counter()
+    timings = StageTimings()
+
+    precomputed = _lookup_precomputed(req, timings)
+    if precomputed is not None:
+        REQUEST_SECONDS.labels(route="stream", source="precomputed").observe(time.perf_counter() - start)
+        return iter([*precomputed.insights, precomputed.audit])
+
+    if use_templates(req.request_context):
+        resp = generate_insights_templated(req, timings)
+        REQUEST_SECONDS.labels(route="stream", source="template").observe(time.perf_counter() - start)
+        return iter([*resp.insights, resp.audit])
+
+    prep = prepare_request(req, timings)
+
+    def _events() -> Iterator[Insight | Audit]:
+        emitted = 0
+        build_s = 0.0
+        for rb in iter_realize_bundles(
+            prep.llm,
+            prep.bundles,
+            req.request_context,
+            prep.trace_id,
+            timings=prep.timings,
+        ):
+            t0 = time.perf_counter()
+            insight = build_insight(prep, rb, priority=emitted)
+            build_s += time.perf_counter() - t0
+            yield insight
+            emitted += 1
+        prep.timings.record("build_response", build_s)
+        yield build_audit(prep)
+        REQUEST_SECONDS.labels(route="stream", source="live").observe(time.perf_counter() - start)
+
+    return _events()
@@ -0,0 +1,102 @@
+# app/engine/holdings.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.api.schemas import HoldingSnapshot
+
+
+@dataclass(frozen=True)
+class HoldingsFrame:
+    """
+    Column-oriented view of a payload's holdings, built once per request.
+    All aggregates are vectorized, so lot counts in the thousands cost about
+    the same as a handful.
+    """
+
+    tickers: np.ndarray  # object
+    categories: np.ndarray  # object
+    values: np.ndarray  # float64, current market value
+    yields: np.ndarray  # float64, dividend yield (fraction)
+
+    @classmethod
+    def from_snapshots(cls, holdings: Sequence[HoldingSnapshot]) -> "HoldingsFrame":
+        n = len(holdings)
+        return cls(
+            tickers=np.fromiter((h.ticker for h in holdings), dtype=object, count=n),
+            categories=np.fromiter((h.category for h in holdings), dtype=object, count=n),
+            values=np.fromiter((h.current_market_value for h in holdings), dtype=np.float64, count=n),
+            yields=np.fromiter((h.dividend_yield_pct for h in holdings), dtype=np.float64, count=n),
+        )
+
+    @classmethod
+    def empty(cls) -> "HoldingsFrame":
+        return cls.from_snapshots([])
+
+    def __len__(self) -> int:
+        return int(self.values.shape[0])
+
+    @property
+    def total_value(self) -> float:
+        return float(self.values.sum())
+
+    @property
+    def weighted_yield(self) -> float:
+        total = self.total_value
+        return float(self.values @ self.yields / total) if total > 0 else 0.0
+
+    def weights(self) -> np.ndarray:
+        total = self.total_value
+        if total <= 0:
+            return np.zeros_like(self.values)
+        return self.values / total
+
+    def top_k(self, k: int) -> np.ndarray:
+        """Row indices of the k largest positions by value, largest first (ties keep input order)."""
+        n = len(self)
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        idx = np.arange(n) if k == n else np.argpartition(-self.values, k - 1)[:k]
+        return idx[np.lexsort((idx, -self.values[idx]))]
+
+    def top_holdings(self, k: int = 5) -> List[Dict[str, Any]]:
+        return [
+            {
+                "ticker": self.tickers[i],
+                "value": float(self.values[i]),
+                "category": self.categories[i],
+                "dividend_yield_pct": float(self.yields[i]),
+            }
+            for i in self.top_k(k)
+        ]
+
+    def top_share(self) -> float | None:
+        """Largest single position as a fraction of tracked value."""
+        if len(self) == 0 or self.total_value <= 0:
+            return None
+        return float(self.values.max() / self.total_value)
+
+    def hhi(self) -> float:
+        """Herfindahl-Hirschman index of position weights (0..1; 1 = single holding)."""
+        w = self.weights()
+        return float(w @ w)
+
+    def category_weights(self) -> Dict[str, float]:
+        """Share of tracked value per category, largest first."""
+        if len(self) == 0 or self.total_value <= 0:
+            return {}
+        cats, inverse = np.unique(self.categories.astype(str), return_inverse=True)
+        sums = np.bincount(inverse, weights=self.values) / self.total_value
+        order = np.argsort(-sums, kind="stable")
+        return {str(cats[i]): float(sums[i]) for i in order}
+
+
+def holdings_frame(context: Dict[str, Any]) -> HoldingsFrame:
+    """The request's frame, or an empty one for contexts built without it."""
+    frame = context.get("holdings_frame")
+    return frame if isinstance(frame, HoldingsFrame) else HoldingsFrame.empty()
@@ -0,0 +1,104 @@
+# app/engine/index.py
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.providers.base import ProviderItem, ProviderResponse
+
+
+# Theme -> tokens that signal it, matched as whole (lowercased) tokens.
+THEME_LEXICON: Dict[str, Tuple[str, ...]] = {
+    "dividends/income": ("dividend", "dividends", "yield", "yields", "income"),
+    "ETFs/index exposure": ("etf", "etfs", "index", "indexes", "s&p", "vanguard"),
+    "earnings": ("earnings", "guidance", "revenue", "revenues"),
+    "rates/macro": ("rates", "fed", "inflation"),
+}
+
+_TERM_TO_THEME: Dict[str, str] = {term: theme for theme, terms in THEME_LEXICON.items() for term in terms}
+
+_TOKEN_RE = re.compile(r"\$?[A-Za-z0-9][A-Za-z0-9&.\-]*")
+
+
+def _tokens(text: str) -> Iterable[str]:
+    for m in _TOKEN_RE.finditer(text or ""):
+        yield m.group(0).rstrip(".-")
+
+
+@dataclass
+class ItemIndex:
+    """
+    Inverted index over a request's provider items.
+
+    Symbols are indexed from an item's `extra["symbol"]`, from cashtags ($AAPL)
+    and from all-caps tokens of two or more letters in the title/summary, so a
+    one-letter ticker like "T" only matches when it is tagged or cashtagged.
+    Theme postings come from THEME_LEXICON. Postings keep item order.
+    """
+
+    items: List[Tuple[str, ProviderItem]] = field(default_factory=list)
+    by_symbol: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_theme: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_provider: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+
+    @classmethod
+    def build(cls, provider_payloads: List[ProviderResponse]) -> "ItemIndex":
+        index = cls()
+        for p in provider_payloads:
+            for it in p.items or []:
+                index._add(p.provider, it)
+        return index
+
+    def _add(self, provider: str, item: ProviderItem) -> None:
+        i = len(self.items)
+        self.items.append((provider, item))
+        self.by_provider[provider].append(i)
+
+        symbols = set()
+        sym = (item.extra or {}).get("symbol")
+        if sym:
+            symbols.add(str(sym).upper())
+
+        themes = set()
+        for tok in _tokens(f"{item.title} {item.summary}"):
+            if tok.startswith("$") and len(tok) > 1:
+                symbols.add(tok[1:].upper())
+            elif len(tok) >= 2 and tok.isupper():
+                symbols.add(tok)
+            theme = _TERM_TO_THEME.get(tok.lower())
+            if theme:
+                themes.add(theme)
+
+        for s in symbols:
+            self.by_symbol[s].append(i)
+        for t in themes:
+            self.by_theme[t].append(i)
+
+    def _select(self, postings: List[int], provider: str | None) -> List[int]:
+        if provider is None:
+            return postings
+        return [i for i in postings if self.items[i][0] == provider]
+
+    def items_for(self, provider: str) -> List[ProviderItem]:
+        return [self.items[i][1] for i in self.by_provider.get(provider, ())]
+
+    def for_symbol(self, symbol: str, provider: str | None = None) -> List[ProviderItem]:
+        postings = self.by_symbol.get((symbol or "").upper(), [])
+        return [self.items[i][1] for i in self._select(postings, provider)]
+
+    def symbols_mentioned(self, symbols: Iterable[str], provider: str | None = None) -> List[str]:
+        """Those of `symbols` (in the given order) that at least one item refers to."""
+        return [s for s in symbols if s and self._select(self.by_symbol.get(s.upper(), []), provider)]
+
+    def themes(self, provider: str | None = None) -> List[str]:
+        """Themes with at least one matching item, in THEME_LEXICON order."""
+        return [t for t in THEME_LEXICON if self._select(self.by_theme.get(t, []), provider)]
+
+
+def item_index(context: Dict[str, Any], provider_payloads: List[ProviderResponse]) -> ItemIndex:
+    """The request's index when prepare_request built one, else a fresh one for these payloads."""
+    index = context.get("item_index")
+    return index if isinstance(index, ItemIndex) else ItemIndex.build(provider_payloads)
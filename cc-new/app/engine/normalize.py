@@ -5,6 +5,7 @@ from datetime import date
 from typing import Any, Dict
 from datetime import datetime
 from app.api.schemas import PipelinePayload
+from app.engine.holdings import HoldingsFrame
 
 
 def _compute_inactivity_flag(last_login_at: datetime | None) -> bool:
@@ -49,20 +50,8 @@ def normalize_pipeline_payload(payload: PipelinePayload) -> Dict[str, Any]:
     """
     Converts pipeline payload -> normalized context used by the insight engine.
     """
-    tickers = [h.ticker for h in payload.holdings_snapshots]
-
-    total_value = sum(h.current_market_value for h in payload.holdings_snapshots)
-    top_holdings = sorted(
-        payload.holdings_snapshots,
-        key=lambda h: h.current_market_value,
-        reverse=True,
-    )
-
-    dividend_weighted_yield = (
-        sum(h.current_market_value * h.dividend_yield_pct for h in payload.holdings_snapshots) / total_value
-        if total_value > 0
-        else 0
-    )
+    frame = HoldingsFrame.from_snapshots(payload.holdings_snapshots)
+    dividend_weighted_yield = frame.weighted_yield
 
     retirement_goal = next(
         (g for g in payload.goals if (g.goal_type or "").lower() == "retirement"),
@@ -78,17 +67,10 @@ def normalize_pipeline_payload(payload: PipelinePayload) -> Dict[str, Any]:
             else None
         ),
         "goal_progress_pct": retirement_goal.progress_pct if retirement_goal else None,
-        "tickers": tickers,
-        "top_holdings": [
-            {
-                "ticker": h.ticker,
-                "value": h.current_market_value,
-                "category": h.category,
-                "dividend_yield_pct": h.dividend_yield_pct,
-            }
-            for h in top_holdings[:5]
-        ],
-        "holdings_total_value": total_value,
+        "tickers": frame.tickers.tolist(),
+        "top_holdings": frame.top_holdings(5),
+        "holdings_frame": frame,
+        "holdings_total_value": frame.total_value,
         "total_investable_assets": payload.wealth_snapshot.total_investable_assets,
         "dividend_profile": {
             "weighted_yield": dividend_weighted_yield,
@@ -98,6 +80,6 @@ def normalize_pipeline_payload(payload: PipelinePayload) -> Dict[str, Any]:
         "preferred_format": payload.preferences.preferred_insight_format,
         "tier": _tier(payload.wealth_snapshot.total_investable_assets),
         "archetype": _archetype(payload),
-        "holdings_count": len(payload.holdings_snapshots),
-        "has_positions": len(payload.holdings_snapshots) > 0,
+        "holdings_count": len(frame),
+        "has_positions": len(frame) > 0,
         }
@@ -0,0 +1,98 @@
+# app/engine/precompute.py
+
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from app.api.schemas import GenerateInsightsRequest, GenerateInsightsResponse, PipelinePayload
+from app.core.cache import TieredCache, build_cache_backend
+from app.core.config import settings
+from app.llm.cache import canonical_hash
+
+logger = logging.getLogger("cc.precompute")
+
+
+def payload_fingerprint(payload: PipelinePayload) -> str:
+    return canonical_hash(payload.model_dump(mode="json"))
+
+
+def precompute_key(req: GenerateInsightsRequest) -> str:
+    rc = req.request_context
+    return ":".join(
+        [
+            req.payload.user.customer_id,
+            rc.placement.value,
+            rc.trigger.value,
+            (rc.focus_ticker or "-").upper(),
+        ]
+    )
+
+
+class PrecomputeStore:
+    """
+    Precomputed responses keyed by customer/placement/trigger/focus ticker.
+    An entry is served only while it is inside its validity window (the TTL)
+    and the request's payload hashes to the same fingerprint it was built from.
+    """
+
+    def __init__(self, cache: TieredCache, validity_s: float) -> None:
+        self.cache = cache
+        self.validity_s = validity_s
+
+    def eligible(self, req: GenerateInsightsRequest) -> bool:
+        return (
+            settings.precompute_enabled
+            and req.request_context.placement.value in settings.precompute_placements_list
+        )
+
+    def put(self, req: GenerateInsightsRequest, resp: GenerateInsightsResponse) -> None:
+        self.cache.set(
+            precompute_key(req),
+            {
+                "payload_hash": payload_fingerprint(req.payload),
+                "computed_at": datetime.now(timezone.utc).isoformat(),
+                "response": resp.model_dump(mode="json"),
+            },
+            self.validity_s,
+        )
+
+    def lookup(self, req: GenerateInsightsRequest) -> GenerateInsightsResponse | None:
+        if not self.eligible(req):
+            return None
+
+        entry = self.cache.get(precompute_key(req))
+        if not entry or entry.get("payload_hash") != payload_fingerprint(req.payload):
+            return None
+
+        resp = GenerateInsightsResponse.model_validate(entry["response"])
+
+        # Headlines the user has already seen are dropped at serve time, since
+        # recent_headlines is not part of the key.
+        recent = set(req.request_context.recent_headlines or [])
+        kept = [i for i in resp.insights if i.headline not in recent]
+        for priority, insight in enumerate(kept):
+            insight.priority = priority
+
+        trace_id = f"trace_{uuid.uuid4()}"
+        logger.info(
+            "[%s] served precomputed insights=%d computed_at=%s source_trace=%s",
+            trace_id,
+            len(kept),
+            entry.get("computed_at"),
+            resp.audit.trace_id,
+        )
+        resp.insights = kept
+        resp.audit.trace_id = trace_id
+        return resp
+
+
+precompute_store = PrecomputeStore(
+    TieredCache(
+        "precompute",
+        max_entries=10_000,
+        shared=build_cache_backend(settings.precompute_store_url),
+    ),
+    validity_s=settings.precompute_validity_s,
+)
@@ -0,0 +1,518 @@
+# app/engine/realize.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List
+
+from app.api.schemas import RequestContext
+from app.core.config import settings
+from app.core.logging import safe_sample
+from app.core.metrics import PROMPT_FACT_TOKENS, REALIZE_ABORTED_TOTAL, StageTimings, maybe_span
+from app.core.resilience import UpstreamUnavailable
+from app.core.safety import check_non_advisory, enforce_non_advisory_or_raise
+from app.engine.signals import SignalBundle
+from app.llm.base import LLMProvider
+from app.llm.cache import cached_arealize, cached_realize, verdict_cache
+from app.llm.compaction import compact_facts
+from app.llm.streaming import FieldCheck, RealizeAborted
+
+logger = logging.getLogger("cc.realize")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.llm_max_workers,
+    thread_name_prefix="cc-llm",
+)
+
+
+@dataclass(frozen=True)
+class RealizedBundle:
+    bundle: SignalBundle
+    realized: Dict[str, str]
+    verdict: Dict[str, str]
+
+
+def judge_text(realized: Dict[str, str]) -> str:
+    return (
+        f'{realized["headline"]}\n'
+        f'{realized["explanation"]}\n'
+        f'{realized["personal_relevance"]}'
+    )
+
+
+def _compacted(bundle: SignalBundle, trace_id: str) -> List[str]:
+    if not settings.fact_compaction_enabled:
+        return bundle.facts
+    compacted = compact_facts(
+        bundle.facts,
+        budget_tokens=settings.fact_token_budget,
+        max_fact_tokens=settings.fact_max_tokens,
+        dedup_threshold=settings.fact_dedup_threshold,
+    )
+    PROMPT_FACT_TOKENS.labels(phase="before").observe(compacted.tokens_before)
+    PROMPT_FACT_TOKENS.labels(phase="after").observe(compacted.tokens_after)
+    logger.info(
+        "[%s] facts compacted kind=%s tokens=%d->%d deduped=%d dropped=%d",
+        trace_id,
+        bundle.kind,
+        compacted.tokens_before,
+        compacted.tokens_after,
+        compacted.deduped,
+        compacted.dropped,
+    )
+    return compacted.facts
+
+
+def realize_checked(
+    llm: LLMProvider,
+    bundle: SignalBundle,
+    rc: RequestContext,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> Dict[str, str] | None:
+    """
+    realize -> repeat check -> safety for one bundle.
+    Returns None when the headline repeats one the user has seen, or when the
+    LLM upstream is refusing calls and nothing is cached for this bundle. A
+    cached realization the user has already seen is realized afresh.
+    """
+    payload = _realize_payload(bundle, trace_id)
+    on_field = _field_check(rc)
+    shared = _shareable(on_field, rc)
+    recent = set(rc.recent_headlines or [])
+
+    for attempt in range(settings.realize_abort_retries + 1):
+        try:
+            with maybe_span(timings, "realize", bundle.kind):
+                realized = cached_realize(
+                    llm, payload, on_field, single_flight=shared, recent_headlines=recent
+                )
+        except RealizeAborted as e:
+            if _retry_after_abort(e, attempt, bundle, trace_id):
+                continue
+            return None
+        except UpstreamUnavailable as e:
+            logger.warning("[%s] realize skipped kind=%s: %s", trace_id, bundle.kind, e)
+            return None
+        except Exception:
+            logger.exception("[%s] llm.realize failed", trace_id)
+            raise
+        return _check_realized(realized, rc, trace_id)
+    return None
+
+
+async def arealize_checked(
+    llm: LLMProvider,
+    bundle: SignalBundle,
+    rc: RequestContext,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> Dict[str, str] | None:
+    """Async realize_checked."""
+    payload = _realize_payload(bundle, trace_id)
+    on_field = _field_check(rc)
+    shared = _shareable(on_field, rc)
+    recent = set(rc.recent_headlines or [])
+
+    for attempt in range(settings.realize_abort_retries + 1):
+        try:
+            with maybe_span(timings, "realize", bundle.kind):
+                realized = await cached_arealize(
+                    llm, payload, on_field, single_flight=shared, recent_headlines=recent
+                )
+        except RealizeAborted as e:
+            if _retry_after_abort(e, attempt, bundle, trace_id):
+                continue
+            return None
+        except UpstreamUnavailable as e:
+            logger.warning("[%s] realize skipped kind=%s: %s", trace_id, bundle.kind, e)
+            return None
+        except Exception:
+            logger.exception("[%s] llm.realize failed", trace_id)
+            raise
+        return _check_realized(realized, rc, trace_id)
+    return None
+
+
+def _field_check(rc: RequestContext) -> FieldCheck | None:
+    """
+    The checks _check_realized applies to a finished realization, run on each
+    field as it streams in so a doomed generation can be cancelled early.
+    """
+    if not settings.realize_streaming_enabled:
+        return None
+    recent = set(rc.recent_headlines or [])
+
+    def check(field: str, value: str) -> None:
+        if field == "headline" and value in recent:
+            raise RealizeAborted("repeat", field)
+        if field in ("headline", "explanation", "personal_relevance"):
+            res = check_non_advisory([value])
+            if not res.ok:
+                raise RealizeAborted("policy", field, "; ".join(res.reasons))
+
+    return check
+
+
+def _shareable(on_field: FieldCheck | None, rc: RequestContext) -> bool:
+    """
+    Whether this realization may share a compute with other requests for the
+    same facts. The policy check gives every caller the same answer; the repeat
+    check is this user's own, and its abort must not reach anyone else.
+    """
+    return on_field is None or not rc.recent_headlines
+
+
+def _retry_after_abort(e: RealizeAborted, attempt: int, bundle: SignalBundle, trace_id: str) -> bool:
+    """
+    True to realize the bundle again. A repeat would come back the same, so
+    the bundle is skipped; a policy hit is retried and, once retries run out,
+    raised as the policy violation the finished-result check would raise.
+    """
+    REALIZE_ABORTED_TOTAL.labels(reason=e.reason).inc()
+    logger.info(
+        "[%s] realize aborted kind=%s reason=%s field=%s attempt=%d",
+        trace_id,
+        bundle.kind,
+        e.reason,
+        e.field,
+        attempt + 1,
+    )
+    if e.reason != "policy":
+        logger.info("[%s] skipped repeated headline", trace_id)
+        return False
+    if attempt < settings.realize_abort_retries:
+        return True
+    raise ValueError("Non-advisory policy violation: " + e.detail) from e
+
+
+def _realize_payload(bundle: SignalBundle, trace_id: str) -> Dict[str, Any]:
+    logger.info(
+        "[%s] bundle kind=%s facts=%d",
+        trace_id,
+        bundle.kind,
+        len(bundle.facts),
+    )
+    return {
+        "facts": _compacted(bundle, trace_id),
+        "allowed_claims": [],
+        "audience": "long-term investor",
+        "style": "educational exploration",
+    }
+
+
+def _check_realized(realized: Dict[str, str], rc: RequestContext, trace_id: str) -> Dict[str, str] | None:
+    logger.info(
+        "[%s] realized keys=%s headline=%s",
+        trace_id,
+        list(realized.keys()),
+        safe_sample(realized.get("headline"), 120),
+    )
+
+    if realized.get("headline") in (rc.recent_headlines or []):
+        logger.info("[%s] skipped repeated headline", trace_id)
+        return None
+
+    enforce_non_advisory_or_raise(
+        [
+            realized["headline"],
+            realized["explanation"],
+            realized["personal_relevance"],
+        ]
+    )
+    return realized
+
+
+def _judge_unavailable(e: UpstreamUnavailable, trace_id: str) -> Dict[str, str]:
+    """Fail closed: nothing unjudged is shown while the judge upstream is refusing calls."""
+    logger.warning("[%s] judge unavailable, blocking: %s", trace_id, e)
+    return {"verdict": "BLOCK", "reason": f"judge unavailable ({e.reason})"}
+
+
+def _accept(
+    llm: LLMProvider,
+    bundle: SignalBundle,
+    realized: Dict[str, str],
+    verdict: Dict[str, str],
+    trace_id: str,
+) -> RealizedBundle | None:
+    logger.info(
+        "[%s] llm=%s judge verdict=%s reason=%s",
+        trace_id,
+        llm.name,
+        verdict.get("verdict"),
+        safe_sample(verdict.get("reason"), 160),
+    )
+
+    if verdict.get("verdict") != "PASS":
+        logger.warning(
+            "[%s] insight blocked by judge reason=%s",
+            trace_id,
+            verdict.get("reason"),
+        )
+        return None
+
+    return RealizedBundle(bundle=bundle, realized=realized, verdict=verdict)
+
+
+def realize_bundle(
+    llm: LLMProvider,
+    bundle: SignalBundle,
+    rc: RequestContext,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> RealizedBundle | None:
+    """
+    realize -> repeat check -> safety -> judge for one bundle.
+    Returns None when the insight is skipped (repeat, LLM upstream refusing
+    calls) or blocked by the judge (which fails closed when its upstream is
+    refusing calls); policy violations and other LLM errors propagate.
+    """
+    realized = realize_checked(llm, bundle, rc, trace_id, timings)
+    if realized is None:
+        return None
+
+    try:
+        with maybe_span(timings, "judge", bundle.kind):
+            verdict = verdict_cache.judge(llm, judge_text(realized))
+    except UpstreamUnavailable as e:
+        verdict = _judge_unavailable(e, trace_id)
+    except Exception:
+        logger.exception("[%s] llm.judge failed", trace_id)
+        raise
+
+    return _accept(llm, bundle, realized, verdict, trace_id)
+
+
+def _run_bounded(fn: Callable[[SignalBundle], Any], bundles: List[SignalBundle], cap: int) -> List[Any]:
+    """
+    Applies fn to every bundle on the shared pool, at most `cap` at a time,
+    returning results in input order. If any call raises, no further bundles
+    are started and the first failure in bundle order is re-raised once
+    in-flight work has settled.
+    """
+    outcomes: Dict[int, Any] = {}
+    running: Dict[Future, int] = {}
+    queue = list(enumerate(bundles))
+    failed = False
+
+    while running or (queue and not failed):
+        while queue and not failed and len(running) < cap:
+            i, bundle = queue.pop(0)
+            running[_executor.submit(fn, bundle)] = i
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for fut in done:
+            i = running.pop(fut)
+            try:
+                outcomes[i] = fut.result()
+            except BaseException as e:
+                outcomes[i] = e
+                failed = True
+
+    results: List[Any] = []
+    for i in sorted(outcomes):
+        out = outcomes[i]
+        if isinstance(out, BaseException):
+            raise out
+        results.append(out)
+    return results
+
+
+def realize_bundles(
+    llm: LLMProvider,
+    bundles: List[SignalBundle],
+    rc: RequestContext,
+    trace_id: str,
+    *,
+    max_concurrency: int | None = None,
+    judge_mode: str | None = None,
+    timings: StageTimings | None = None,
+) -> List[RealizedBundle]:
+    """
+    Realizes every bundle concurrently (at most `max_concurrency` at a time)
+    and returns the accepted ones in input (priority) order.
+
+    judge_mode "per_insight" judges inside each bundle's chain; "batch" judges
+    all surviving insights together in a single LLM call after realization.
+    """
+    cap = max(1, max_concurrency or settings.llm_max_concurrency)
+    mode = judge_mode or settings.judge_mode
+
+    if mode == "per_insight":
+        outcomes = _run_bounded(lambda b: realize_bundle(llm, b, rc, trace_id, timings), bundles, cap)
+        return [o for o in outcomes if o is not None]
+
+    realized_list = _run_bounded(lambda b: realize_checked(llm, b, rc, trace_id, timings), bundles, cap)
+    pairs = [(b, r) for b, r in zip(bundles, realized_list) if r is not None]
+    if not pairs:
+        return []
+
+    try:
+        with maybe_span(timings, "judge", "batch"):
+            verdicts = verdict_cache.judge_many(llm, [judge_text(r) for _, r in pairs])
+    except UpstreamUnavailable as e:
+        verdicts = [_judge_unavailable(e, trace_id)] * len(pairs)
+    except Exception:
+        logger.exception("[%s] llm.judge_batch failed", trace_id)
+        raise
+
+    results: List[RealizedBundle] = []
+    for (bundle, realized), verdict in zip(pairs, verdicts):
+        rb = _accept(llm, bundle, realized, verdict, trace_id)
+        if rb is not None:
+            results.append(rb)
+    return results
+
+
+def iter_realize_bundles(
+    llm: LLMProvider,
+    bundles: List[SignalBundle],
+    rc: RequestContext,
+    trace_id: str,
+    *,
+    max_concurrency: int | None = None,
+    timings: StageTimings | None = None,
+) -> Iterator[RealizedBundle]:
+    """
+    Streaming form of realize_bundles: each bundle runs its full
+    realize -> safety -> judge chain and accepted results are yielded in
+    completion order. Failures stop new bundles from starting and are raised
+    once nothing accepted is left to yield.
+    """
+    cap = max(1, max_concurrency or settings.llm_max_concurrency)
+    running: set[Future] = set()
+    queue = list(bundles)
+    error: BaseException | None = None
+
+    while running or (queue and error is None):
+        while queue and error is None and len(running) < cap:
+            bundle = queue.pop(0)
+            running.add(_executor.submit(realize_bundle, llm, bundle, rc, trace_id, timings))
+
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for fut in done:
+            try:
+                rb = fut.result()
+            except BaseException as e:
+                error = error or e
+                continue
+            if rb is not None:
+                yield rb
+
+    if error is not None:
+        raise error
+
+
+async def arealize_bundle(
+    llm: LLMProvider,
+    bundle: SignalBundle,
+    rc: RequestContext,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> RealizedBundle | None:
+    """Async realize_bundle."""
+    realized = await arealize_checked(llm, bundle, rc, trace_id, timings)
+    if realized is None:
+        return None
+
+    try:
+        with maybe_span(timings, "judge", bundle.kind):
+            verdict = await verdict_cache.ajudge(llm, judge_text(realized))
+    except UpstreamUnavailable as e:
+        verdict = _judge_unavailable(e, trace_id)
+    except Exception:
+        logger.exception("[%s] llm.judge failed", trace_id)
+        raise
+
+    return _accept(llm, bundle, realized, verdict, trace_id)
+
+
+async def _arun_bounded(
+    fn: Callable[[SignalBundle], Awaitable[Any]],
+    bundles: List[SignalBundle],
+    cap: int,
+) -> List[Any]:
+    """
+    _run_bounded on the event loop: same ordering and failure rules. If this
+    coroutine is cancelled (client gone, deadline hit), the bundles still in
+    flight are cancelled too rather than left holding LLM capacity.
+    """
+    outcomes: Dict[int, Any] = {}
+    running: Dict[asyncio.Task, int] = {}
+    queue = list(enumerate(bundles))
+    failed = False
+
+    try:
+        while running or (queue and not failed):
+            while queue and not failed and len(running) < cap:
+                i, bundle = queue.pop(0)
+                running[asyncio.ensure_future(fn(bundle))] = i
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = running.pop(task)
+                try:
+                    outcomes[i] = task.result()
+                except BaseException as e:
+                    outcomes[i] = e
+                    failed = True
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    results: List[Any] = []
+    for i in sorted(outcomes):
+        out = outcomes[i]
+        if isinstance(out, BaseException):
+            raise out
+        results.append(out)
+    return results
+
+
+async def arealize_bundles(
+    llm: LLMProvider,
+    bundles: List[SignalBundle],
+    rc: RequestContext,
+    trace_id: str,
+    *,
+    max_concurrency: int | None = None,
+    judge_mode: str | None = None,
+    timings: StageTimings | None = None,
+) -> List[RealizedBundle]:
+    """
+    Async realize_bundles. Providers with native async calls never leave the
+    event loop; others run their sync calls on worker threads.
+    """
+    cap = max(1, max_concurrency or settings.llm_max_concurrency)
+    mode = judge_mode or settings.judge_mode
+
+    if mode == "per_insight":
+        outcomes = await _arun_bounded(lambda b: arealize_bundle(llm, b, rc, trace_id, timings), bundles, cap)
+        return [o for o in outcomes if o is not None]
+
+    realized_list = await _arun_bounded(lambda b: arealize_checked(llm, b, rc, trace_id, timings), bundles, cap)
+    pairs = [(b, r) for b, r in zip(bundles, realized_list) if r is not None]
+    if not pairs:
+        return []
+
+    try:
+        with maybe_span(timings, "judge", "batch"):
+            verdicts = await verdict_cache.ajudge_many(llm, [judge_text(r) for _, r in pairs])
+    except UpstreamUnavailable as e:
+        verdicts = [_judge_unavailable(e, trace_id)] * len(pairs)
+    except Exception:
+        logger.exception("[%s] llm.judge_batch failed", trace_id)
+        raise
+
+    results: List[RealizedBundle] = []
+    for (bundle, realized), verdict in zip(pairs, verdicts):
+        rb = _accept(llm, bundle, realized, verdict, trace_id)
+        if rb is not None:
+            results.append(rb)
+    return results
@@ -4,6 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple
 
+from app.engine.holdings import HoldingsFrame, holdings_frame
+from app.engine.index import item_index
 from app.providers.base import ProviderResponse
 
 
@@ -14,6 +16,18 @@ class SignalBundle:
     citations: list
 
 
+def _top_tickers_fact(frame: HoldingsFrame, k: int = 5) -> str | None:
+    tickers = [t for t in frame.tickers[frame.top_k(k)] if t]
+    if not tickers:
+        return None
+    return f"Top holdings by value include: {', '.join(tickers)}."
+
+
+def _largest_share_pct(frame: HoldingsFrame) -> float | None:
+    share = frame.top_share()
+    return share * 100 if share is not None else None
+
+
 def _dedupe_and_cap_citations(citations: list, cap: int = 5) -> list:
     seen = set()
     out = []
@@ -39,19 +53,11 @@ def build_positions_ticker_signals(
     if not focus_ticker:
         return None
 
-    # Pull provider items that are relevant to focus_ticker
-    matched_items = []
     for p in provider_payloads:
         all_citations.extend(p.citations or [])
-        for it in (p.items or []):
-            sym = (it.extra or {}).get("symbol")
-            if sym and sym.upper() == focus_ticker.upper():
-                matched_items.append(it)
-            else:
-                # fallback: title/summary contains ticker
-                blob = f"{it.title} {it.summary}".lower()
-                if focus_ticker.lower() in blob:
-                    matched_items.append(it)
+
+    # Provider items tagged with, cashtagging or naming focus_ticker
+    matched_items = item_index(context, provider_payloads).for_symbol(focus_ticker)
 
     if matched_items:
         facts.append(f"User is viewing ticker {focus_ticker}.")
@@ -76,14 +82,15 @@ def build_performance_signals(context: Dict[str, Any]) -> SignalBundle:
     facts: List[str] = []
     facts.append("This insight is for interpreting portfolio performance context (educational).")
 
-    total = float(context.get("holdings_total_value") or 0)
+    frame = holdings_frame(context)
+    total = frame.total_value
     if total > 0:
         facts.append(f"Tracked holdings total value is approximately {total:.0f}.")
-    top = context.get("top_holdings") or []
-    if top:
-        facts.append(f"Top holdings by value include: {', '.join([h['ticker'] for h in top if h.get('ticker')][:5])}.")
-        if top[0].get("value") is not None and total > 0:
-            pct = (float(top[0]["value"]) / total) * 100
+    top_fact = _top_tickers_fact(frame)
+    if top_fact:
+        facts.append(top_fact)
+        pct = _largest_share_pct(frame)
+        if pct is not None:
             facts.append(f"Largest holding is about {pct:.0f}% of tracked holdings value.")
 
     div = context.get("dividend_profile") or {}
@@ -114,15 +121,14 @@ def build_goal_portfolio_signals(context: Dict[str, Any]) -> SignalBundle:
         facts.append(f"Total investable assets are approximately {context['total_investable_assets']:.0f}.")
 
     # Holdings framing
-    top = context.get("top_holdings") or []
-    if top:
-        tickers = [h["ticker"] for h in top if h.get("ticker")]
-        facts.append(f"Top holdings by value include: {', '.join(tickers[:5])}.")
+    frame = holdings_frame(context)
+    top_fact = _top_tickers_fact(frame)
+    if top_fact:
+        facts.append(top_fact)
 
         # Concentration
-        total_holdings_value = float(context.get("holdings_total_value") or 0)
-        if total_holdings_value > 0 and top[0].get("value") is not None:
-            pct = (float(top[0]["value"]) / total_holdings_value) * 100
+        pct = _largest_share_pct(frame)
+        if pct is not None:
             facts.append(f"Largest holding is about {pct:.0f}% of tracked holdings value.")
 
     # Dividend profile
@@ -143,41 +149,28 @@ def build_market_trend_signals(
     facts: List[str] = []
     all_citations = []
 
-    tickers = set(context.get("tickers") or [])
+    index = item_index(context, provider_payloads)
+    tickers = list(dict.fromkeys(holdings_frame(context).tickers.tolist()))
 
-    # Aggregate Benzinga: simple theme counts (no made-up %)
-    benz_items = []
     for p in provider_payloads:
         all_citations.extend(p.citations or [])
-        if p.provider == "benzinga":
-            benz_items.extend(p.items or [])
+
+    # Aggregate Benzinga: simple theme counts (no made-up %)
+    benz_items = index.items_for("benzinga")
 
     if benz_items:
         facts.append(f"Benzinga returned {len(benz_items)} recent items related to tickers the user holds.")
-        # theme hints via keywords
-        text_blobs = " ".join([(i.title or "") + " " + (i.summary or "") for i in benz_items]).lower()
-        for theme, keywords in [
-            ("dividends/income", ["dividend", "yield", "income"]),
-            ("ETFs/index exposure", ["etf", "index", "s&p", "vanguard"]),
-            ("earnings", ["earnings", "guidance", "revenue"]),
-            ("rates/macro", ["rates", "fed", "inflation"]),
-        ]:
-            if any(k in text_blobs for k in keywords):
-                facts.append(f"Recent coverage mentions themes around {theme}.")
+        # theme hints via the lexicon postings
+        for theme in index.themes(provider="benzinga"):
+            facts.append(f"Recent coverage mentions themes around {theme}.")
 
         # ticker presence
-        mentioned = []
-        for t in list(tickers)[:10]:
-            if t.lower() in text_blobs:
-                mentioned.append(t)
+        mentioned = index.symbols_mentioned(tickers, provider="benzinga")
         if mentioned:
             facts.append(f"Tickers referenced in recent items include: {', '.join(mentioned[:5])}.")
 
     # Aggregate AlphaVantage: price context (range/move)
-    av_items = []
-    for p in provider_payloads:
-        if p.provider == "alphavantage":
-            av_items.extend(p.items or [])
+    av_items = index.items_for("alphavantage")
 
     if av_items:
         facts.append(f"Alpha Vantage provided recent price context for {len(av_items)} held tickers.")
@@ -197,12 +190,12 @@ def build_inactive_activation_signals(context: Dict[str, Any]) -> SignalBundle:
     facts: List[str] = []
     facts.append("User archetype is INACTIVE (low recent engagement).")
 
-    if context.get("holdings_count", 0) == 0:
+    holdings_count = len(holdings_frame(context))
+    if holdings_count == 0:
         facts.append("User currently has no tracked positions.")
         facts.append("Educational note: funding an account means adding cash; investing means owning positions like stocks or funds.")
         facts.append("Educational note: diversification refers to spreading exposure across multiple holdings to reduce concentration risk.")
     else:
-        holdings_count = context.get("holdings_count")
         facts.append(f"User has {holdings_count} tracked positions.")
         facts.append("Educational note: returning after inactivity often starts with a quick check of goal progress and what you currently hold.")
         facts.append("Educational note: concentration means a large share of tracked value sits in one holding; diversification is spreading exposure across multiple holdings.")
@@ -216,9 +209,9 @@ def build_everyday_performance_signals(context: Dict[str, Any]) -> SignalBundle:
     if context.get("goal_progress_pct") is not None:
         facts.append(f"Retirement goal progress is {context['goal_progress_pct']:.0f}%.")
 
-    top = context.get("top_holdings") or []
-    if top:
-        facts.append(f"Top holdings by value include: {', '.join([h['ticker'] for h in top if h.get('ticker')][:5])}.")
+    top_fact = _top_tickers_fact(holdings_frame(context))
+    if top_fact:
+        facts.append(top_fact)
     return SignalBundle(kind="everyday_performance", facts=facts, citations=[])
 
 
@@ -238,13 +231,18 @@ def build_advanced_performance_signals(context: Dict[str, Any]) -> SignalBundle:
     facts: List[str] = []
     facts.append("User archetype is ADVANCED (experienced investor).")
     facts.append("Educational note: advanced investors often review performance drivers, concentration, and risk exposure across holdings.")
-    top = context.get("top_holdings") or []
-    if top:
-        facts.append(f"Top holdings by value include: {', '.join([h['ticker'] for h in top if h.get('ticker')][:5])}.")
-    total = float(context.get("holdings_total_value") or 0)
-    if total > 0 and top and top[0].get("value") is not None:
-        pct = (float(top[0]["value"]) / total) * 100
+    frame = holdings_frame(context)
+    top_fact = _top_tickers_fact(frame)
+    if top_fact:
+        facts.append(top_fact)
+    pct = _largest_share_pct(frame) if top_fact else None
+    if pct is not None:
         facts.append(f"Largest holding is about {pct:.0f}% of tracked holdings value (concentration signal).")
+    if len(frame) > 1 and frame.total_value > 0:
+        # 1/HHI reads as "how many equal-sized holdings this portfolio behaves like".
+        facts.append(f"Holdings concentration is equivalent to about {1 / frame.hhi():.1f} equally weighted positions.")
+        mix = ", ".join(f"{cat} {w * 100:.0f}%" for cat, w in list(frame.category_weights().items())[:4])
+        facts.append(f"Tracked value by category: {mix}.")
     return SignalBundle(kind="advanced_performance", facts=facts, citations=[])
 
 
@@ -0,0 +1,432 @@
+# app/engine/templates.py
+"""
+Deterministic realization from pre-approved templates.
+
+Bundles built only from the user's payload (goal, positions, performance and
+inactivity bundles) can be written without an LLM. Each kind has a list of
+templates, optionally narrowed to an archetype and/or asset tier; the most
+specific lists are tried first. A template is used when every slot it names
+has a value for this user, its `when` condition holds, and its headline is
+not one the user has just seen. Every kind ends with a slot-free template,
+so a payload-only bundle always renders.
+
+The wording is reviewed up front, so template insights skip the judge. They
+still go through the compliance scanner at render time, because the phrase
+policy can change under a running app. Requests are routed here by
+placement/trigger (settings.template_triggers / template_placements); those
+requests skip provider fan-out too, so market and ticker bundles, which
+depend on provider content, are not planned.
+"""
+
+from __future__ import annotations
+
+import logging
+import string
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.api.schemas import RequestContext
+from app.core.config import settings
+from app.core.metrics import StageTimings, maybe_span
+from app.core.safety import check_non_advisory
+from app.engine.holdings import holdings_frame
+from app.engine.realize import RealizedBundle
+from app.engine.signals import SignalBundle
+
+logger = logging.getLogger("cc.templates")
+
+_FIELDS = ("headline", "explanation", "personal_relevance")
+
+
+@dataclass(frozen=True)
+class InsightTemplate:
+    id: str
+    headline: str
+    explanation: str
+    personal_relevance: str
+    when: Optional[Callable[[Mapping[str, Any]], bool]] = None
+    slots: frozenset[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        names = {
+            name
+            for text in (self.headline, self.explanation, self.personal_relevance)
+            for _, name, _, _ in string.Formatter().parse(text)
+            if name
+        }
+        object.__setattr__(self, "slots", frozenset(names))
+
+    def applies(self, slots: Mapping[str, Any]) -> bool:
+        if any(slots.get(name) is None for name in self.slots):
+            return False
+        return self.when is None or self.when(slots)
+
+    def render(self, slots: Mapping[str, Any]) -> Dict[str, str]:
+        return {
+            "headline": self.headline.format_map(slots),
+            "explanation": self.explanation.format_map(slots),
+            "personal_relevance": self.personal_relevance.format_map(slots),
+        }
+
+
+def _no_positions(s: Mapping[str, Any]) -> bool:
+    return s.get("holdings_count") == 0
+
+
+def _has_positions(s: Mapping[str, Any]) -> bool:
+    return bool(s.get("holdings_count"))
+
+
+def _few_positions(s: Mapping[str, Any]) -> bool:
+    return 0 < (s.get("holdings_count") or 0) <= 5
+
+
+# (kind, archetype, tier) -> templates in preference order; None matches any.
+# Archetypes are EVERYDAY/ADVANCED and tiers UNDER_250K/FROM_250K_TO_1M/OVER_1M
+# (app.engine.normalize); the (kind, None, None) list always ends generic.
+# Archetype variants exist only for kinds plan_bundles plans for more than
+# one archetype: goal_portfolio, not the per-archetype kinds, nor
+# inactive_activation/performance, which it plans for no archetype normalize
+# produces.
+TEMPLATES: Dict[Tuple[str, Optional[str], Optional[str]], Tuple[InsightTemplate, ...]] = {
+    ("goal_portfolio", "ADVANCED", None): (
+        InsightTemplate(
+            "goal_portfolio.advanced.effective_count",
+            "Your portfolio behaves like about {equiv_positions} equally weighted positions",
+            "The effective position count, the inverse of the Herfindahl index, condenses concentration "
+            "into one number. Next to goal progress of {goal_progress_pct}%, it shows how much the path "
+            "to the goal rests on a few holdings.",
+            "With {holdings_count} tracked positions and a {retirement_goal_year} target date, this ties "
+            "the structure of your portfolio to your plan.",
+        ),
+    ),
+    ("goal_portfolio", "EVERYDAY", None): (
+        InsightTemplate(
+            "goal_portfolio.everyday.progress",
+            "You are {goal_progress_pct}% of the way to your retirement goal",
+            "Progress toward a goal reflects both what has been added over time and how investments have performed.",
+            "Your {retirement_goal_year} goal date is the timeframe this progress is measured against.",
+        ),
+    ),
+    ("goal_portfolio", None, "UNDER_250K"): (
+        InsightTemplate(
+            "goal_portfolio.under_250k.building",
+            "Building toward your retirement goal: {goal_progress_pct}% so far",
+            "At earlier stages, regular contributions often account for a large part of progress, "
+            "alongside market returns.",
+            "Seeing both parts can make month-to-month changes toward your {retirement_goal_year} goal easier to read.",
+        ),
+    ),
+    ("goal_portfolio", None, "FROM_250K_TO_1M"): (
+        InsightTemplate(
+            "goal_portfolio.mid.spread",
+            "How value is spread across your {holdings_count} holdings",
+            "As a portfolio grows, many investors look at how value is spread across holdings and accounts, "
+            "not only at the total.",
+            "Your largest position, {top_ticker}, is about {largest_pct}% of tracked value.",
+        ),
+    ),
+    ("goal_portfolio", None, "OVER_1M"): (
+        InsightTemplate(
+            "goal_portfolio.over_1m.dividends",
+            "Your holdings carry a weighted dividend yield of about {dividend_yield_pct}%",
+            "A weighted dividend yield combines each holding's yield by its share of tracked value. "
+            "It describes the income side of a portfolio, separate from price changes.",
+            "With {holdings_count} tracked positions, this figure summarizes how much of your "
+            "portfolio's return profile comes from distributions.",
+        ),
+    ),
+    ("goal_portfolio", None, None): (
+        InsightTemplate(
+            "goal_portfolio.progress",
+            "Your retirement goal is {goal_progress_pct}% of the way there",
+            "Goal progress compares what is set aside today with the target for the goal. "
+            "Many investors look at how it moves over months rather than day to day.",
+            "Your {retirement_goal_year} target date sets the pace against which this progress is read.",
+        ),
+        InsightTemplate(
+            "goal_portfolio.concentration",
+            "{top_ticker} is about {largest_pct}% of your tracked holdings",
+            "Concentration describes how much of a portfolio's value sits in one position. "
+            "The larger that share, the more that holding's moves shape the overall value.",
+            "Knowing this share can help put day-to-day changes in {top_ticker} in context.",
+        ),
+        InsightTemplate(
+            "goal_portfolio.top_holdings",
+            "Your largest holdings at a glance",
+            "Your top holdings by value are {top_tickers}. "
+            "Looking at which positions carry the most value is a common first step in reviewing a portfolio.",
+            "These holdings have the biggest effect on how your portfolio moves.",
+        ),
+        InsightTemplate(
+            "goal_portfolio.generic",
+            "A quick look at your goals and portfolio",
+            "Reviewing goal progress alongside what you hold is a common way to keep a plan in view.",
+            "Checking in from time to time helps connect your holdings to the goals they serve.",
+        ),
+    ),
+    ("inactive_activation", None, None): (
+        InsightTemplate(
+            "inactive_activation.no_positions",
+            "Getting started: funding versus investing",
+            "Funding an account means adding cash; investing means owning positions such as stocks or funds. "
+            "Diversification refers to spreading exposure across several holdings.",
+            "You have no tracked positions yet, so these basics are a useful starting point.",
+            when=_no_positions,
+        ),
+        InsightTemplate(
+            "inactive_activation.returning",
+            "Welcome back: where things stand",
+            "After time away, many investors start with a check of goal progress and what they currently hold.",
+            "You have {holdings_count} tracked positions to catch up on.",
+            when=_has_positions,
+        ),
+        InsightTemplate(
+            "inactive_activation.generic",
+            "Welcome back",
+            "A brief review of goals and holdings is a common way to pick things up again after time away.",
+            "It can help to see what has changed since you last looked.",
+        ),
+    ),
+    ("everyday_positions", None, "UNDER_250K"): (
+        InsightTemplate(
+            "everyday_positions.under_250k.few",
+            "How {focus_ticker} fits among your {holdings_count} holdings",
+            "In a portfolio with a handful of positions, each one's price moves show up clearly in the total.",
+            "Seeing where {focus_ticker} sits in the mix helps put its daily changes in perspective.",
+            when=_few_positions,
+        ),
+    ),
+    ("everyday_positions", None, "OVER_1M"): (
+        InsightTemplate(
+            "everyday_positions.over_1m.income",
+            "{focus_ticker} and the income side of your portfolio",
+            "Beyond price changes, some holdings pay dividends; together your holdings yield about "
+            "{dividend_yield_pct}%.",
+            "Looking at both price and income gives a fuller picture of what {focus_ticker} adds.",
+        ),
+    ),
+    ("everyday_positions", None, None): (
+        InsightTemplate(
+            "everyday_positions.ticker",
+            "What investors look at when checking {focus_ticker}",
+            "Many investors look at what changed recently, such as news, earnings or interest rates, "
+            "and how that relates to their goals and risk tolerance.",
+            "Seeing how {focus_ticker} fits alongside your other holdings can help interpret its daily moves.",
+        ),
+        InsightTemplate(
+            "everyday_positions.list",
+            "Understanding the role of each holding",
+            "Reviewing concentration and what each position is there for can make daily price moves easier to read.",
+            "You have {holdings_count} tracked positions, each playing a part in your overall mix.",
+            when=_has_positions,
+        ),
+        InsightTemplate(
+            "everyday_positions.generic",
+            "Understanding the role of each holding",
+            "Reviewing concentration and what each position is there for can make daily price moves easier to read.",
+            "Knowing why each holding is in your portfolio helps put its moves in context.",
+        ),
+    ),
+    ("advanced_positions", None, "UNDER_250K"): (
+        InsightTemplate(
+            "advanced_positions.under_250k.sizing",
+            "Reviewing {focus_ticker} in a {holdings_count}-position portfolio",
+            "With fewer positions, scenario analysis for any single holding maps more directly onto the whole.",
+            "Your largest position is about {largest_pct}% of tracked value.",
+            when=_few_positions,
+        ),
+    ),
+    ("advanced_positions", None, "OVER_1M"): (
+        InsightTemplate(
+            "advanced_positions.over_1m.total_return",
+            "Reviewing {focus_ticker} on a total-return basis",
+            "At larger balances, experienced investors often separate price moves from income, with your "
+            "holdings yielding about {dividend_yield_pct}%, alongside catalysts and volatility.",
+            "Your holdings behave like about {equiv_positions} equally weighted positions, which frames "
+            "the weight of {focus_ticker} in the whole.",
+        ),
+    ),
+    ("advanced_positions", None, None): (
+        InsightTemplate(
+            "advanced_positions.ticker_concentration",
+            "Reviewing {focus_ticker}: catalysts, volatility and scenarios",
+            "Experienced investors often review upcoming catalysts such as earnings or macro data, "
+            "recent volatility, and a range of scenarios for a position.",
+            "Your largest holding is about {largest_pct}% of tracked value, which frames how much "
+            "any single position can move the whole.",
+        ),
+        InsightTemplate(
+            "advanced_positions.ticker",
+            "Reviewing {focus_ticker}: catalysts, volatility and scenarios",
+            "Experienced investors often review upcoming catalysts such as earnings or macro data, "
+            "recent volatility, and a range of scenarios for a position.",
+            "Framing {focus_ticker} this way shows how it interacts with the rest of your holdings.",
+        ),
+        InsightTemplate(
+            "advanced_positions.effective_count",
+            "Your holdings behave like about {equiv_positions} equally weighted positions",
+            "The inverse of the Herfindahl index summarizes how evenly value is spread: "
+            "the lower it is relative to the number of holdings, the more concentrated the portfolio.",
+            "You hold {holdings_count} tracked positions, so this compares your actual spread with an even one.",
+        ),
+        InsightTemplate(
+            "advanced_positions.generic",
+            "Concentration and factor exposure across your positions",
+            "Advanced reviews often include concentration checks and awareness of factor or style exposure.",
+            "Looking across positions this way shows where your portfolio's sensitivities sit.",
+        ),
+    ),
+    ("everyday_performance", None, "UNDER_250K"): (
+        InsightTemplate(
+            "everyday_performance.under_250k.contributions",
+            "Performance and contributions behind your {goal_progress_pct}% goal progress",
+            "While balances are still growing, new contributions can move the total as much as market returns do.",
+            "Telling the two apart makes it easier to read how your portfolio is doing.",
+        ),
+    ),
+    ("everyday_performance", None, None): (
+        InsightTemplate(
+            "everyday_performance.progress",
+            "Reading performance against your {goal_progress_pct}% goal progress",
+            "Some investors compare performance with broad indexes, while also tracking progress toward "
+            "their own goals, which can tell a different story.",
+            "Your retirement goal progress is a personal benchmark alongside any index comparison.",
+        ),
+        InsightTemplate(
+            "everyday_performance.generic",
+            "How investors read performance",
+            "Some investors compare performance with broad indexes to give day-to-day moves some context.",
+            "A benchmark comparison is one of several ways to look at how your portfolio is doing.",
+        ),
+    ),
+    ("advanced_performance", None, "OVER_1M"): (
+        InsightTemplate(
+            "advanced_performance.over_1m.income",
+            "Price and income: a weighted dividend yield of about {dividend_yield_pct}%",
+            "Total return combines price changes with distributions; at larger balances the income part "
+            "can be a meaningful share of it.",
+            "Your {holdings_count} tracked positions contribute to both parts.",
+        ),
+    ),
+    ("advanced_performance", None, None): (
+        InsightTemplate(
+            "advanced_performance.concentration",
+            "Performance drivers: your largest holding is about {largest_pct}% of value",
+            "Experienced investors often break performance down by holding to see which positions drive results.",
+            "Your holdings behave like about {equiv_positions} equally weighted positions, "
+            "so a few names can account for much of the movement.",
+        ),
+        InsightTemplate(
+            "advanced_performance.generic",
+            "Looking at performance drivers and risk exposure",
+            "Advanced reviews often attribute performance to individual holdings and check risk exposure across them.",
+            "This view shows which parts of your portfolio account for its moves.",
+        ),
+    ),
+    ("performance", None, None): (
+        InsightTemplate(
+            "performance.concentration",
+            "{top_ticker} is about {largest_pct}% of your tracked holdings",
+            "When one holding carries a large share of value, its price moves weigh heavily on overall performance.",
+            "Keeping this share in mind can help interpret changes in your portfolio's value.",
+        ),
+        InsightTemplate(
+            "performance.generic",
+            "Putting portfolio performance in context",
+            "Performance is easier to interpret alongside what you hold and the goals the portfolio serves.",
+            "Looking at both together gives a fuller picture than a single return figure.",
+        ),
+    ),
+}
+
+
+def use_templates(rc: RequestContext) -> bool:
+    """Whether this placement/trigger is served from templates."""
+    return (
+        settings.template_enabled
+        and rc.trigger.value in settings.template_triggers_list
+        and rc.placement.value in settings.template_placements_list
+    )
+
+
+def template_slots(context: Dict[str, Any], rc: RequestContext) -> Dict[str, Any]:
+    """Slot values from the normalized context; None where the data is missing."""
+    frame = holdings_frame(context)
+    top = [t for t in frame.tickers[frame.top_k(3)] if t] if len(frame) else []
+    share = frame.top_share()
+    goal_year = context.get("retirement_goal_year")
+    div = context.get("dividend_profile") or {}
+    progress = context.get("goal_progress_pct")
+    return {
+        "focus_ticker": (rc.focus_ticker or "").upper() or None,
+        "holdings_count": len(frame),
+        "goal_progress_pct": f"{progress:.0f}" if progress is not None else None,
+        "retirement_goal_year": int(goal_year) if goal_year else None,
+        "top_ticker": top[0] if top else None,
+        "top_tickers": ", ".join(top) if top else None,
+        "largest_pct": f"{share * 100:.0f}" if share is not None and top else None,
+        "dividend_yield_pct": f"{div['weighted_yield'] * 100:.2f}" if div.get("has_dividends") else None,
+        "equiv_positions": f"{1 / frame.hhi():.1f}" if len(frame) > 1 and frame.total_value > 0 else None,
+    }
+
+
+def templates_for(kind: str, archetype: str | None, tier: str | None) -> List[InsightTemplate]:
+    out: List[InsightTemplate] = []
+    for key in ((kind, archetype, tier), (kind, archetype, None), (kind, None, tier), (kind, None, None)):
+        for t in TEMPLATES.get(key, ()):
+            if t not in out:
+                out.append(t)
+    return out
+
+
+def has_templates(kind: str) -> bool:
+    return any(k == kind for k, _, _ in TEMPLATES)
+
+
+def realize_template(
+    bundle: SignalBundle,
+    context: Dict[str, Any],
+    rc: RequestContext,
+    slots: Mapping[str, Any],
+    trace_id: str,
+) -> RealizedBundle | None:
+    """The first applicable, unseen, still-compliant template for the bundle, or None."""
+    recent = set(rc.recent_headlines or [])
+    archetype = (context.get("archetype") or "").strip().upper() or None
+    for template in templates_for(bundle.kind, archetype, context.get("tier")):
+        if not template.applies(slots):
+            continue
+        realized = template.render(slots)
+        if realized["headline"] in recent:
+            continue
+        res = check_non_advisory(realized[f] for f in _FIELDS)
+        if not res.ok:
+            logger.warning("[%s] template=%s blocked by policy: %s", trace_id, template.id, res.reasons)
+            continue
+        logger.info("[%s] template realized kind=%s template=%s", trace_id, bundle.kind, template.id)
+        return RealizedBundle(
+            bundle=bundle,
+            realized=realized,
+            verdict={"verdict": "PASS", "reason": f"pre-approved template {template.id}"},
+        )
+    logger.info("[%s] no template for kind=%s", trace_id, bundle.kind)
+    return None
+
+
+def realize_bundles_from_templates(
+    bundles: List[SignalBundle],
+    context: Dict[str, Any],
+    rc: RequestContext,
+    trace_id: str,
+    timings: StageTimings | None = None,
+) -> List[RealizedBundle]:
+    """realize_bundles without LLM calls: bundles with no usable template are dropped."""
+    slots = template_slots(context, rc)
+    results: List[RealizedBundle] = []
+    for bundle in bundles:
+        with maybe_span(timings, "template", bundle.kind):
+            rb = realize_template(bundle, context, rc, slots, trace_id)
+        if rb is not None:
+            results.append(rb)
+    return results
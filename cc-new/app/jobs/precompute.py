@@ -0,0 +1,138 @@
+# app/jobs/precompute.py
+"""
+Offline precompute of insights per customer and placement.
+
+    python -m app.jobs.precompute snapshots.jsonl --workers 8 \\
+        --placements INVESTMENT_DASHBOARD --trigger APP_OPEN
+
+Each input line is either a full GenerateInsightsRequest or an object with a
+"payload" (PipelinePayload), which is expanded across --placements. Results
+go to the precompute store (PRECOMPUTE_STORE_URL) that the online route reads;
+the job refuses to run without one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List
+
+from app.api.schemas import GenerateInsightsRequest, Placement, Trigger
+from app.core import lifecycle
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.engine.generator import generate_insights_live
+from app.engine.precompute import PrecomputeStore, precompute_store
+
+logger = logging.getLogger("cc.jobs.precompute")
+
+
+@dataclass
+class PrecomputeReport:
+    ok: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+def expand_requests(
+    lines: Iterable[str],
+    placements: List[str],
+    trigger: str = Trigger.APP_OPEN.value,
+) -> Iterator[GenerateInsightsRequest]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        obj = json.loads(line)
+        if "request_context" in obj:
+            yield GenerateInsightsRequest.model_validate(obj)
+            continue
+        for placement in placements:
+            yield GenerateInsightsRequest.model_validate(
+                {
+                    "session_id": f"precompute-{obj['payload']['user']['customer_id']}",
+                    "request_context": {
+                        "placement": Placement(placement).value,
+                        "trigger": trigger,
+                        "focus_ticker": obj.get("focus_ticker"),
+                        "recent_headlines": [],
+                    },
+                    "payload": obj["payload"],
+                }
+            )
+
+
+def run_precompute(
+    requests: Iterable[GenerateInsightsRequest],
+    *,
+    workers: int | None = None,
+    store: PrecomputeStore | None = None,
+) -> PrecomputeReport:
+    store = store or precompute_store
+    report = PrecomputeReport()
+    start = time.monotonic()
+
+    def _one(req: GenerateInsightsRequest) -> None:
+        store.put(req, generate_insights_live(req))
+
+    with ThreadPoolExecutor(max_workers=workers or settings.precompute_workers) as pool:
+        futures = {pool.submit(_one, req): req for req in requests}
+        for fut in as_completed(futures):
+            req = futures[fut]
+            try:
+                fut.result()
+                report.ok += 1
+            except Exception as e:
+                report.failed += 1
+                report.errors.append(f"{req.payload.user.customer_id}/{req.request_context.placement.value}: {e}")
+                logger.exception(
+                    "precompute failed customer_id=%s placement=%s",
+                    req.payload.user.customer_id,
+                    req.request_context.placement.value,
+                )
+
+    report.elapsed_s = time.monotonic() - start
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", help="JSONL of requests or {\"payload\": ...} snapshots")
+    parser.add_argument("--placements", default=settings.precompute_placements)
+    parser.add_argument("--trigger", default=Trigger.APP_OPEN.value)
+    parser.add_argument("--workers", type=int, default=settings.precompute_workers)
+    args = parser.parse_args(argv)
+    if precompute_store.cache.shared is None:
+        # Results would land in this process's LRU and be gone when it exits.
+        parser.error(
+            "PRECOMPUTE_STORE_URL is not set; configure a shared sqlite:/// or redis:// store"
+        )
+
+    setup_logging()
+    lifecycle.startup()
+    try:
+        placements = [p.strip() for p in args.placements.split(",") if p.strip()]
+        with open(args.input, encoding="utf-8") as fh:
+            report = run_precompute(
+                expand_requests(fh, placements, args.trigger),
+                workers=args.workers,
+            )
+    finally:
+        lifecycle.shutdown()
+
+    logger.info(
+        "precompute done ok=%d failed=%d elapsed_s=%.1f",
+        report.ok,
+        report.failed,
+        report.elapsed_s,
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
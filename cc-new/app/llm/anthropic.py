@@ -5,7 +5,55 @@ import json
 import os
 import httpx
 
+from app.core.http import http_pool
 from app.llm.base import LLMProvider
+from app.llm.batch_judge import BATCH_JUDGE_OUTPUT, parse_batch_text, render_batch_items
+from app.llm.compaction import render_facts
+from app.llm.prompt_cache import anthropic_system, record_anthropic_usage
+from app.llm.streaming import FieldCheck, JsonFieldStream, sse_event
+
+REALIZE_SYSTEM = """
+You generate investor-friendly insights for a wealth app.
+
+Style:
+- Concise, confident, consumer-friendly.
+- Phrase anything action-ish as educational exploration (e.g., "Some investors explore...", "It may be useful to learn...").
+- No direct advice or calls to action (no "you should", no "buy/sell", no "% shift").
+- NEVER use these words anywhere: buy, sell, short, long.
+- If you would normally use them, replace with neutral phrasing like:
+  "increase exposure", "reduce exposure", "positioning", "market sentiment".
+- Use ONLY the facts provided. Do not invent numbers.
+
+Return ONLY JSON. The JSON strings must not contain the banned words.
+
+{ "headline": "...", "explanation": "...", "personal_relevance": "..." }
+""".strip()
+
+_JUDGE_RULES = """
+Rules:
+- Educational explanations are allowed.
+- Any advice or call to action is NOT allowed.
+- Even soft suggestions are NOT allowed (e.g., "consider shifting", "you may want to").
+- Analyst ratings/price targets are allowed only as market context, not recommendations.
+""".strip()
+
+JUDGE_SYSTEM = f"""
+You are a compliance reviewer for a financial education product.
+
+{_JUDGE_RULES}
+
+Return ONLY valid JSON (no markdown fences):
+{{ "verdict": "PASS" | "BLOCK", "reason": "..." }}
+""".strip()
+
+JUDGE_BATCH_SYSTEM = f"""
+You are a compliance reviewer for a financial education product.
+Review each item independently.
+
+{_JUDGE_RULES}
+
+{BATCH_JUDGE_OUTPUT}
+""".strip()
 
 
 def _strip_code_fences(text: str) -> str:
@@ -35,11 +83,19 @@ def _strip_code_fences(text: str) -> str:
 class AnthropicProvider(LLMProvider):
     name = "anthropic"
     base_url = "https://api.anthropic.com/v1/messages"
+    model = "claude-sonnet-4-5-20250929"
+    prompt_version = "v3"
 
-    def __init__(self) -> None:
+    def __init__(self, http: httpx.Client | None = None, ahttp: httpx.AsyncClient | None = None) -> None:
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise RuntimeError("ANTHROPIC_API_KEY is not set")
+        self.http = http or http_pool.client(self.name)
+        self._ahttp = ahttp
+
+    @property
+    def ahttp(self) -> httpx.AsyncClient:
+        return self._ahttp or http_pool.async_client(self.name)
 
     def _headers(self) -> dict:
         return {
@@ -55,39 +111,37 @@ class AnthropicProvider(LLMProvider):
         first = blocks[0] if blocks else {}
         return (first.get("text") or "").strip()
 
-    def realize(self, payload: dict) -> dict:
-        prompt = f"""
-You generate investor-friendly insights for a wealth app.
-
-Style:
-- Concise, confident, consumer-friendly.
-- Phrase anything action-ish as educational exploration (e.g., "Some investors explore...", "It may be useful to learn...").
-- No direct advice or calls to action (no "you should", no "buy/sell", no "% shift").
-- NEVER use these words anywhere: buy, sell, short, long.
-- If you would normally use them, replace with neutral phrasing like:
-  "increase exposure", "reduce exposure", "positioning", "market sentiment".
-- Use ONLY the facts provided. Do not invent numbers.
-
-Return ONLY JSON. The JSON strings must not contain the banned words.
-
-
-{{ "headline": "...", "explanation": "...", "personal_relevance": "..." }}
+    def _post(self, op: str, body: dict, timeout: float) -> dict:
+        r = self.http.post(self.base_url, headers=self._headers(), json=body, timeout=timeout)
+        r.raise_for_status()
+        raw = r.json()
+        record_anthropic_usage(self.name, op, raw.get("usage"))
+        return raw
 
-Facts:
-{json.dumps(payload.get("facts", []), indent=2)}
-""".strip()
+    async def _apost(self, op: str, body: dict, timeout: float) -> dict:
+        r = await self.ahttp.post(self.base_url, headers=self._headers(), json=body, timeout=timeout)
+        r.raise_for_status()
+        raw = r.json()
+        record_anthropic_usage(self.name, op, raw.get("usage"))
+        return raw
 
-        body = {
-            "model": "claude-sonnet-4-5-20250929",
-            "max_tokens": 300,
-            "messages": [{"role": "user", "content": prompt}],
+    def _body(self, system: str, user: str, max_tokens: int) -> dict:
+        """Fixed instructions as the (cacheable) system prefix, per-call input as the user turn."""
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": anthropic_system(system),
+            "messages": [{"role": "user", "content": user}],
         }
 
-        r = httpx.post(self.base_url, headers=self._headers(), json=body, timeout=20)
-        r.raise_for_status()
+    def _realize_body(self, payload: dict) -> dict:
+        return self._body(REALIZE_SYSTEM, f"Facts:\n{render_facts(payload.get('facts', []))}", 300)
 
-        raw = r.json()
-        text = _strip_code_fences(self._extract_text(raw))
+    def _parse_realize(self, raw: dict) -> dict:
+        return self._parse_realize_text(self._extract_text(raw))
+
+    def _parse_realize_text(self, text: str) -> dict:
+        text = _strip_code_fences(text)
 
         if not text:
             raise RuntimeError("Anthropic returned empty response")
@@ -97,33 +151,53 @@ Facts:
         except json.JSONDecodeError as e:
             raise RuntimeError(f"Invalid JSON from Anthropic:\n{text}") from e
 
-    def judge(self, text: str) -> dict:
-        prompt = f"""
-You are a compliance reviewer for a financial education product.
-
-Rules:
-- Educational explanations are allowed.
-- Any advice or call to action is NOT allowed.
-- Even soft suggestions are NOT allowed (e.g., "consider shifting", "you may want to").
-- Analyst ratings/price targets are allowed only as market context, not recommendations.
-
-Return ONLY valid JSON (no markdown fences):
-{{ "verdict": "PASS" | "BLOCK", "reason": "..." }}
-
-Text:
-<<<{text}>>>
-""".strip()
-
-        body = {
-            "model": "claude-sonnet-4-5-20250929",
-            "max_tokens": 120,
-            "messages": [{"role": "user", "content": prompt}],
-        }
-
-        r = httpx.post(self.base_url, headers=self._headers(), json=body, timeout=20)
-        r.raise_for_status()
-
-        raw = r.json()
+    def realize(self, payload: dict) -> dict:
+        return self._parse_realize(self._post("realize", self._realize_body(payload), timeout=20))
+
+    async def arealize(self, payload: dict) -> dict:
+        return self._parse_realize(await self._apost("realize", self._realize_body(payload), timeout=20))
+
+    def _stream_event(self, event: dict, fields: JsonFieldStream, on_field: FieldCheck) -> None:
+        kind = event.get("type")
+        if kind == "message_start":
+            record_anthropic_usage(self.name, "realize", (event.get("message") or {}).get("usage"))
+        elif kind == "content_block_delta":
+            for field, value in fields.feed((event.get("delta") or {}).get("text") or ""):
+                on_field(field, value)
+        elif kind == "error":
+            raise RuntimeError(f"Anthropic stream error: {event.get('error')}")
+
+    def realize_stream(self, payload: dict, on_field: FieldCheck) -> dict:
+        """
+        realize over the streaming API, calling on_field as each top-level
+        field closes. An exception from on_field closes the stream, which
+        stops the generation.
+        """
+        body = {**self._realize_body(payload), "stream": True}
+        fields = JsonFieldStream()
+        with self.http.stream("POST", self.base_url, headers=self._headers(), json=body, timeout=20) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                event = sse_event(line)
+                if event is not None:
+                    self._stream_event(event, fields, on_field)
+        return self._parse_realize_text(fields.text)
+
+    async def arealize_stream(self, payload: dict, on_field: FieldCheck) -> dict:
+        body = {**self._realize_body(payload), "stream": True}
+        fields = JsonFieldStream()
+        async with self.ahttp.stream("POST", self.base_url, headers=self._headers(), json=body, timeout=20) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                event = sse_event(line)
+                if event is not None:
+                    self._stream_event(event, fields, on_field)
+        return self._parse_realize_text(fields.text)
+
+    def _judge_body(self, text: str) -> dict:
+        return self._body(JUDGE_SYSTEM, f"Text:\n<<<{text}>>>", 120)
+
+    def _parse_judge(self, raw: dict) -> dict:
         out = _strip_code_fences(self._extract_text(raw))
 
         if not out:
@@ -138,3 +212,21 @@ Text:
         if verdict not in ("PASS", "BLOCK"):
             return {"verdict": "BLOCK", "reason": "Invalid verdict shape"}
         return parsed
+
+    def judge(self, text: str) -> dict:
+        return self._parse_judge(self._post("judge", self._judge_body(text), timeout=20))
+
+    async def ajudge(self, text: str) -> dict:
+        return self._parse_judge(await self._apost("judge", self._judge_body(text), timeout=20))
+
+    def _judge_batch_body(self, texts: list[str]) -> dict:
+        return self._body(JUDGE_BATCH_SYSTEM, render_batch_items(texts), 80 + 100 * len(texts))
+
+    def judge_batch(self, texts: list[str]) -> list[dict]:
+        """Judges every item in one call; returns one verdict per input, in order."""
+        raw = self._post("judge_batch", self._judge_batch_body(texts), timeout=20)
+        return parse_batch_text(_strip_code_fences(self._extract_text(raw)), len(texts))
+
+    async def ajudge_batch(self, texts: list[str]) -> list[dict]:
+        raw = await self._apost("judge_batch", self._judge_batch_body(texts), timeout=20)
+        return parse_batch_text(_strip_code_fences(self._extract_text(raw)), len(texts))
@@ -1,9 +1,69 @@
 #app.llm.base.py
 from __future__ import annotations
-from typing import Protocol, Dict, Any
+
+import asyncio
+from typing import Protocol, Dict, Any, List
+
+from app.llm.streaming import FieldCheck
 
 
 class LLMProvider(Protocol):
     name: str
+    model: str
+    # Bump when realize/judge prompt wording changes; part of the realization cache key.
+    prompt_version: str
     def realize(self, payload: Dict[str, Any]) -> Dict[str, str]: ...
     def judge(self, text: str) -> Dict[str, str]: ...
+    def judge_batch(self, texts: List[str]) -> List[Dict[str, str]]: ...
+
+
+class AsyncLLMProvider(LLMProvider, Protocol):
+    """Providers with native async calls on a pooled httpx.AsyncClient."""
+
+    async def arealize(self, payload: Dict[str, Any]) -> Dict[str, str]: ...
+    async def ajudge(self, text: str) -> Dict[str, str]: ...
+    async def ajudge_batch(self, texts: List[str]) -> List[Dict[str, str]]: ...
+
+
+class StreamingLLMProvider(LLMProvider, Protocol):
+    """Providers that can stream realize and stop early when a field fails a check."""
+
+    def realize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]: ...
+    async def arealize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]: ...
+
+
+# Async entry points for any LLMProvider: native coroutines when the provider
+# has them, otherwise the sync method on a worker thread (e.g. Bedrock/boto3).
+
+async def arealize(llm: LLMProvider, payload: Dict[str, Any]) -> Dict[str, str]:
+    if hasattr(llm, "arealize"):
+        return await llm.arealize(payload)
+    return await asyncio.to_thread(llm.realize, payload)
+
+
+async def ajudge(llm: LLMProvider, text: str) -> Dict[str, str]:
+    if hasattr(llm, "ajudge"):
+        return await llm.ajudge(text)
+    return await asyncio.to_thread(llm.judge, text)
+
+
+async def ajudge_batch(llm: LLMProvider, texts: List[str]) -> List[Dict[str, str]]:
+    if hasattr(llm, "ajudge_batch"):
+        return await llm.ajudge_batch(texts)
+    return await asyncio.to_thread(llm.judge_batch, texts)
+
+
+# Streaming realize for any LLMProvider: providers that cannot stream realize
+# normally and on_field is never called, so callers still check the finished
+# result themselves.
+
+def realize_stream(llm: LLMProvider, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+    if hasattr(llm, "realize_stream"):
+        return llm.realize_stream(payload, on_field)
+    return llm.realize(payload)
+
+
+async def arealize_stream(llm: LLMProvider, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+    if hasattr(llm, "arealize_stream"):
+        return await llm.arealize_stream(payload, on_field)
+    return await arealize(llm, payload)
@@ -0,0 +1,43 @@
+# app/llm/batch_judge.py
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+BATCH_JUDGE_OUTPUT = """Return ONLY valid JSON (no markdown fences), one entry per item id:
+{ "verdicts": [ { "id": 0, "verdict": "PASS" | "BLOCK", "reason": "..." } ] }"""
+
+
+def render_batch_items(texts: List[str]) -> str:
+    return "\n\n".join(f"Item {i}:\n<<<{t}>>>" for i, t in enumerate(texts))
+
+
+def parse_batch_verdicts(parsed: Any, n: int) -> List[Dict[str, str]]:
+    """
+    Maps a batch judge reply back onto the n input texts. Any item that is
+    missing or malformed is BLOCKed, same as the single-item judge does.
+    """
+    rows = parsed.get("verdicts") if isinstance(parsed, dict) else parsed
+    by_id: Dict[int, Dict[str, str]] = {}
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict):
+            continue
+        try:
+            i = int(row.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if row.get("verdict") in ("PASS", "BLOCK"):
+            by_id[i] = {"verdict": row["verdict"], "reason": str(row.get("reason") or "")}
+
+    return [
+        by_id.get(i) or {"verdict": "BLOCK", "reason": "Missing or invalid verdict in batch output"}
+        for i in range(n)
+    ]
+
+
+def parse_batch_text(text: str, n: int) -> List[Dict[str, str]]:
+    try:
+        parsed = json.loads(text)
+    except Exception:
+        return [{"verdict": "BLOCK", "reason": f"Non-JSON judge output: {text[:200]}"}] * n
+    return parse_batch_verdicts(parsed, n)
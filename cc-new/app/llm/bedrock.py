@@ -3,23 +3,16 @@ from __future__ import annotations
 
 import json
 import boto3
+from botocore.config import Config
 
 from app.llm.base import LLMProvider
+from app.llm.batch_judge import BATCH_JUDGE_OUTPUT, parse_batch_text, render_batch_items
+from app.llm.compaction import render_facts
+from app.llm.prompt_cache import anthropic_system, record_anthropic_usage
 from app.core.config import settings
 
 
-class BedrockProvider(LLMProvider):
-    name = "bedrock"
-
-    def __init__(self) -> None:
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-        )
-        self.model_id = settings.bedrock_model_id
-
-    def realize(self, payload: dict) -> dict:
-        prompt = f"""
+REALIZE_SYSTEM = """
 You are writing educational investment insights.
 
 Rules:
@@ -28,42 +21,45 @@ Rules:
 - No new data
 
 Return ONLY JSON:
-{{ "headline": "...", "explanation": "...", "personal_relevance": "..." }}
+{ "headline": "...", "explanation": "...", "personal_relevance": "..." }
+""".strip()
 
-Facts:
-{json.dumps(payload["facts"], indent=2)}
+JUDGE_SYSTEM = """
+Is the following investment education text compliant?
 
-Allowed claims:
-{json.dumps(payload["allowed_claims"], indent=2)}
-"""
+Return ONLY JSON:
+{ "verdict": "PASS" | "BLOCK", "reason": "..." }
+""".strip()
 
-        body = {
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 300,
-        }
+JUDGE_BATCH_SYSTEM = f"""
+Is each of the following investment education items compliant? Judge each independently.
 
-        resp = self.client.invoke_model(
-            modelId=self.model_id,
-            body=json.dumps(body),
-        )
+{BATCH_JUDGE_OUTPUT}
+""".strip()
 
-        text = json.loads(resp["body"].read())["content"][0]["text"]
-        return json.loads(text)
 
-    def judge(self, text: str) -> dict:
-        prompt = f"""
-Is the following investment education text compliant?
-
-Return ONLY JSON:
-{{ "verdict": "PASS" | "BLOCK", "reason": "..." }}
+class BedrockProvider(LLMProvider):
+    name = "bedrock"
+    prompt_version = "v3"
 
-Text:
-<<<{text}>>>
-"""
+    def __init__(self) -> None:
+        self.client = boto3.client(
+            "bedrock-runtime",
+            region_name=settings.aws_region,
+            config=Config(
+                max_pool_connections=settings.http_max_connections,
+                tcp_keepalive=True,
+            ),
+        )
+        self.model_id = settings.bedrock_model_id
+        self.model = self.model_id
 
+    def _invoke(self, op: str, system: str, user: str, max_tokens: int) -> str:
+        """Fixed instructions as the (cacheable) system prefix, per-call input as the user turn."""
         body = {
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 100,
+            "system": anthropic_system(system),
+            "messages": [{"role": "user", "content": user}],
+            "max_tokens": max_tokens,
         }
 
         resp = self.client.invoke_model(
@@ -71,5 +67,23 @@ Text:
             body=json.dumps(body),
         )
 
-        text = json.loads(resp["body"].read())["content"][0]["text"]
-        return json.loads(text)
+        raw = json.loads(resp["body"].read())
+        record_anthropic_usage(self.name, op, raw.get("usage"))
+        return raw["content"][0]["text"]
+
+    def realize(self, payload: dict) -> dict:
+        user = f"""
+Facts:
+{render_facts(payload["facts"])}
+
+Allowed claims:
+{render_facts(payload["allowed_claims"])}
+""".strip()
+        return json.loads(self._invoke("realize", REALIZE_SYSTEM, user, 300))
+
+    def judge(self, text: str) -> dict:
+        return json.loads(self._invoke("judge", JUDGE_SYSTEM, f"Text:\n<<<{text}>>>", 100))
+
+    def judge_batch(self, texts: list[str]) -> list[dict]:
+        text = self._invoke("judge_batch", JUDGE_BATCH_SYSTEM, render_batch_items(texts), 80 + 100 * len(texts))
+        return parse_batch_text(text, len(texts))
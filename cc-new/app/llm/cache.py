@@ -0,0 +1,314 @@
+# app/llm/cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional
+
+from app.core.cache import TieredCache, build_cache_backend
+from app.core.config import settings
+from app.llm.base import LLMProvider, ajudge, ajudge_batch, arealize, arealize_stream, realize_stream
+from app.llm.streaming import FieldCheck
+
+logger = logging.getLogger("cc.llm.cache")
+
+
+def canonical_hash(obj: Any) -> str:
+    """sha256 over a canonical JSON encoding (sorted keys, no whitespace)."""
+    raw = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _realize(llm: LLMProvider, payload: Dict[str, Any], on_field: FieldCheck | None) -> Dict[str, str]:
+    if on_field is None:
+        return llm.realize(payload)
+    return realize_stream(llm, payload, on_field)
+
+
+async def _arealize(llm: LLMProvider, payload: Dict[str, Any], on_field: FieldCheck | None) -> Dict[str, str]:
+    if on_field is None:
+        return await arealize(llm, payload)
+    return await arealize_stream(llm, payload, on_field)
+
+
+def _cacheable(realized: Any) -> bool:
+    return isinstance(realized, dict) and bool(realized.get("headline"))
+
+
+def _seen(realized: Dict[str, str], recent_headlines: Collection[str]) -> bool:
+    return bool(recent_headlines) and realized.get("headline") in recent_headlines
+
+
+class RealizationCache:
+    """
+    Content-addressed memo for llm.realize: the key covers the facts, audience,
+    style, provider, model and prompt version, so any prompt or model change
+    starts from a cold cache instead of serving stale wording.
+    """
+
+    def __init__(self, cache: TieredCache, ttl_s: float) -> None:
+        self.cache = cache
+        self.ttl_s = ttl_s
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(llm: LLMProvider, payload: Dict[str, Any]) -> str:
+        return canonical_hash(
+            {
+                "facts": payload.get("facts", []),
+                "allowed_claims": payload.get("allowed_claims", []),
+                "audience": payload.get("audience"),
+                "style": payload.get("style"),
+                "provider": llm.name,
+                "model": getattr(llm, "model", None),
+                "prompt_version": getattr(llm, "prompt_version", None),
+            }
+        )
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._stats.hits += 1
+            else:
+                self._stats.misses += 1
+
+    def realize(
+        self,
+        llm: LLMProvider,
+        payload: Dict[str, Any],
+        on_field: FieldCheck | None = None,
+        *,
+        single_flight: bool = True,
+        recent_headlines: Collection[str] = (),
+    ) -> Dict[str, str]:
+        """
+        On a miss, streams the realization through on_field when one is given.
+        Concurrent misses share one compute, and an abort raised by on_field
+        reaches all of them; a caller whose check depends on the caller (its
+        recent headlines) passes single_flight=False and computes on its own.
+
+        A hit whose headline is in recent_headlines would only be dropped as a
+        repeat, so it is realized afresh for this caller and the shared entry
+        is left as it is.
+        """
+        key = self.key_for(llm, payload)
+        cached = self.cache.get(key)
+        if cached is not None and not _seen(cached, recent_headlines):
+            self._count(hit=True)
+            return cached
+
+        self._count(hit=False)
+        if cached is not None:
+            return _realize(llm, payload, on_field)
+        if not single_flight:
+            realized = _realize(llm, payload, on_field)
+            if _cacheable(realized):
+                self.cache.set(key, realized, self.ttl_s)
+            return realized
+        return self.cache.get_or_compute(
+            key,
+            lambda: _realize(llm, payload, on_field),
+            self.ttl_s,
+            cache_if=_cacheable,
+        )
+
+    async def arealize(
+        self,
+        llm: LLMProvider,
+        payload: Dict[str, Any],
+        on_field: FieldCheck | None = None,
+        *,
+        single_flight: bool = True,
+        recent_headlines: Collection[str] = (),
+    ) -> Dict[str, str]:
+        key = self.key_for(llm, payload)
+        cached = await self.cache.aget(key)
+        if cached is not None and not _seen(cached, recent_headlines):
+            self._count(hit=True)
+            return cached
+
+        self._count(hit=False)
+        if cached is not None:
+            return await _arealize(llm, payload, on_field)
+        if not single_flight:
+            realized = await _arealize(llm, payload, on_field)
+            if _cacheable(realized):
+                await self.cache.aset(key, realized, self.ttl_s)
+            return realized
+        return await self.cache.aget_or_compute(
+            key,
+            lambda: _arealize(llm, payload, on_field),
+            self.ttl_s,
+            cache_if=_cacheable,
+        )
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._stats.hits, misses=self._stats.misses)
+
+
+realization_cache = RealizationCache(
+    TieredCache(
+        "llm:realize",
+        max_entries=settings.realize_cache_max_entries,
+        shared=build_cache_backend(settings.realize_cache_url),
+    ),
+    ttl_s=settings.realize_cache_ttl_s,
+)
+
+
+class VerdictCache:
+    """
+    Judge verdicts keyed by a hash of the whitespace/case-normalized text plus
+    the judging provider, model and prompt version. Only PASS is cached: a
+    BLOCK may come from a transient bad judge reply and should be re-checked.
+    """
+
+    def __init__(self, cache: TieredCache, ttl_s: float) -> None:
+        self.cache = cache
+        self.ttl_s = ttl_s
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(llm: LLMProvider, text: str) -> str:
+        return canonical_hash(
+            {
+                "text": re.sub(r"\s+", " ", text or "").strip().casefold(),
+                "provider": llm.name,
+                "model": getattr(llm, "model", None),
+                "prompt_version": getattr(llm, "prompt_version", None),
+            }
+        )
+
+    def _lookup(self, key: str) -> Optional[Dict[str, str]]:
+        return self._counted(self.cache.get(key))
+
+    def _counted(self, cached: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        with self._lock:
+            if cached is not None:
+                self._stats.hits += 1
+            else:
+                self._stats.misses += 1
+        return cached
+
+    def _store(self, key: str, verdict: Dict[str, str]) -> None:
+        if verdict.get("verdict") == "PASS":
+            self.cache.set(key, verdict, self.ttl_s)
+
+    def judge(self, llm: LLMProvider, text: str) -> Dict[str, str]:
+        key = self.key_for(llm, text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        verdict = llm.judge(text)
+        self._store(key, verdict)
+        return verdict
+
+    def judge_many(self, llm: LLMProvider, texts: List[str]) -> List[Dict[str, str]]:
+        """Cached verdicts where possible; all misses go to the LLM in one batch call."""
+        keys = [self.key_for(llm, t) for t in texts]
+        verdicts: List[Optional[Dict[str, str]]] = [self._lookup(k) for k in keys]
+        missing = [i for i, v in enumerate(verdicts) if v is None]
+
+        if len(missing) == 1 or (missing and not hasattr(llm, "judge_batch")):
+            fresh = [llm.judge(texts[i]) for i in missing]
+        elif missing:
+            fresh = llm.judge_batch([texts[i] for i in missing])
+        else:
+            fresh = []
+
+        for i, verdict in zip(missing, fresh):
+            self._store(keys[i], verdict)
+            verdicts[i] = verdict
+        return verdicts  # type: ignore[return-value]
+
+    async def _astore(self, key: str, verdict: Dict[str, str]) -> None:
+        if verdict.get("verdict") == "PASS":
+            await self.cache.aset(key, verdict, self.ttl_s)
+
+    async def ajudge(self, llm: LLMProvider, text: str) -> Dict[str, str]:
+        key = self.key_for(llm, text)
+        cached = self._counted(await self.cache.aget(key))
+        if cached is not None:
+            return cached
+        verdict = await ajudge(llm, text)
+        await self._astore(key, verdict)
+        return verdict
+
+    async def ajudge_many(self, llm: LLMProvider, texts: List[str]) -> List[Dict[str, str]]:
+        keys = [self.key_for(llm, t) for t in texts]
+        verdicts: List[Optional[Dict[str, str]]] = [self._counted(await self.cache.aget(k)) for k in keys]
+        missing = [i for i, v in enumerate(verdicts) if v is None]
+
+        if len(missing) == 1 or (missing and not hasattr(llm, "judge_batch")):
+            fresh = [await ajudge(llm, texts[i]) for i in missing]
+        elif missing:
+            fresh = await ajudge_batch(llm, [texts[i] for i in missing])
+        else:
+            fresh = []
+
+        for i, verdict in zip(missing, fresh):
+            await self._astore(keys[i], verdict)
+            verdicts[i] = verdict
+        return verdicts  # type: ignore[return-value]
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._stats.hits, misses=self._stats.misses)
+
+
+verdict_cache = VerdictCache(
+    TieredCache(
+        "llm:verdict",
+        max_entries=settings.verdict_cache_max_entries,
+        shared=build_cache_backend(settings.realize_cache_url),
+    ),
+    ttl_s=settings.verdict_cache_ttl_s,
+)
+
+
+def cached_realize(
+    llm: LLMProvider,
+    payload: Dict[str, Any],
+    on_field: FieldCheck | None = None,
+    *,
+    single_flight: bool = True,
+    recent_headlines: Collection[str] = (),
+) -> Dict[str, str]:
+    if not settings.realize_cache_enabled:
+        return _realize(llm, payload, on_field)
+    return realization_cache.realize(
+        llm, payload, on_field, single_flight=single_flight, recent_headlines=recent_headlines
+    )
+
+
+async def cached_arealize(
+    llm: LLMProvider,
+    payload: Dict[str, Any],
+    on_field: FieldCheck | None = None,
+    *,
+    single_flight: bool = True,
+    recent_headlines: Collection[str] = (),
+) -> Dict[str, str]:
+    if not settings.realize_cache_enabled:
+        return await _arealize(llm, payload, on_field)
+    return await realization_cache.arealize(
+        llm, payload, on_field, single_flight=single_flight, recent_headlines=recent_headlines
+    )
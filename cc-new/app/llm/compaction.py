@@ -0,0 +1,164 @@
+# app/llm/compaction.py
+"""
+Prompt compaction for SignalBundle facts before realization.
+
+Facts are whitespace-normalized, capped per fact, near-duplicates are merged
+(same numbers and nearly the same words), and the rest are kept by priority
+until the bundle's token budget is spent. Kept facts stay in builder order and
+are rendered as compact JSON instead of the old indent=2 dump.
+
+Token counts use tiktoken when it is installed and a word/punctuation split
+otherwise; the fallback is close enough for budgeting, not for billing.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional dependency
+    _encoding = None
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_WORD_RE = re.compile(r"[a-z]+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_WS_RE = re.compile(r"\s+")
+
+# (priority, pattern): the first match wins, lower keeps first; unmatched facts
+# get DEFAULT_PRIORITY. Numbers about the user's own portfolio are what the
+# insight is built on, boilerplate notes are what can go.
+PRIORITY_RULES: Tuple[Tuple[int, re.Pattern[str]], ...] = (
+    (0, re.compile(r"^User is viewing")),
+    (3, re.compile(r"^(Educational note:|This insight is)")),
+    (0, re.compile(r"\d")),
+)
+DEFAULT_PRIORITY = 1
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(_TOKEN_RE.findall(text))
+
+
+def render_facts(facts: Sequence[str]) -> str:
+    """Facts as a compact JSON array, the form they take in the realize prompt."""
+    return json.dumps(list(facts), ensure_ascii=False, separators=(",", ":"))
+
+
+def fact_priority(fact: str) -> int:
+    for priority, pattern in PRIORITY_RULES:
+        if pattern.search(fact):
+            return priority
+    return DEFAULT_PRIORITY
+
+
+def _hard_cut(text: str, max_tokens: int) -> str:
+    """Leading tokens of text plus an ellipsis, cut with the tokenizer count_tokens uses."""
+    ellipsis = "…"
+    keep = max(1, max_tokens - count_tokens(ellipsis))
+    if _encoding is not None:
+        # Bytes, not decode(): a cut inside a multi-byte character is dropped, not replaced.
+        head = _encoding.decode_bytes(_encoding.encode(text)[:keep]).decode("utf-8", "ignore")
+    else:
+        spans = [m.end() for m in _TOKEN_RE.finditer(text)]
+        head = text[: spans[min(keep, len(spans)) - 1]] if spans else text
+    return head.rstrip() + ellipsis
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Whole leading sentences that fit in max_tokens, else a hard cut with an ellipsis."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept = ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        candidate = f"{kept} {sentence}".strip()
+        if count_tokens(candidate) > max_tokens:
+            break
+        kept = candidate
+    return kept or _hard_cut(text, max_tokens)
+
+
+def _signature(fact: str) -> Tuple[Tuple[str, ...], frozenset[str]]:
+    lowered = fact.lower()
+    return tuple(_NUMBER_RE.findall(lowered)), frozenset(_WORD_RE.findall(lowered))
+
+
+def _near_duplicate(
+    a: Tuple[Tuple[str, ...], frozenset[str]],
+    b: Tuple[Tuple[str, ...], frozenset[str]],
+    threshold: float,
+) -> bool:
+    if a[0] != b[0]:
+        return False
+    union = a[1] | b[1]
+    return not union or len(a[1] & b[1]) / len(union) >= threshold
+
+
+@dataclass(frozen=True)
+class CompactedFacts:
+    facts: List[str]
+    tokens_before: int
+    tokens_after: int
+    deduped: int
+    dropped: int
+
+
+def compact_facts(
+    facts: Sequence[str],
+    *,
+    budget_tokens: int,
+    max_fact_tokens: int,
+    dedup_threshold: float = 0.85,
+    priority: Callable[[str], int] = fact_priority,
+) -> CompactedFacts:
+    """
+    Compacts one bundle's facts. The highest-priority fact is always kept
+    (truncated to the budget if need be) so a bundle never goes out empty.
+    """
+    tokens_before = count_tokens(json.dumps(list(facts), indent=2))
+
+    unique: List[str] = []
+    signatures: List[Tuple[Tuple[str, ...], frozenset[str]]] = []
+    deduped = 0
+    for raw in facts:
+        fact = truncate_to_tokens(_WS_RE.sub(" ", raw or "").strip(), max_fact_tokens)
+        if not fact:
+            continue
+        sig = _signature(fact)
+        if any(_near_duplicate(sig, seen, dedup_threshold) for seen in signatures):
+            deduped += 1
+            continue
+        unique.append(fact)
+        signatures.append(sig)
+
+    order = sorted(range(len(unique)), key=lambda i: (priority(unique[i]), i))
+    keep: dict[int, str] = {}
+    # "[" and "]" plus one "," per fact after the first.
+    spent = 2
+    for i in order:
+        cost = count_tokens(json.dumps(unique[i], ensure_ascii=False)) + (1 if keep else 0)
+        if spent + cost > budget_tokens:
+            if keep:
+                continue
+            keep[i] = truncate_to_tokens(unique[i], max(1, budget_tokens - 4))
+            cost = count_tokens(json.dumps(keep[i], ensure_ascii=False))
+        else:
+            keep[i] = unique[i]
+        spent += cost
+
+    kept = [keep[i] for i in sorted(keep)]
+    return CompactedFacts(
+        facts=kept,
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(render_facts(kept)),
+        deduped=deduped,
+        dropped=len(unique) - len(kept),
+    )
@@ -0,0 +1,62 @@
+# app/llm/guard.py
+"""
+LLMProvider wrapper that routes every call through the provider's upstream
+guard (app.core.resilience): an adaptive concurrency limit and a circuit
+breaker shared by all requests. Refused calls raise UpstreamUnavailable
+without touching the network; realize skips the bundle and judge blocks it.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.resilience import guarded
+from app.llm import base
+from app.llm.base import LLMProvider
+from app.llm.streaming import FieldCheck, RealizeAborted
+
+
+class GuardedLLM:
+    def __init__(self, inner: LLMProvider) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.model = getattr(inner, "model", inner.name)
+        self.prompt_version = getattr(inner, "prompt_version", "")
+        self.upstream = f"llm:{inner.name}"
+
+    def _guard(self):
+        # A realization stopped by its own field check says nothing about the upstream.
+        return guarded(self.upstream, slow_call_s=settings.llm_slow_call_s, ok_errors=(RealizeAborted,))
+
+    def realize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        with self._guard():
+            return self.inner.realize(payload)
+
+    def realize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+        with self._guard():
+            return base.realize_stream(self.inner, payload, on_field)
+
+    def judge(self, text: str) -> Dict[str, str]:
+        with self._guard():
+            return self.inner.judge(text)
+
+    def judge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        with self._guard():
+            return self.inner.judge_batch(texts)
+
+    async def arealize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        with self._guard():
+            return await base.arealize(self.inner, payload)
+
+    async def arealize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+        with self._guard():
+            return await base.arealize_stream(self.inner, payload, on_field)
+
+    async def ajudge(self, text: str) -> Dict[str, str]:
+        with self._guard():
+            return await base.ajudge(self.inner, text)
+
+    async def ajudge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        with self._guard():
+            return await base.ajudge_batch(self.inner, texts)
@@ -0,0 +1,288 @@
+# app/llm/hedge.py
+"""
+Latency-hedged LLM calls across two providers.
+
+HedgedLLM sends each realize/judge call to the primary provider. If it has
+not produced a valid answer after the hedge delay, the same call goes to the
+secondary as well, and whichever valid answer arrives first wins. A primary
+that fails outright is hedged immediately instead of waiting out the delay.
+Streamed realizes are hedged the same way, with on_field checking both
+streams; a RealizeAborted from either is the caller's own verdict on the
+content, so it ends the call instead of being hedged around.
+
+The delay is a percentile of the primary's recent latencies for that call
+(LatencyTracker), clamped to [min, max], with a fixed delay until enough
+samples exist. A primary cancelled because the secondary won is recorded at
+the time it had run so far: leaving it out would keep only the calls that beat
+the delay, and each round would pull the delay further down.
+
+On the async path the losing call is cancelled. On the sync path it cannot
+be: a loser that has already started keeps its _executor worker until it
+returns or hits the provider's HTTP timeout, and its answer is dropped. Those
+workers count against llm_max_workers, so under sustained hedging the sync
+path queues behind its own losers; the async route does not.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import HEDGE_TOTAL, LLM_CALL_SECONDS
+from app.llm import base
+from app.llm.base import LLMProvider
+from app.llm.streaming import FieldCheck, RealizeAborted
+
+logger = logging.getLogger("cc.llm.hedge")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.llm_max_workers,
+    thread_name_prefix="cc-hedge",
+)
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies per (provider, op): successful calls, and
+    cancelled calls at their elapsed time, which is a lower bound.
+    """
+
+    def __init__(self, window: int = 512) -> None:
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, op: str, seconds: float, *, completed: bool = True) -> None:
+        """completed=False: the call was cancelled after `seconds`; kept out of the histogram."""
+        if completed:
+            LLM_CALL_SECONDS.labels(provider=provider, op=op).observe(seconds)
+        with self._lock:
+            samples = self._samples.get((provider, op))
+            if samples is None:
+                samples = self._samples[(provider, op)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, provider: str, op: str, q: float, min_samples: int = 1) -> float | None:
+        """q-th percentile in seconds, or None with fewer than min_samples samples."""
+        with self._lock:
+            samples = list(self._samples.get((provider, op), ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return float(np.percentile(samples, q))
+
+    def snapshot(self, q: float = 95.0) -> Dict[str, Dict[str, float]]:
+        """{"provider.op": {count, p50, p<q>}} for logging and tuning."""
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._samples.items()]
+        return {
+            f"{provider}.{op}": {
+                "count": len(s),
+                "p50": round(float(np.percentile(s, 50)), 3),
+                f"p{q:g}": round(float(np.percentile(s, q)), 3),
+            }
+            for (provider, op), s in items
+            if s
+        }
+
+
+latency_tracker = LatencyTracker(settings.llm_latency_window)
+
+
+def _valid_realized(out: Any) -> bool:
+    return isinstance(out, dict) and all(
+        isinstance(out.get(k), str) and out.get(k) for k in ("headline", "explanation", "personal_relevance")
+    )
+
+
+def _valid_verdict(out: Any) -> bool:
+    return isinstance(out, dict) and out.get("verdict") in ("PASS", "BLOCK")
+
+
+def _valid_verdicts(n: int) -> Callable[[Any], bool]:
+    return lambda out: isinstance(out, list) and len(out) == n and all(_valid_verdict(v) for v in out)
+
+
+class HedgedLLM:
+    """LLMProvider that hedges `primary` with `secondary`; see the module docstring."""
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        secondary: LLMProvider,
+        *,
+        tracker: LatencyTracker = latency_tracker,
+    ) -> None:
+        self.primary = primary
+        self.secondary = secondary
+        self.tracker = tracker
+        self.name = f"{primary.name}+{secondary.name}"
+        self.model = getattr(primary, "model", primary.name)
+        self.prompt_version = f"{getattr(primary, 'prompt_version', '')}+{getattr(secondary, 'prompt_version', '')}"
+
+    def hedge_delay(self, op: str) -> float:
+        p = self.tracker.percentile(
+            self.primary.name,
+            op,
+            settings.llm_hedge_percentile,
+            min_samples=settings.llm_hedge_min_samples,
+        )
+        if p is None:
+            return settings.llm_hedge_initial_delay_s
+        return min(max(p, settings.llm_hedge_min_delay_s), settings.llm_hedge_max_delay_s)
+
+    def _finish(self, op: str, winner: LLMProvider, hedged: bool) -> None:
+        if not hedged:
+            outcome = "primary"
+        elif winner is self.primary:
+            outcome = "primary_after_hedge"
+        else:
+            outcome = "secondary"
+        HEDGE_TOTAL.labels(op=op, outcome=outcome).inc()
+        if hedged:
+            logger.info("llm hedge op=%s winner=%s", op, winner.name)
+
+    # --- sync -----------------------------------------------------------
+
+    def _timed(self, llm: LLMProvider, op: str, fn: Callable[[LLMProvider], Any]) -> Any:
+        start = time.perf_counter()
+        out = fn(llm)
+        self.tracker.record(llm.name, op, time.perf_counter() - start)
+        return out
+
+    def _call(self, op: str, fn: Callable[[LLMProvider], Any], valid: Callable[[Any], bool]) -> Any:
+        delay = self.hedge_delay(op)
+        fp = _executor.submit(self._timed, self.primary, op, fn)
+        wait([fp], timeout=delay)
+        if fp.done() and fp.exception() is None and valid(fp.result()):
+            self._finish(op, self.primary, hedged=False)
+            return fp.result()
+        if fp.done() and isinstance(fp.exception(), RealizeAborted):
+            raise fp.exception()
+
+        logger.info("llm hedge op=%s primary=%s after=%.2fs", op, self.primary.name, delay)
+        pending: Dict[Future, LLMProvider] = {_executor.submit(self._timed, self.secondary, op, fn): self.secondary}
+        if not fp.done():
+            pending[fp] = self.primary
+        finished: List[Future] = [fp] if fp.done() else []
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                who = pending.pop(f)
+                finished.append(f)
+                aborted = isinstance(f.exception(), RealizeAborted)
+                if aborted or (f.exception() is None and valid(f.result())):
+                    # Only drops losers still queued; a running one holds its worker (see module docstring).
+                    for loser in pending:
+                        loser.cancel()
+                    if aborted:
+                        raise f.exception()
+                    self._finish(op, who, hedged=True)
+                    return f.result()
+        return self._fallback(op, finished)
+
+    def _fallback(self, op: str, finished: List[Any]) -> Any:
+        """Nothing valid: the first answer we got (as the unhedged call would return), else the first error."""
+        for f in finished:
+            if f.exception() is None:
+                return f.result()
+        logger.warning("llm hedge op=%s both providers failed", op)
+        raise finished[0].exception()
+
+    def realize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        return self._call("realize", lambda llm: llm.realize(payload), _valid_realized)
+
+    def realize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+        return self._call(
+            "realize",
+            lambda llm: base.realize_stream(llm, payload, on_field),
+            _valid_realized,
+        )
+
+    def judge(self, text: str) -> Dict[str, str]:
+        return self._call("judge", lambda llm: llm.judge(text), _valid_verdict)
+
+    def judge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        return self._call("judge_batch", lambda llm: llm.judge_batch(texts), _valid_verdicts(len(texts)))
+
+    # --- async ----------------------------------------------------------
+
+    async def _atimed(self, llm: LLMProvider, op: str, fn: Callable[[LLMProvider], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            out = await fn(llm)
+        except asyncio.CancelledError:
+            self.tracker.record(llm.name, op, time.perf_counter() - start, completed=False)
+            raise
+        self.tracker.record(llm.name, op, time.perf_counter() - start)
+        return out
+
+    async def _acall(
+        self,
+        op: str,
+        fn: Callable[[LLMProvider], Awaitable[Any]],
+        valid: Callable[[Any], bool],
+    ) -> Any:
+        delay = self.hedge_delay(op)
+        tp = asyncio.ensure_future(self._atimed(self.primary, op, fn))
+        pending: Dict[asyncio.Future, LLMProvider] = {tp: self.primary}
+        finished: List[asyncio.Future] = []
+
+        # Whatever ends this call (a winner, an error, or the caller being
+        # cancelled mid-wait), nothing it started is left running.
+        try:
+            await asyncio.wait({tp}, timeout=delay)
+            if tp.done():
+                del pending[tp]
+                finished.append(tp)
+                if not tp.cancelled() and tp.exception() is None and valid(tp.result()):
+                    self._finish(op, self.primary, hedged=False)
+                    return tp.result()
+                if not tp.cancelled() and isinstance(tp.exception(), RealizeAborted):
+                    raise tp.exception()
+
+            logger.info("llm hedge op=%s primary=%s after=%.2fs", op, self.primary.name, delay)
+            pending[asyncio.ensure_future(self._atimed(self.secondary, op, fn))] = self.secondary
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    who = pending.pop(t)
+                    finished.append(t)
+                    if isinstance(t.exception(), RealizeAborted):
+                        raise t.exception()
+                    if t.exception() is None and valid(t.result()):
+                        self._finish(op, who, hedged=True)
+                        return t.result()
+            return self._fallback(op, finished)
+        finally:
+            for loser in pending:
+                loser.cancel()
+
+    async def arealize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        return await self._acall("realize", lambda llm: base.arealize(llm, payload), _valid_realized)
+
+    async def arealize_stream(self, payload: Dict[str, Any], on_field: FieldCheck) -> Dict[str, str]:
+        return await self._acall(
+            "realize",
+            lambda llm: base.arealize_stream(llm, payload, on_field),
+            _valid_realized,
+        )
+
+    async def ajudge(self, text: str) -> Dict[str, str]:
+        return await self._acall("judge", lambda llm: base.ajudge(llm, text), _valid_verdict)
+
+    async def ajudge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        return await self._acall(
+            "judge_batch",
+            lambda llm: base.ajudge_batch(llm, texts),
+            _valid_verdicts(len(texts)),
+        )
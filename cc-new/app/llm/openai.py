@@ -5,27 +5,16 @@ import json
 import os
 import httpx
 
+from app.core.http import http_pool
 from app.llm.base import LLMProvider
+from app.llm.batch_judge import BATCH_JUDGE_OUTPUT, parse_batch_text, render_batch_items
+from app.llm.compaction import render_facts
+from app.llm.prompt_cache import openai_cache_params, record_openai_usage
+from app.llm.streaming import FieldCheck, JsonFieldStream, sse_event
 from dotenv import load_dotenv
 load_dotenv()
 
-class OpenAIProvider(LLMProvider):
-    name = "openai"
-    base_url = "https://api.openai.com/v1/chat/completions"
-
-    def __init__(self) -> None:
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise RuntimeError("OPENAI_API_KEY is not set")
-
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-    def realize(self, payload: dict) -> dict:
-        prompt = f"""
+REALIZE_SYSTEM = """
 You generate investor-friendly insights for a wealth app.
 
 Style:
@@ -39,41 +28,145 @@ Style:
 
 Return ONLY JSON. The JSON strings must not contain the banned words.
 
+{ "headline": "...", "explanation": "...", "personal_relevance": "..." }
+""".strip()
+
+JUDGE_SYSTEM = """
+Classify the text as PASS or BLOCK for investment advice.
+
+Return ONLY JSON:
+{ "verdict": "PASS" | "BLOCK", "reason": "..." }
+""".strip()
 
-{{ "headline": "...", "explanation": "...", "personal_relevance": "..." }}
+JUDGE_BATCH_SYSTEM = f"""
+Classify each item independently as PASS or BLOCK for investment advice.
 
-Facts:
-{json.dumps(payload.get("facts", []), indent=2)}
+{BATCH_JUDGE_OUTPUT}
 """.strip()
 
-        body = {
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "response_format": {"type": "json_object"},
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    base_url = "https://api.openai.com/v1/chat/completions"
+    model = "gpt-4o-mini"
+    prompt_version = "v3"
+
+    def __init__(self, http: httpx.Client | None = None, ahttp: httpx.AsyncClient | None = None) -> None:
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        self.http = http or http_pool.client(self.name)
+        self._ahttp = ahttp
+
+    @property
+    def ahttp(self) -> httpx.AsyncClient:
+        return self._ahttp or http_pool.async_client(self.name)
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
         }
 
-        r = httpx.post(self.base_url, headers=self._headers(), json=body, timeout=20)
+    def _content(self, op: str, body: dict, timeout: float) -> str:
+        r = self.http.post(self.base_url, headers=self._headers(), json=body, timeout=timeout)
         r.raise_for_status()
-        content = r.json()["choices"][0]["message"]["content"]
-        return json.loads(content)
+        raw = r.json()
+        record_openai_usage(self.name, op, raw.get("usage"))
+        return raw["choices"][0]["message"]["content"]
 
-    def judge(self, text: str) -> dict:
-        prompt = f"""
-Classify the text as PASS or BLOCK for investment advice.
+    async def _acontent(self, op: str, body: dict, timeout: float) -> str:
+        r = await self.ahttp.post(self.base_url, headers=self._headers(), json=body, timeout=timeout)
+        r.raise_for_status()
+        raw = r.json()
+        record_openai_usage(self.name, op, raw.get("usage"))
+        return raw["choices"][0]["message"]["content"]
 
-Return ONLY JSON:
-{{ "verdict": "PASS" | "BLOCK", "reason": "..." }}
-
-Text:
-<<<{text}>>>
-"""
-        body = {
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0,
+    def _body(self, op: str, system: str, user: str, **params) -> dict:
+        """Fixed instructions first as the system message so calls share a cacheable prefix."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            **params,
+            **openai_cache_params(self.name, op, self.prompt_version),
         }
 
-        r = httpx.post(self.base_url, headers=self._headers(), json=body, timeout=15)
-        r.raise_for_status()
-        return json.loads(r.json()["choices"][0]["message"]["content"])
+    def _realize_body(self, payload: dict) -> dict:
+        return self._body(
+            "realize",
+            REALIZE_SYSTEM,
+            f"Facts:\n{render_facts(payload.get('facts', []))}",
+            temperature=0.2,
+            response_format={"type": "json_object"},
+        )
+
+    def realize(self, payload: dict) -> dict:
+        return json.loads(self._content("realize", self._realize_body(payload), timeout=20))
+
+    async def arealize(self, payload: dict) -> dict:
+        return json.loads(await self._acontent("realize", self._realize_body(payload), timeout=20))
+
+    def _stream_body(self, payload: dict) -> dict:
+        return {**self._realize_body(payload), "stream": True, "stream_options": {"include_usage": True}}
+
+    def _stream_event(self, event: dict, fields: JsonFieldStream, on_field: FieldCheck) -> None:
+        if event.get("usage"):
+            record_openai_usage(self.name, "realize", event["usage"])
+        for choice in event.get("choices") or []:
+            for field, value in fields.feed((choice.get("delta") or {}).get("content") or ""):
+                on_field(field, value)
+
+    def realize_stream(self, payload: dict, on_field: FieldCheck) -> dict:
+        """
+        realize over the streaming API, calling on_field as each top-level
+        field closes. An exception from on_field closes the stream, which
+        stops the generation.
+        """
+        fields = JsonFieldStream()
+        with self.http.stream(
+            "POST", self.base_url, headers=self._headers(), json=self._stream_body(payload), timeout=20
+        ) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                event = sse_event(line)
+                if event is not None:
+                    self._stream_event(event, fields, on_field)
+        return json.loads(fields.text)
+
+    async def arealize_stream(self, payload: dict, on_field: FieldCheck) -> dict:
+        fields = JsonFieldStream()
+        async with self.ahttp.stream(
+            "POST", self.base_url, headers=self._headers(), json=self._stream_body(payload), timeout=20
+        ) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                event = sse_event(line)
+                if event is not None:
+                    self._stream_event(event, fields, on_field)
+        return json.loads(fields.text)
+
+    def _judge_body(self, text: str) -> dict:
+        return self._body("judge", JUDGE_SYSTEM, f"Text:\n<<<{text}>>>", temperature=0)
+
+    def judge(self, text: str) -> dict:
+        return json.loads(self._content("judge", self._judge_body(text), timeout=15))
+
+    async def ajudge(self, text: str) -> dict:
+        return json.loads(await self._acontent("judge", self._judge_body(text), timeout=15))
+
+    def _judge_batch_body(self, texts: list[str]) -> dict:
+        return self._body(
+            "judge_batch",
+            JUDGE_BATCH_SYSTEM,
+            render_batch_items(texts),
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+
+    def judge_batch(self, texts: list[str]) -> list[dict]:
+        return parse_batch_text(self._content("judge_batch", self._judge_batch_body(texts), timeout=15), len(texts))
+
+    async def ajudge_batch(self, texts: list[str]) -> list[dict]:
+        return parse_batch_text(await self._acontent("judge_batch", self._judge_batch_body(texts), timeout=15), len(texts))
@@ -0,0 +1,80 @@
+# app/llm/prompt_cache.py
+"""
+Prompt-prefix caching helpers shared by the LLM providers.
+
+Each prompt is split into a fixed instruction block, sent as the system
+prompt so it forms an identical prefix on every call, and a per-call user
+message with the facts or text to judge. Anthropic (and Claude on Bedrock)
+only cache a prefix marked with cache_control; OpenAI caches long prefixes
+automatically and prompt_cache_key keeps calls of one kind on the same cache.
+
+Vendors only cache prefixes above a minimum length (about 1024 tokens for
+most models), so shorter instruction blocks are sent the same way but
+report no cached tokens. The usage of every call is counted in
+LLM_INPUT_TOKENS either way.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.metrics import LLM_INPUT_TOKENS
+
+logger = logging.getLogger("cc.llm.prompt_cache")
+
+
+def anthropic_system(text: str) -> str | List[Dict[str, Any]]:
+    """System prompt for the Anthropic messages API, marked cacheable when enabled."""
+    if not settings.llm_prompt_cache_enabled:
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def openai_cache_params(provider: str, op: str, prompt_version: str) -> Dict[str, Any]:
+    """Extra chat.completions params that route calls sharing a prefix to one cache."""
+    if not settings.llm_prompt_cache_enabled:
+        return {}
+    return {"prompt_cache_key": f"cc:{provider}:{op}:{prompt_version}"}
+
+
+def _record(provider: str, op: str, cached: int, uncached: int, cache_write: int) -> None:
+    for kind, n in (("cached", cached), ("uncached", uncached), ("cache_write", cache_write)):
+        if n:
+            LLM_INPUT_TOKENS.labels(provider=provider, op=op, kind=kind).inc(n)
+    logger.debug(
+        "llm usage provider=%s op=%s cached=%d uncached=%d cache_write=%d",
+        provider,
+        op,
+        cached,
+        uncached,
+        cache_write,
+    )
+
+
+def record_anthropic_usage(provider: str, op: str, usage: Dict[str, Any] | None) -> None:
+    """Anthropic/Bedrock usage: input_tokens excludes cache reads and writes."""
+    if not isinstance(usage, dict):
+        return
+    _record(
+        provider,
+        op,
+        cached=int(usage.get("cache_read_input_tokens") or 0),
+        uncached=int(usage.get("input_tokens") or 0),
+        cache_write=int(usage.get("cache_creation_input_tokens") or 0),
+    )
+
+
+def record_openai_usage(provider: str, op: str, usage: Dict[str, Any] | None) -> None:
+    """OpenAI usage: prompt_tokens includes the cached ones."""
+    if not isinstance(usage, dict):
+        return
+    cached = int((usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0)
+    _record(
+        provider,
+        op,
+        cached=cached,
+        uncached=max(0, int(usage.get("prompt_tokens") or 0) - cached),
+        cache_write=0,
+    )
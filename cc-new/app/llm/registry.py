@@ -1,14 +1,81 @@
 #app.llm.registry.py
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict
+
+from app.core.config import settings
 from app.llm.anthropic import AnthropicProvider
+from app.llm.base import LLMProvider
+from app.llm.guard import GuardedLLM
+from app.llm.hedge import HedgedLLM
 from app.llm.openai import OpenAIProvider
 from app.llm.bedrock import BedrockProvider
 
+LLM_FACTORIES: Dict[str, Callable[[], LLMProvider]] = {
+    "anthropic": AnthropicProvider,
+    "openai": OpenAIProvider,
+    "bedrock": BedrockProvider,
+}
+
+# Built on first use and kept for the app lifetime; construction errors
+# (e.g. a missing API key) are not cached, so they surface on every request.
+_instances: Dict[str, LLMProvider] = {}
+_lock = threading.Lock()
+
+logger = logging.getLogger("cc.llm.registry")
+
+
+def resolve_llm(name: str) -> LLMProvider:
+    llm = _instances.get(name)
+    if llm is not None:
+        return llm
+
+    factory = LLM_FACTORIES.get(name)
+    if factory is None:
+        raise ValueError(f"Unsupported LLM provider: {name}")
+
+    with _lock:
+        llm = _instances.get(name)
+        if llm is None:
+            llm = factory()
+            if settings.resilience_enabled:
+                llm = GuardedLLM(llm)
+            _instances[name] = llm
+        return llm
+
+
+def resolve_serving_llm() -> LLMProvider:
+    """
+    settings.llm_provider, hedged with settings.llm_hedge_provider when one is
+    set. If the hedge provider cannot be built, requests go unhedged (and the
+    build is retried on the next request) rather than failing.
+    """
+    primary_name = settings.llm_provider
+    secondary_name = settings.llm_hedge_provider
+    if not secondary_name or secondary_name == primary_name:
+        return resolve_llm(primary_name)
+
+    key = f"{primary_name}+{secondary_name}"
+    llm = _instances.get(key)
+    if llm is not None:
+        return llm
+
+    primary = resolve_llm(primary_name)
+    try:
+        secondary = resolve_llm(secondary_name)
+    except Exception as e:
+        logger.warning("llm hedge=%s unavailable, serving %s alone: %s", secondary_name, primary_name, e)
+        return primary
+
+    with _lock:
+        llm = _instances.get(key)
+        if llm is None:
+            llm = _instances[key] = HedgedLLM(primary, secondary)
+        return llm
+
 
-def resolve_llm(name: str):
-    if name == "anthropic":
-        return AnthropicProvider()
-    if name == "openai":
-        return OpenAIProvider()
-    if name == "bedrock":
-        return BedrockProvider()
-    raise ValueError(f"Unsupported LLM provider: {name}")
+def shutdown_llm_registry() -> None:
+    with _lock:
+        _instances.clear()
@@ -0,0 +1,99 @@
+# app/llm/streaming.py
+"""
+Streaming realize support: an incremental parser that reports each top-level
+string field of the JSON reply as soon as its closing quote arrives, and the
+SSE line decoding shared by the Anthropic and OpenAI streaming endpoints.
+
+A field check passed to realize_stream may raise RealizeAborted; the provider
+lets it propagate, which closes the HTTP stream and stops the generation
+instead of paying for the rest of a reply that will be thrown away.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+# Called with (field, value) as each top-level string field closes.
+FieldCheck = Callable[[str, str], None]
+
+
+class RealizeAborted(Exception):
+    """A streamed realization was stopped early because a finished field failed its check."""
+
+    def __init__(self, reason: str, field: str, detail: str = "") -> None:
+        super().__init__(f"realize aborted at {field}: {reason}" + (f" ({detail})" if detail else ""))
+        self.reason = reason
+        self.field = field
+        self.detail = detail
+
+
+class JsonFieldStream:
+    """
+    Incremental scanner over a JSON object arriving in chunks. feed() returns
+    the (key, value) pairs of top-level string fields completed by the chunk;
+    nested values and non-string values are skipped, and anything before the
+    opening brace (e.g. a ```json fence) is ignored. text holds everything fed.
+    """
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escaped = False
+        self._raw: List[str] = []
+        self._key: str | None = None
+        self._in_value = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self._parts.append(chunk)
+        done: List[Tuple[str, str]] = []
+        for ch in chunk:
+            if self._in_str:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._depth == 1:
+                        self._close_string(done)
+                    continue
+                self._raw.append(ch)
+            elif ch == '"':
+                self._in_str = True
+                self._raw = []
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._in_value = True
+            elif self._depth == 1 and ch == ",":
+                self._key, self._in_value = None, False
+        return done
+
+    def _close_string(self, done: List[Tuple[str, str]]) -> None:
+        try:
+            value = json.loads('"' + "".join(self._raw) + '"')
+        except json.JSONDecodeError:
+            value = "".join(self._raw)
+        if self._in_value and self._key is not None:
+            done.append((self._key, value))
+            self._key, self._in_value = None, False
+        elif not self._in_value:
+            self._key = value
+
+
+def sse_event(line: str) -> Dict[str, Any] | None:
+    """The JSON payload of an SSE `data:` line; None for other lines and [DONE]."""
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    return json.loads(data)
@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+from app.core.lifecycle import lifespan
 from app.core.logging import setup_logging
-from app.api.routes import router
+from app.api.routes import ops_router, router
 from app.core.config import settings
 from dotenv import load_dotenv
 load_dotenv()
@@ -11,8 +12,9 @@ load_dotenv()
 
 def create_app() -> FastAPI:
     setup_logging()
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
     app.include_router(router)
+    app.include_router(ops_router)
     return app
 
 
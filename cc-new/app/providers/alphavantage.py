@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 import httpx
 
+from app.core.cache import TieredCache, build_cache_backend
+from app.core.config import settings
+from app.core.http import http_pool
+from app.core.market_calendar import seconds_until_next_daily_bar
 from app.providers.base import (
     Provider,
     ProviderRequest,
@@ -22,37 +26,60 @@ class AlphaVantageProvider(Provider):
     name = "alphavantage"
     base_url = "https://www.alphavantage.co/query"
 
-    def __init__(self) -> None:
+    def __init__(self, http: httpx.Client | None = None, cache: TieredCache | None = None) -> None:
         self.api_key = os.getenv("ALPHAVANTAGE_API_KEY")
+        self.http = http or http_pool.client(self.name)
+        # Daily closes keyed by symbol; shared by every customer holding it.
+        self.cache = cache or TieredCache(
+            "av:daily",
+            max_entries=settings.alphavantage_cache_max_entries,
+            shared=build_cache_backend(settings.cache_backend_url),
+        )
 
     def healthcheck(self) -> ProviderStatus:
         if not self.api_key:
             return ProviderStatus(ok=False, configured=False, message="Missing API key")
         return ProviderStatus(ok=True, configured=True, message="OK")
 
+    def _recent_closes(self, symbol: str, timeout: float = 15) -> List[List[Any]]:
+        """Last 5 [date, close] pairs, newest first; empty when AV returns no series."""
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "outputsize": "compact",
+            "apikey": self.api_key,
+        }
+
+        r = self.http.get(self.base_url, params=params, timeout=timeout)
+        r.raise_for_status()
+        data = r.json()
+
+        # Rate-limit notes come back as 200s without a series; those are not cached.
+        series = data.get("Time Series (Daily)", {})
+        dates = sorted(series.keys(), reverse=True)[:5]
+        return [[d, float(series[d]["4. close"])] for d in dates]
+
+    def _ttl_s(self) -> float:
+        return seconds_until_next_daily_bar(
+            buffer=timedelta(minutes=settings.alphavantage_bar_delay_min)
+        )
+
     def fetch(self, request: ProviderRequest) -> ProviderResponse:
         tickers = request.context.get("tickers", [])[:3]  
         items = []
         citations = []
 
         for symbol in tickers:
-            params = {
-                "function": "TIME_SERIES_DAILY",
-                "symbol": symbol,
-                "outputsize": "compact",
-                "apikey": self.api_key,
-            }
-
-            r = httpx.get(self.base_url, params=params, timeout=15)
-            r.raise_for_status()
-            data = r.json()
-
-            series = data.get("Time Series (Daily)", {})
-            if not series:
+            bars = self.cache.get_or_compute(
+                symbol.upper(),
+                lambda: self._recent_closes(symbol, request.timeout_s(15)),
+                self._ttl_s,
+                cache_if=bool,
+            )
+            if not bars:
                 continue
 
-            dates = sorted(series.keys(), reverse=True)[:5]
-            closes = [float(series[d]["4. close"]) for d in dates]
+            closes = [close for _, close in bars]
 
             min_c, max_c = min(closes), max(closes)
 
@@ -1,6 +1,7 @@
 #app.providers.base.py
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Protocol
@@ -19,6 +20,14 @@ class ProviderRequest:
     as_of: datetime
     # Later phases can add: tickers, asset mix, etc.
     context: Dict[str, Any]
+    # time.monotonic() after which the fan-out stops waiting for this provider.
+    deadline: Optional[float] = None
+
+    def timeout_s(self, cap: float) -> float:
+        """HTTP timeout for one call: cap, or the time left before the deadline if sooner."""
+        if self.deadline is None:
+            return cap
+        return max(0.1, min(cap, self.deadline - time.monotonic()))
 
 
 @dataclass(frozen=True)
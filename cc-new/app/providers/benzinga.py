@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import httpx
-from typing import List
+from typing import Dict, List
 
 from app.providers.base import (
     Provider,
@@ -13,36 +13,44 @@ from app.providers.base import (
     ProviderItem,
     ProviderCitation,
 )
+from app.core.cache import TieredCache, build_cache_backend
 from app.core.config import settings
+from app.core.http import http_pool
 from dotenv import load_dotenv
 load_dotenv()
 
 class BenzingaAnalystInsightsProvider(Provider):
     name = "benzinga"
 
-    def __init__(self) -> None:
+    # Items returned per customer, as with the original single pageSize=10 call
+    page_size = 10
+
+    def __init__(self, http: httpx.Client | None = None, cache: TieredCache | None = None) -> None:
         if not settings.benzinga_api_key:
             raise ValueError("BENZINGA_API_KEY is required")
         self.base_url = settings.benzinga_analyst_base_url.rstrip("/")
         self.api_key = settings.benzinga_api_key
-        self.http = httpx.Client(timeout=30)
+        self.http = http or http_pool.client(self.name)
+        # Raw analyst insights per symbol, shared across customers.
+        self.cache = cache or TieredCache(
+            "bz:analyst",
+            max_entries=settings.benzinga_cache_max_entries,
+            shared=build_cache_backend(settings.cache_backend_url),
+        )
 
     def healthcheck(self) -> ProviderStatus:
         return ProviderStatus(ok=True, configured=True, message="OK")
 
-    def fetch(self, request: ProviderRequest) -> ProviderResponse:
-        symbols: List[str] = request.context.get("tickers", [])
-        if not symbols:
-            return ProviderResponse(self.name, [], [], raw={})
-
+    def _fetch_batch(self, symbols: List[str], timeout: float = 30) -> Dict[str, List[dict]]:
+        """One upstream call for `symbols`, grouped per symbol (newest first)."""
         params = {
             "token": self.api_key,
-            "symbols": ",".join(sorted(set(symbols))),
+            "symbols": ",".join(symbols),
             "page": 1,
-            "pageSize": 10,
+            "pageSize": settings.benzinga_page_size,
         }
 
-        r = self.http.get(self.base_url, params=params)
+        r = self.http.get(self.base_url, params=params, timeout=timeout)
         r.raise_for_status()
         data = r.json()
 
@@ -53,6 +61,53 @@ class BenzingaAnalystInsightsProvider(Provider):
             or []
         )
 
+        grouped: Dict[str, List[dict]] = {}
+        for it in insights:
+            sec = it.get("security") or {}
+            symbol = (sec.get("symbol") or it.get("symbol") or "").upper()
+            if symbol:
+                grouped.setdefault(symbol, []).append(it)
+
+        # A full page may have cut some symbols off, so only record "no insights"
+        # for the rest of the batch when the page came back short.
+        complete = len(insights) < settings.benzinga_page_size
+        out: Dict[str, List[dict]] = {}
+        for symbol in symbols:
+            found = grouped.get(symbol)
+            if found or complete:
+                found = sorted(found or [], key=lambda it: str(it.get("date") or ""), reverse=True)
+                out[symbol] = found[: settings.benzinga_items_per_symbol]
+        return out
+
+    def _insights_for(self, symbols: List[str], request: ProviderRequest) -> List[dict]:
+        by_symbol: Dict[str, List[dict]] = {}
+        missing: List[str] = []
+        for symbol in symbols:
+            cached = self.cache.get(symbol)
+            if cached is None:
+                missing.append(symbol)
+            else:
+                by_symbol[symbol] = cached
+
+        step = max(1, settings.benzinga_symbols_per_call)
+        for i in range(0, len(missing), step):
+            fetched = self._fetch_batch(missing[i : i + step], request.timeout_s(30))
+            for symbol, found in fetched.items():
+                self.cache.set(symbol, found, settings.benzinga_cache_ttl_s)
+                by_symbol[symbol] = found
+
+        merged = [it for found in by_symbol.values() for it in found]
+        merged.sort(key=lambda it: str(it.get("date") or ""), reverse=True)
+        return merged[: self.page_size]
+
+    def fetch(self, request: ProviderRequest) -> ProviderResponse:
+        symbols: List[str] = request.context.get("tickers", [])
+        if not symbols:
+            return ProviderResponse(self.name, [], [], raw={})
+
+        insights = self._insights_for(sorted({s.upper() for s in symbols if s}), request)
+        data = {"analyst-insights": insights}
+
         items: list[ProviderItem] = []
         citations: list[ProviderCitation] = []
 
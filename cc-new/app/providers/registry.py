@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import logging
+import threading
+from typing import Callable, Dict, List
 
 from app.providers.base import Provider
 from app.providers.connect_coach_stub import ConnectCoachProviderStub
@@ -10,23 +12,51 @@ from app.providers.mt_newswire_stub import MTNewswireProviderStub
 from app.providers.alphavantage import AlphaVantageProvider
 from app.providers.benzinga import BenzingaAnalystInsightsProvider
 
+logger = logging.getLogger("cc.providers")
+
+PROVIDER_FACTORIES: Dict[str, Callable[[], Provider]] = {
+    "connect_coach": ConnectCoachProviderStub,
+    "mt_newswires": MTNewswireProviderStub,
+    "alphavantage": AlphaVantageProvider,
+    "benzinga": BenzingaAnalystInsightsProvider,
+}
+
+_registry: Dict[str, Provider] | None = None
+_lock = threading.Lock()
+
 
 def build_provider_registry() -> Dict[str, Provider]:
     """
-    Registry of available providers. Real providers (alphavantage, benzinga)
-    will be added in later phases.
+    Builds every known provider once. Providers that cannot be constructed
+    (e.g. missing credentials) are logged and left out of the registry.
     """
-    providers: List[Provider] = [
-        ConnectCoachProviderStub(),
-        MTNewswireProviderStub(),
-        AlphaVantageProvider(),
-        BenzingaAnalystInsightsProvider(),
-    ]
-    return {p.name: p for p in providers}
+    providers: Dict[str, Provider] = {}
+    for name, factory in PROVIDER_FACTORIES.items():
+        try:
+            providers[name] = factory()
+        except Exception as e:
+            logger.warning("provider=%s unavailable: %s", name, e)
+    return providers
+
+
+def start_provider_registry() -> Dict[str, Provider]:
+    """Builds the app-lifetime registry; called from create_app()'s lifespan."""
+    global _registry
+    with _lock:
+        if _registry is None:
+            _registry = build_provider_registry()
+            logger.info("provider registry started providers=%s", sorted(_registry))
+        return _registry
+
+
+def shutdown_provider_registry() -> None:
+    global _registry
+    with _lock:
+        _registry = None
 
 
 def resolve_providers(requested: List[str]) -> List[Provider]:
-    registry = build_provider_registry()
+    registry = _registry if _registry is not None else start_provider_registry()
     selected: List[Provider] = []
     for name in requested:
         p = registry.get(name)
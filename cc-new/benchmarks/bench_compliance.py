@@ -0,0 +1,84 @@
+# benchmarks/bench_compliance.py
+"""
+Micro-benchmark: combined compliance scanner vs one regex pass per pattern.
+
+    python -m benchmarks.bench_compliance --docs 200 --doc-kb 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, List
+
+from cc_common.compliance import DEFAULT_POLICY, ComplianceScanner
+
+_FILLER = (
+    "revenue guidance margins quarter rates inflation index fund exposure sector "
+    "dividend yield earnings outlook volatility analysts coverage portfolio market "
+    "shares valuation growth the and of for with on in a to"
+).split()
+_PHRASES = ["should buy", "buy now", "target price", "rebalance", "you should", "strong sell", "shift 10%"]
+
+
+def make_doc(rng: random.Random, n_bytes: int, hit_rate: float = 0.002) -> str:
+    words: List[str] = []
+    size = 0
+    while size < n_bytes:
+        w = rng.choice(_PHRASES) if rng.random() < hit_rate else rng.choice(_FILLER)
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)
+
+
+def legacy_scan(patterns: List[re.Pattern]) -> Callable[[str], int]:
+    def scan(text: str) -> int:
+        return sum(1 for pat in patterns for _ in pat.finditer(text))
+
+    return scan
+
+
+def bench(name: str, fn: Callable[[str], int], docs: List[str], repeat: int) -> float:
+    best = float("inf")
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = sum(fn(d) for d in docs)
+        best = min(best, time.perf_counter() - start)
+    mb = sum(len(d) for d in docs) / 1e6
+    print(f"{name:<18} {best * 1e3:9.2f} ms  {mb / best:8.1f} MB/s  {len(docs) / best:10.0f} docs/s  hits={hits}")
+    return best
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--doc-kb", type=float, default=32.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    patterns = [
+        re.compile(rule["pattern"], re.IGNORECASE)
+        for rules in DEFAULT_POLICY["rule_sets"].values()
+        for rule in rules
+    ]
+    scanner = ComplianceScanner()
+    policy = scanner.policy
+
+    for label, docs in [
+        ("short (3 x 120B)", [make_doc(rng, 120, hit_rate=0.01) for _ in range(args.docs * 30)]),
+        (f"long ({args.doc_kb:g} KB)", [make_doc(rng, int(args.doc_kb * 1024)) for _ in range(args.docs)]),
+    ]:
+        print(f"\n{label}: {len(docs)} docs, {len(patterns)} rules")
+        legacy = bench("per-pattern", legacy_scan(patterns), docs, args.repeat)
+        combined = bench("combined", lambda d: len(policy.scan(d)), docs, args.repeat)
+        print(f"{'speedup':<18} {legacy / combined:9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,321 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of the insight pipeline against deterministic stubs.
+
+    python -m benchmarks.bench_pipeline --mode engine,http --sizes 5,50,500 \\
+        --iterations 30 --concurrency 4 --out bench.json
+
+Benzinga, Alpha Vantage and every LLM provider are swapped for the stubs in
+benchmarks/stubs.py through the provider/LLM registries, so nothing leaves the
+process. Workloads are the fixture requests (benchmarks/fixtures/requests.jsonl
+or --requests) plus synthetic portfolios of each --sizes. Per workload the
+report has throughput, end-to-end p50/p95/p99 and the same percentiles per
+stage (from Audit.timings_ms). Compare two reports with benchmarks.compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.api.schemas import GenerateInsightsRequest, GenerateInsightsResponse
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.engine.generator import generate_insights
+from app.llm import cache as llm_cache
+from app.llm.registry import LLM_FACTORIES, shutdown_llm_registry
+from app.providers.registry import PROVIDER_FACTORIES, shutdown_provider_registry
+from benchmarks.stubs import StubAlphaVantage, StubBehavior, StubBenzinga, StubLLM
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "requests.jsonl")
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class StubConfig:
+    provider: StubBehavior
+    realize: StubBehavior
+    judge: StubBehavior
+    seed: int = 0
+
+
+def install_stubs(cfg: StubConfig) -> None:
+    """Points every provider/LLM factory at a stub and drops built instances."""
+    PROVIDER_FACTORIES["benzinga"] = lambda: StubBenzinga(cfg.provider, seed=cfg.seed)
+    PROVIDER_FACTORIES["alphavantage"] = lambda: StubAlphaVantage(cfg.provider, seed=cfg.seed)
+    for name in list(LLM_FACTORIES):
+        LLM_FACTORIES[name] = lambda name=name: StubLLM(name, cfg.realize, cfg.judge, seed=cfg.seed)
+    shutdown_provider_registry()
+    shutdown_llm_registry()
+    settings.default_market_providers = "benzinga,alphavantage"
+    settings.precompute_enabled = False
+    settings.coalesce_enabled = False
+
+
+def reset_llm_caches(warm: bool) -> None:
+    """Fresh realize/verdict caches; a zero-size LRU stores nothing (cold)."""
+    size = 100_000 if warm else 0
+    llm_cache.realization_cache.cache = TieredCache("bench:realize", max_entries=size)
+    llm_cache.verdict_cache.cache = TieredCache("bench:verdict", max_entries=size)
+    settings.realize_cache_enabled = warm
+
+
+def load_requests(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def synthetic_request(base: Dict[str, Any], n_holdings: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed + n_holdings)
+    body = json.loads(json.dumps(base))
+    template = body["payload"]["holdings_snapshots"][0]
+    categories = ["domestic_stocks", "international_stocks", "etf", "bonds", "reit"]
+    values = rng.lognormal(mean=9.0, sigma=1.2, size=n_holdings)
+    holdings = []
+    for i in range(n_holdings):
+        h = dict(template)
+        h.update(
+            name=f"Synthetic Holding {i}",
+            ticker=f"SY{i:04d}",
+            category=categories[i % len(categories)],
+            units=float(rng.integers(1, 500)),
+            current_market_value=round(float(values[i]), 2),
+            cost_basis=round(float(values[i] * rng.uniform(0.6, 1.2)), 2),
+            dividend_yield_pct=round(float(rng.uniform(0.0, 0.05)), 4),
+        )
+        holdings.append(h)
+    body["payload"]["holdings_snapshots"] = holdings
+    body["payload"]["user"]["customer_id"] = f"bench_synthetic_{n_holdings}"
+    body["session_id"] = f"S-BENCH-SYNTHETIC-{n_holdings}"
+    return body
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values, dtype=np.float64)
+    out = {f"p{p}": round(float(np.percentile(arr, p)), 3) for p in PERCENTILES}
+    out["mean"] = round(float(arr.mean()), 3)
+    out["count"] = len(values)
+    return out
+
+
+@dataclass
+class WorkloadResult:
+    workload: str
+    mode: str
+    requests: int = 0
+    errors: int = 0
+    wall_s: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list)
+    stages_ms: Dict[str, List[float]] = field(default_factory=dict)
+    error_samples: List[str] = field(default_factory=list)
+
+    def add(self, latency_ms: float, audit_timings: Dict[str, float]) -> None:
+        self.latencies_ms.append(latency_ms)
+        for key, ms in audit_timings.items():
+            # "realize.goal_portfolio#2" and "realize.goal_portfolio" are one stage.
+            self.stages_ms.setdefault(key.split("#", 1)[0], []).append(ms)
+
+    def summary(self) -> Dict[str, Any]:
+        ok = len(self.latencies_ms)
+        return {
+            "workload": self.workload,
+            "mode": self.mode,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(ok / self.wall_s, 3) if self.wall_s else 0.0,
+            "latency_ms": _percentiles(self.latencies_ms),
+            "stages_ms": {k: _percentiles(v) for k, v in sorted(self.stages_ms.items())},
+            "error_samples": self.error_samples[:5],
+        }
+
+
+def _engine_call() -> Callable[[Dict[str, Any]], GenerateInsightsResponse]:
+    def call(body: Dict[str, Any]) -> GenerateInsightsResponse:
+        return generate_insights(GenerateInsightsRequest.model_validate(body))
+
+    return call
+
+
+def _http_call(client: Any) -> Callable[[Dict[str, Any]], GenerateInsightsResponse]:
+    def call(body: Dict[str, Any]) -> GenerateInsightsResponse:
+        r = client.post("/v1/insights/generate", json=body)
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
+        return GenerateInsightsResponse.model_validate(r.json())
+
+    return call
+
+
+def run_workload(
+    name: str,
+    mode: str,
+    body: Dict[str, Any],
+    call: Callable[[Dict[str, Any]], GenerateInsightsResponse],
+    *,
+    iterations: int,
+    concurrency: int,
+    warmup: int,
+) -> WorkloadResult:
+    result = WorkloadResult(workload=name, mode=mode)
+
+    for _ in range(warmup):
+        try:
+            call(body)
+        except Exception:
+            pass
+
+    lock = threading.Lock()
+
+    def one(_: int) -> None:
+        start = time.perf_counter()
+        try:
+            resp = call(body)
+        except Exception as e:
+            with lock:
+                result.errors += 1
+                result.error_samples.append(f"{type(e).__name__}: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with lock:
+            result.add(elapsed_ms, resp.audit.timings_ms)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(iterations)))
+    result.wall_s = time.perf_counter() - start
+    result.requests = iterations
+    return result
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args],
+                capture_output=True,
+                text=True,
+                cwd=os.path.dirname(__file__),
+                timeout=10,
+            ).stdout.strip()
+        except Exception:
+            return ""
+
+    return {"sha": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--requests", default=FIXTURES, help="JSONL of GenerateInsightsRequest bodies")
+    parser.add_argument("--sizes", default="5,50,500", help="synthetic portfolio sizes (empty for none)")
+    parser.add_argument("--mode", default="engine,http", help="engine, http or both")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--warm-cache", action="store_true", help="keep realize/verdict caches on")
+    parser.add_argument("--coalesce", action="store_true", help="let identical concurrent requests share a run")
+    parser.add_argument("--provider-latency-ms", type=float, default=60.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=250.0)
+    parser.add_argument("--judge-latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter", type=float, default=0.2, help="latency stddev as a fraction of the mean")
+    parser.add_argument("--provider-failure-rate", type=float, default=0.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--log-level", default="CRITICAL", help="pipeline log level (injected failures log at ERROR)")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    def behavior(latency_ms: float, failure_rate: float) -> StubBehavior:
+        return StubBehavior(latency_ms, latency_ms * args.jitter, failure_rate)
+
+    install_stubs(
+        StubConfig(
+            provider=behavior(args.provider_latency_ms, args.provider_failure_rate),
+            realize=behavior(args.llm_latency_ms, args.llm_failure_rate),
+            judge=behavior(args.judge_latency_ms, args.llm_failure_rate),
+            seed=args.seed,
+        )
+    )
+    settings.coalesce_enabled = args.coalesce
+
+    logging.basicConfig(level=args.log_level)
+    fixtures = load_requests(args.requests)
+    workloads = [
+        (f"fixture:{b['request_context']['placement']}:{b['request_context'].get('focus_ticker') or '-'}", b)
+        for b in fixtures
+    ]
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workloads += [(f"synthetic:{n}", synthetic_request(fixtures[0], n, args.seed)) for n in sizes]
+
+    results: List[Dict[str, Any]] = []
+    modes = [m.strip() for m in args.mode.split(",") if m.strip()]
+    for mode in modes:
+        if mode == "http":
+            from fastapi.testclient import TestClient
+
+            from app.main import create_app
+
+            client_cm = TestClient(create_app())
+            # create_app() configures INFO logging; keep the pipeline quiet.
+            logging.getLogger().setLevel(args.log_level)
+            client = client_cm.__enter__()
+            call = _http_call(client)
+        else:
+            client_cm, call = None, _engine_call()
+        try:
+            for name, body in workloads:
+                reset_llm_caches(args.warm_cache)
+                res = run_workload(
+                    name,
+                    mode,
+                    body,
+                    call,
+                    iterations=args.iterations,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                )
+                summary = res.summary()
+                results.append(summary)
+                lat = summary["latency_ms"]
+                print(
+                    f"{mode:<6} {name:<36} rps={summary['throughput_rps']:8.2f} "
+                    f"p50={lat.get('p50', 0):8.1f} p95={lat.get('p95', 0):8.1f} "
+                    f"p99={lat.get('p99', 0):8.1f} errors={res.errors}",
+                    flush=True,
+                )
+        finally:
+            if client_cm is not None:
+                client_cm.__exit__(None, None, None)
+
+    report = {
+        "benchmark": "pipeline",
+        "git": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
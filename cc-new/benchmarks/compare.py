@@ -0,0 +1,102 @@
+# benchmarks/compare.py
+"""
+Compare two bench_pipeline reports and flag regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.10
+
+Matches results by (mode, workload) and compares end-to-end and per-stage
+percentiles plus throughput. Exits 1 when any metric is worse by more than
+--threshold (relative) and more than --min-delta-ms (absolute).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict, List, Tuple
+
+METRICS = ("p50", "p95", "p99")
+
+
+def _index(report: Dict[str, Any]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    return {(r["mode"], r["workload"]): r for r in report.get("results", [])}
+
+
+def _rev(report: Dict[str, Any]) -> str:
+    git = report.get("git") or {}
+    sha = (git.get("sha") or "unknown")[:10]
+    return sha + ("+dirty" if git.get("dirty") else "")
+
+
+def compare(
+    base: Dict[str, Any],
+    head: Dict[str, Any],
+    *,
+    threshold: float,
+    min_delta_ms: float,
+) -> Tuple[List[str], List[str]]:
+    lines: List[str] = []
+    regressions: List[str] = []
+    base_idx, head_idx = _index(base), _index(head)
+
+    for key in sorted(base_idx.keys() & head_idx.keys()):
+        b, h = base_idx[key], head_idx[key]
+        label = f"{key[0]}/{key[1]}"
+
+        b_rps, h_rps = b.get("throughput_rps") or 0.0, h.get("throughput_rps") or 0.0
+        if b_rps:
+            change = (h_rps - b_rps) / b_rps
+            lines.append(f"{label:<46} throughput      {b_rps:9.2f} -> {h_rps:9.2f} rps ({change:+.1%})")
+            if change < -threshold:
+                regressions.append(f"{label} throughput {change:+.1%}")
+
+        series = [("latency", b.get("latency_ms", {}), h.get("latency_ms", {}))]
+        for stage in sorted(b.get("stages_ms", {}).keys() & h.get("stages_ms", {}).keys()):
+            series.append((stage, b["stages_ms"][stage], h["stages_ms"][stage]))
+
+        for name, bs, hs in series:
+            for m in METRICS:
+                if m not in bs or m not in hs:
+                    continue
+                delta = hs[m] - bs[m]
+                rel = delta / bs[m] if bs[m] else 0.0
+                flag = rel > threshold and delta > min_delta_ms
+                if flag:
+                    regressions.append(f"{label} {name} {m} {bs[m]:.1f} -> {hs[m]:.1f} ms ({rel:+.1%})")
+                if name == "latency" or flag:
+                    lines.append(f"{label:<46} {name + ' ' + m:<15} {bs[m]:9.1f} -> {hs[m]:9.1f} ms ({rel:+.1%})")
+
+    for key in sorted(base_idx.keys() - head_idx.keys()):
+        lines.append(f"{key[0]}/{key[1]}: missing from head")
+    return lines, regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.head, encoding="utf-8") as fh:
+        head = json.load(fh)
+
+    if base.get("config") != head.get("config"):
+        print("warning: reports were produced with different benchmark configs")
+
+    print(f"base {_rev(base)}  vs  head {_rev(head)}")
+    lines, regressions = compare(base, head, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        print("\n".join(f"  {r}" for r in regressions))
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
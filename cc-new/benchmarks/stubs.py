@@ -0,0 +1,208 @@
+# benchmarks/stubs.py
+"""
+Deterministic stand-ins for the market data providers and LLMs.
+
+Latency and failures are drawn from an RNG seeded by the stub's seed, the
+request content and how many times that content has been seen, so a workload
+replayed N times sees the same set of delays and injected failures regardless
+of thread scheduling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from app.llm.cache import canonical_hash
+from app.providers.base import (
+    ProviderCitation,
+    ProviderItem,
+    ProviderRequest,
+    ProviderResponse,
+    ProviderStatus,
+)
+
+
+class InjectedFailure(RuntimeError):
+    """Raised by a stub when failure injection fires."""
+
+
+@dataclass(frozen=True)
+class StubBehavior:
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    failure_rate: float = 0.0
+
+    def _draw(self, rng: random.Random) -> tuple[float, bool]:
+        delay = max(0.0, rng.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+        return delay, rng.random() < self.failure_rate
+
+    def apply(self, rng: random.Random, what: str) -> None:
+        delay, failed = self._draw(rng)
+        time.sleep(delay)
+        if failed:
+            raise InjectedFailure(f"injected failure in {what}")
+
+    async def aapply(self, rng: random.Random, what: str) -> None:
+        delay, failed = self._draw(rng)
+        await asyncio.sleep(delay)
+        if failed:
+            raise InjectedFailure(f"injected failure in {what}")
+
+
+class _Draws:
+    """Per-content call counter, so repeated identical calls get fresh draws."""
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self._seen: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def rng(self, *parts: Any) -> random.Random:
+        key = canonical_hash([self.seed, *parts])
+        with self._lock:
+            n = self._seen[key]
+            self._seen[key] += 1
+        return random.Random(f"{key}:{n}")
+
+
+class StubBenzinga:
+    name = "benzinga"
+
+    def __init__(self, behavior: StubBehavior, *, seed: int = 0, max_items: int = 500) -> None:
+        self.behavior = behavior
+        self.draws = _Draws(seed)
+        self.max_items = max_items
+
+    def healthcheck(self) -> ProviderStatus:
+        return ProviderStatus(ok=True, configured=True, message="benchmark stub")
+
+    def fetch(self, request: ProviderRequest) -> ProviderResponse:
+        tickers: List[str] = request.context.get("tickers", [])
+        rng = self.draws.rng(self.name, request.customer_id, tickers)
+        self.behavior.apply(rng, f"{self.name}.fetch")
+
+        firms = ["Morgan Stanley", "Goldman Sachs", "JPMorgan", "Barclays", "UBS"]
+        themes = ["dividend outlook", "earnings guidance", "ETF flows", "rates and inflation", "revenue growth"]
+        items: List[ProviderItem] = []
+        citations: List[ProviderCitation] = []
+        for symbol in tickers[: self.max_items]:
+            items.append(
+                ProviderItem(
+                    kind="analyst_context",
+                    title=f"{symbol} analyst commentary",
+                    summary=f"{rng.choice(firms)} discusses {rng.choice(themes)} for {symbol}.",
+                    url="",
+                    extra={"symbol": symbol, "firm": rng.choice(firms), "rating": "Neutral"},
+                )
+            )
+            citations.append(
+                ProviderCitation(
+                    source="Benzinga",
+                    title=f"Benzinga analyst insight for {symbol}",
+                    url="https://www.benzinga.com",
+                )
+            )
+        return ProviderResponse(self.name, items, citations, raw={"stub": True})
+
+
+class StubAlphaVantage:
+    name = "alphavantage"
+
+    def __init__(self, behavior: StubBehavior, *, seed: int = 0) -> None:
+        self.behavior = behavior
+        self.draws = _Draws(seed)
+
+    def healthcheck(self) -> ProviderStatus:
+        return ProviderStatus(ok=True, configured=True, message="benchmark stub")
+
+    def fetch(self, request: ProviderRequest) -> ProviderResponse:
+        tickers: List[str] = request.context.get("tickers", [])[:3]
+        items: List[ProviderItem] = []
+        citations: List[ProviderCitation] = []
+        for symbol in tickers:
+            rng = self.draws.rng(self.name, request.customer_id, symbol)
+            # One upstream call per symbol, like the real provider.
+            self.behavior.apply(rng, f"{self.name}.fetch")
+            lo = rng.uniform(20, 500)
+            hi = lo * rng.uniform(1.0, 1.08)
+            items.append(
+                ProviderItem(
+                    kind="price_context",
+                    title=f"{symbol} recent price activity",
+                    summary=f"Recent prices for {symbol} ranged between {lo:.2f} and {hi:.2f} over the last few sessions.",
+                    url="https://www.alphavantage.co/documentation/",
+                    extra={"symbol": symbol},
+                )
+            )
+            citations.append(
+                ProviderCitation(
+                    source="Alpha Vantage",
+                    title=f"Alpha Vantage TIME_SERIES_DAILY for {symbol}",
+                    url="https://www.alphavantage.co/documentation/",
+                )
+            )
+        return ProviderResponse(self.name, items, citations, raw={"stub": True})
+
+
+class StubLLM:
+    """
+    LLMProvider stand-in (sync and async); every judge call passes unless
+    failure injection fires.
+    """
+
+    model = "benchmark-stub"
+    prompt_version = "bench"
+
+    def __init__(
+        self,
+        name: str,
+        realize: StubBehavior,
+        judge: StubBehavior,
+        *,
+        seed: int = 0,
+    ) -> None:
+        self.name = name
+        self.realize_behavior = realize
+        self.judge_behavior = judge
+        self.draws = _Draws(seed)
+
+    def realize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        facts = payload.get("facts", [])
+        self.realize_behavior.apply(self.draws.rng(self.name, "realize", facts), f"{self.name}.realize")
+        return self._realized(facts)
+
+    async def arealize(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        facts = payload.get("facts", [])
+        await self.realize_behavior.aapply(self.draws.rng(self.name, "realize", facts), f"{self.name}.realize")
+        return self._realized(facts)
+
+    @staticmethod
+    def _realized(facts: List[str]) -> Dict[str, str]:
+        lead = facts[0] if facts else "Portfolio context"
+        return {
+            "headline": f"{lead[:60]} ({canonical_hash(facts)[:8]})",
+            "explanation": " ".join(facts[1:4]) or lead,
+            "personal_relevance": "This context relates to holdings you already track.",
+        }
+
+    def judge(self, text: str) -> Dict[str, str]:
+        self.judge_behavior.apply(self.draws.rng(self.name, "judge", text), f"{self.name}.judge")
+        return {"verdict": "PASS", "reason": "benchmark stub"}
+
+    def judge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        self.judge_behavior.apply(self.draws.rng(self.name, "judge_batch", texts), f"{self.name}.judge_batch")
+        return [{"verdict": "PASS", "reason": "benchmark stub"} for _ in texts]
+
+    async def ajudge(self, text: str) -> Dict[str, str]:
+        await self.judge_behavior.aapply(self.draws.rng(self.name, "judge", text), f"{self.name}.judge")
+        return {"verdict": "PASS", "reason": "benchmark stub"}
+
+    async def ajudge_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        await self.judge_behavior.aapply(self.draws.rng(self.name, "judge_batch", texts), f"{self.name}.judge_batch")
+        return [{"verdict": "PASS", "reason": "benchmark stub"} for _ in texts]
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.cache import RedisCache, SqliteCache, TieredCache
+
+
+def test_get_or_compute_runs_one_compute_for_concurrent_misses():
+    cache = TieredCache("t")
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return {"v": 1}
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: cache.get_or_compute("k", compute, 60), range(8)))
+    assert len(calls) == 1
+    assert results == [{"v": 1}] * 8
+    assert cache.get("k") == {"v": 1}
+
+
+def test_get_or_compute_skips_caching_rejected_values():
+    cache = TieredCache("t")
+    assert cache.get_or_compute("k", lambda: {}, 60, cache_if=bool) == {}
+    assert cache.get("k") is None
+
+
+def test_aget_or_compute_coalesces_and_shares_errors():
+    cache = TieredCache("t")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("k", compute, 60) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_leader_hands_the_compute_to_a_follower():
+    cache = TieredCache("t")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"v": calls}
+
+    async def run():
+        leader = asyncio.ensure_future(cache.aget_or_compute("k", compute, 60))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(cache.aget_or_compute("k", compute, 60)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(run()) == [{"v": 2}] * 3
+    assert calls == 2
+
+
+def test_cancelled_follower_leaves_the_leader_running():
+    cache = TieredCache("t")
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return {"v": 1}
+
+    async def run():
+        leader = asyncio.ensure_future(cache.aget_or_compute("k", compute, 60))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.aget_or_compute("k", compute, 60))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(run()) == {"v": 1}
+
+
+class _FakeRedis(RedisCache):
+    """RedisCache's lock and get/set contract in memory (no expiry)."""
+
+    def __init__(self):
+        self.data = {}
+        self.locks = set()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def get_with_ttl(self, key):
+        return None if key not in self.data else (self.data[key], None)
+
+    def set(self, key, value, ttl_s):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def try_lock(self, key, ttl_s):
+        if key in self.locks:
+            return False
+        self.locks.add(key)
+        return True
+
+    def unlock(self, key):
+        self.locks.discard(key)
+
+
+def test_local_copy_of_a_shared_hit_expires_with_the_shared_entry(tmp_path):
+    shared = SqliteCache(str(tmp_path / "cache.db"))
+    cache = TieredCache("t", shared=shared)
+    shared.set("t:k", {"v": 1}, 0.2)
+
+    assert cache.get("k") == {"v": 1}
+    time.sleep(0.25)
+    assert cache.get("k") is None
+
+
+def test_aget_or_compute_waits_on_another_process_holding_the_redis_lock():
+    shared = _FakeRedis()
+    cache = TieredCache("t", shared=shared)
+    shared.try_lock("t:k", 10)  # another process is computing
+    threading.Timer(0.1, shared.set, ("t:k", {"v": "theirs"}, 60)).start()
+
+    async def compute():
+        return {"v": "ours"}
+
+    assert asyncio.run(cache.aget_or_compute("k", compute, 60)) == {"v": "theirs"}
+
+
+def test_aget_or_compute_takes_and_releases_the_redis_lock():
+    shared = _FakeRedis()
+    cache = TieredCache("t", shared=shared)
+    held = []
+
+    async def compute():
+        held.append(set(shared.locks))
+        return {"v": 1}
+
+    assert asyncio.run(cache.aget_or_compute("k", compute, 60)) == {"v": 1}
+    assert held == [{"t:k"}]
+    assert not shared.locks
@@ -0,0 +1,65 @@
+import pytest
+
+from app.llm import compaction
+from app.llm.compaction import compact_facts, count_tokens, truncate_to_tokens
+
+
+class _SubwordEncoding:
+    """Stand-in for a tiktoken encoding: every 2 characters are one token."""
+
+    def encode(self, text):
+        raw = text.encode("utf-8")
+        return [raw[i : i + 2] for i in range(0, len(raw), 2)]
+
+    def decode_bytes(self, tokens):
+        return b"".join(tokens)
+
+
+@pytest.fixture()
+def subword(monkeypatch):
+    monkeypatch.setattr(compaction, "_encoding", _SubwordEncoding())
+
+
+def test_keeps_whole_sentences_that_fit():
+    text = "AAPL is 14% of holdings. It paid $150 in dividends. Educational note: prices move."
+    assert truncate_to_tokens(text, 12) == "AAPL is 14% of holdings."
+
+
+@pytest.mark.parametrize("max_tokens", [1, 2, 3, 7, 40])
+def test_hard_cut_stays_within_budget(max_tokens):
+    text = "word " * 60
+    out = truncate_to_tokens(text, max_tokens)
+    assert out.endswith("…")
+    assert count_tokens(out) <= max(max_tokens, 2)
+
+
+@pytest.mark.parametrize("max_tokens", [1, 5, 30, 59])
+def test_hard_cut_uses_the_counting_tokenizer(subword, max_tokens):
+    # Far more subword tokens than regex tokens: the cut must not index regex spans.
+    text = "supercalifragilistic " * 6
+    out = truncate_to_tokens(text, max_tokens)
+    assert out.endswith("…")
+    assert count_tokens(out) <= max(max_tokens, 1 + count_tokens("…"))
+
+
+def test_hard_cut_drops_split_multibyte_characters(subword):
+    out = truncate_to_tokens("€€€€€€€€", 3)
+    assert "�" not in out and out.endswith("…")
+
+
+def test_compact_merges_near_duplicates_and_keeps_priority_within_budget():
+    facts = [
+        "Educational note: diversification spreads risk across many holdings and sectors.",
+        "AAPL is 14% of your portfolio.",
+        "AAPL is  14% of your portfolio!",
+        "Your retirement goal is 71% funded.",
+    ]
+    out = compact_facts(facts, budget_tokens=24, max_fact_tokens=40)
+    assert out.deduped == 1
+    assert out.facts == ["AAPL is 14% of your portfolio.", "Your retirement goal is 71% funded."]
+    assert out.tokens_after <= 24
+
+
+def test_compact_never_returns_an_empty_bundle():
+    out = compact_facts(["User is viewing AAPL in positions " * 20], budget_tokens=10, max_fact_tokens=80)
+    assert len(out.facts) == 1 and out.facts[0].endswith("…")
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.engine.fanout import fan_out_providers
+from app.providers.base import ProviderRequest, ProviderResponse, ProviderStatus
+from app.providers.benzinga import BenzingaAnalystInsightsProvider
+
+
+def _preq(**context):
+    return ProviderRequest(customer_id="c1", as_of=datetime(2026, 1, 5, tzinfo=timezone.utc), context=context)
+
+
+class _SleepyProvider:
+    def __init__(self, name, seconds):
+        self.name = name
+        self.seconds = seconds
+        self.timeouts = []
+
+    def healthcheck(self):
+        return ProviderStatus(ok=True, configured=True, message="OK")
+
+    def fetch(self, request):
+        # Stands in for an HTTP call made with the capped timeout.
+        timeout = request.timeout_s(30)
+        self.timeouts.append(timeout)
+        time.sleep(min(self.seconds, timeout))
+        if self.seconds > timeout:
+            raise httpx.ReadTimeout("stub timeout")
+        return ProviderResponse(self.name, [], [])
+
+
+@pytest.fixture(autouse=True)
+def no_resilience(monkeypatch):
+    monkeypatch.setattr(settings, "resilience_enabled", False)
+
+
+def test_late_providers_are_dropped_and_the_rest_kept_in_order():
+    fast, slow = _SleepyProvider("fast", 0.0), _SleepyProvider("slow", 5.0)
+    start = time.perf_counter()
+    out = fan_out_providers([slow, fast], _preq(), "t", timeout_s=0.2, budget_s=1.0)
+    assert [r.provider for r in out] == ["fast"]
+    assert time.perf_counter() - start < 0.5
+
+
+def test_provider_http_calls_are_capped_at_their_deadline():
+    slow = _SleepyProvider("slow", 5.0)
+    fan_out_providers([slow], _preq(), "t", timeout_s=0.2, budget_s=1.0)
+    assert slow.timeouts and slow.timeouts[0] <= 0.2
+
+
+def test_timeout_is_the_cap_without_a_deadline():
+    assert _preq().timeout_s(15) == 15
+
+
+def test_benzinga_passes_the_capped_timeout_to_httpx(monkeypatch):
+    monkeypatch.setattr(settings, "benzinga_api_key", "test")
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"analyst-insights": []})
+
+    provider = BenzingaAnalystInsightsProvider(
+        http=httpx.Client(transport=httpx.MockTransport(handler)),
+        cache=TieredCache("t"),
+    )
+    deadline = time.monotonic() + 2.0
+    provider.fetch(ProviderRequest("c1", datetime.now(timezone.utc), {"tickers": ["AAPL"]}, deadline=deadline))
+    assert timeouts and timeouts[0] <= 2.0
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.llm.hedge import HedgedLLM, LatencyTracker
+from app.llm.streaming import RealizeAborted
+
+REALIZED = {"headline": "h", "explanation": "e", "personal_relevance": "p"}
+
+
+class _FakeLLM:
+    def __init__(self, name, latencies, fail=False):
+        self.name = name
+        self.latencies = list(latencies)
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    def _next(self):
+        self.calls += 1
+        return self.latencies[(self.calls - 1) % len(self.latencies)]
+
+    def realize(self, payload):
+        time.sleep(self._next())
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return dict(REALIZED, headline=self.name)
+
+    async def arealize(self, payload):
+        try:
+            await asyncio.sleep(self._next())
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return dict(REALIZED, headline=self.name)
+
+    def realize_stream(self, payload, on_field):
+        out = self.realize(payload)
+        on_field("headline", out["headline"])
+        return out
+
+    async def arealize_stream(self, payload, on_field):
+        out = await self.arealize(payload)
+        on_field("headline", out["headline"])
+        return out
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_percentile", 95.0)
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 4)
+    monkeypatch.setattr(settings, "llm_hedge_initial_delay_s", 0.1)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_s", 0.005)
+    monkeypatch.setattr(settings, "llm_hedge_max_delay_s", 1.0)
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = _FakeLLM("a", [0.0]), _FakeLLM("b", [0.0])
+    llm = HedgedLLM(primary, secondary, tracker=LatencyTracker())
+    assert asyncio.run(llm.arealize({}))["headline"] == "a"
+    assert llm.realize({})["headline"] == "a"
+    assert secondary.calls == 0
+
+
+def test_slow_primary_loses_to_secondary_and_is_recorded_when_cancelled():
+    tracker = LatencyTracker()
+    llm = HedgedLLM(_FakeLLM("a", [5.0]), _FakeLLM("b", [0.01]), tracker=tracker)
+    start = time.perf_counter()
+    assert asyncio.run(llm.arealize({}))["headline"] == "b"
+    assert time.perf_counter() - start < 1.0
+    # The cancelled primary is kept at (at least) its elapsed time.
+    assert tracker.percentile("a", "realize", 50) >= 0.1
+
+
+def test_delay_does_not_collapse_when_slow_primaries_are_cancelled():
+    # Half the primary calls are slow; the p95 delay must not drift down to the fast half.
+    tracker = LatencyTracker()
+    llm = HedgedLLM(_FakeLLM("a", [0.01, 0.5]), _FakeLLM("b", [0.01]), tracker=tracker)
+
+    async def run():
+        for _ in range(12):
+            await llm.arealize({})
+
+    asyncio.run(run())
+    assert llm.hedge_delay("realize") >= settings.llm_hedge_initial_delay_s
+
+
+def test_failing_primary_is_hedged_without_waiting_out_the_delay():
+    llm = HedgedLLM(_FakeLLM("a", [0.0], fail=True), _FakeLLM("b", [0.0]), tracker=LatencyTracker())
+    start = time.perf_counter()
+    assert asyncio.run(llm.arealize({}))["headline"] == "b"
+    assert llm.realize({})["headline"] == "b"
+    assert time.perf_counter() - start < 0.1
+
+
+def test_both_failing_raises_the_primary_error():
+    llm = HedgedLLM(_FakeLLM("a", [0.0], fail=True), _FakeLLM("b", [0.0], fail=True), tracker=LatencyTracker())
+    with pytest.raises(RuntimeError, match="a down"):
+        asyncio.run(llm.arealize({}))
+    with pytest.raises(RuntimeError, match="a down"):
+        llm.realize({})
+
+
+def test_sync_path_returns_the_secondary_when_the_primary_is_slow():
+    llm = HedgedLLM(_FakeLLM("a", [0.4]), _FakeLLM("b", [0.0]), tracker=LatencyTracker())
+    start = time.perf_counter()
+    assert llm.realize({})["headline"] == "b"
+    assert time.perf_counter() - start < 0.3
+
+
+def test_streamed_realize_is_hedged_and_checked():
+    seen = []
+    llm = HedgedLLM(_FakeLLM("a", [5.0]), _FakeLLM("b", [0.0]), tracker=LatencyTracker())
+
+    assert asyncio.run(llm.arealize_stream({}, lambda f, v: seen.append(v)))["headline"] == "b"
+    assert seen == ["b"]
+
+
+def test_stream_abort_ends_the_call_without_hedging():
+    def reject(field, value):
+        raise RealizeAborted("repeat", field)
+
+    secondary = _FakeLLM("b", [0.0])
+    llm = HedgedLLM(_FakeLLM("a", [0.0]), secondary, tracker=LatencyTracker())
+
+    with pytest.raises(RealizeAborted):
+        asyncio.run(llm.arealize_stream({}, reject))
+    with pytest.raises(RealizeAborted):
+        llm.realize_stream({}, reject)
+    assert secondary.calls == 0
+
+
+def test_cancelling_the_caller_before_the_hedge_cancels_the_primary():
+    primary = _FakeLLM("a", [5.0])
+    llm = HedgedLLM(primary, _FakeLLM("b", [0.0]), tracker=LatencyTracker())
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm.arealize({}), timeout=0.02)
+        await asyncio.sleep(0)
+        return primary.cancelled
+
+    assert asyncio.run(run())
@@ -0,0 +1,18 @@
+import pytest
+
+from app.core.cache import TieredCache
+from app.engine.precompute import precompute_store
+from app.jobs import precompute
+
+
+def test_main_refuses_to_run_without_a_shared_store(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(precompute_store, "cache", TieredCache("precompute", shared=None))
+    monkeypatch.setattr(precompute, "run_precompute", pytest.fail)
+    path = tmp_path / "snapshots.jsonl"
+    path.write_text("")
+
+    with pytest.raises(SystemExit) as exc:
+        precompute.main([str(path)])
+
+    assert exc.value.code != 0
+    assert "PRECOMPUTE_STORE_URL" in capsys.readouterr().err
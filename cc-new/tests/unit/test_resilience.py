@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.core.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    ResilienceConfig,
+    Upstream,
+    UpstreamUnavailable,
+)
+
+
+def _upstream(**overrides):
+    cfg = dict(initial_limit=4, min_limit=1, max_limit=8, window=10, min_calls=4, open_s=30.0)
+    cfg.update(overrides)
+    return Upstream("test", ResilienceConfig(**cfg))
+
+
+def _fail(u, exc=RuntimeError):
+    with pytest.raises(exc):
+        with u.guard():
+            raise exc("boom")
+
+
+def test_limit_refuses_calls_over_the_limit():
+    u = _upstream(initial_limit=2)
+    with u.guard(), u.guard():
+        with pytest.raises(UpstreamUnavailable) as e:
+            with u.guard():
+                pass
+    assert e.value.reason == "concurrency_limit"
+    assert u.limiter.inflight == 0
+
+
+def test_limit_grows_additively_and_backs_off_multiplicatively():
+    u = _upstream(initial_limit=4, backoff=0.5)
+    for _ in range(4):
+        u.call(lambda: None)
+    assert u.limiter.limit == pytest.approx(5.0, abs=0.1)
+    _fail(u)
+    assert u.limiter.limit == pytest.approx(2.5, abs=0.1)
+
+
+def test_breaker_opens_on_error_rate_and_closes_after_a_good_probe():
+    cfg = ResilienceConfig(window=10, min_calls=4, error_rate=0.5, open_s=30.0)
+    b = CircuitBreaker(cfg)
+    for error in (False, True, False):
+        assert b.record(error, False, now=0.0) is None
+    assert b.record(True, False, now=0.0) == OPEN
+    assert not b.allow(now=10.0)
+    assert b.allow(now=31.0) and b.state == HALF_OPEN
+    assert not b.allow(now=31.0)  # one probe at a time
+    assert b.record(False, False, now=32.0) == CLOSED
+
+
+def test_slow_calls_count_against_the_breaker():
+    b = CircuitBreaker(ResilienceConfig(min_calls=2, slow_rate=0.5))
+    b.record(False, False, now=0.0)
+    assert b.record(False, True, now=0.0) == OPEN
+
+
+def test_ok_errors_count_as_good_calls():
+    u = _upstream()
+    for _ in range(6):
+        with pytest.raises(KeyError):
+            with u.guard(ok_errors=(KeyError,)):
+                raise KeyError("caller check")
+    assert u.breaker.state == CLOSED
+    assert u.limiter.limit > 4
+
+
+def test_cancelled_calls_are_neutral():
+    u = _upstream()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def run():
+        for _ in range(10):
+            task = asyncio.ensure_future(u.acall(slow))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+    assert u.limiter.inflight == 0
+    assert u.limiter.limit == 4
+    assert u.breaker.state == CLOSED
+    assert len(u.breaker._outcomes) == 0
+
+
+def test_closed_generator_inside_guard_is_neutral():
+    u = _upstream()
+
+    def stream():
+        with u.guard():
+            yield 1
+            yield 2
+
+    for _ in range(10):
+        gen = stream()
+        next(gen)
+        gen.close()
+    assert u.limiter.inflight == 0 and u.limiter.limit == 4
+    assert len(u.breaker._outcomes) == 0
+
+
+def test_cancelled_half_open_probe_frees_the_probe_slot():
+    u = _upstream(open_s=0.0, min_calls=1)
+    _fail(u)
+    assert u.breaker.state == OPEN
+
+    async def run():
+        task = asyncio.ensure_future(u.acall(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert u.breaker.state == HALF_OPEN
+    u.call(lambda: None)
+    assert u.breaker.state == CLOSED
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.api.schemas import Placement, RequestContext, Trigger
+from app.engine.realize import _arun_bounded, arealize_checked, realize_checked
+from app.engine.signals import SignalBundle
+from app.llm.streaming import JsonFieldStream, sse_event
+
+REALIZED = {"headline": "Your goal is 71% funded", "explanation": "Progress so far.", "personal_relevance": "It is yours."}
+
+
+def _chunks(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_fields_are_reported_as_they_close_at_any_chunking(size):
+    text = '```json\n{"headline": "A \\"quoted\\" word", "n": 3, "nested": {"x": "skip"}, "list": ["a"], "tail": "é\\n"}'
+    stream = JsonFieldStream()
+    seen = [pair for chunk in _chunks(text, size) for pair in stream.feed(chunk)]
+    assert seen == [("headline", 'A "quoted" word'), ("tail", "é\n")]
+    assert stream.text == text
+
+
+def test_headline_is_reported_before_the_rest_arrives():
+    stream = JsonFieldStream()
+    assert stream.feed('{"headline": "H", "expla') == [("headline", "H")]
+    assert stream.feed('nation": "E"}') == [("explanation", "E")]
+
+
+def test_sse_event_decodes_data_lines_only():
+    assert sse_event('data: {"a": 1}') == {"a": 1}
+    assert sse_event("event: ping") is None
+    assert sse_event("data: [DONE]") is None
+    assert sse_event("data:") is None
+
+
+class _StreamingLLM:
+    name = "fake"
+    model = "fake-1"
+    prompt_version = "t"
+
+    def __init__(self, realized, delay=0.05):
+        self.realized = realized
+        self.delay = delay
+        self.calls = 0
+
+    def realize(self, payload):
+        self.calls += 1
+        return dict(self.realized)
+
+    def realize_stream(self, payload, on_field):
+        self.calls += 1
+        time.sleep(self.delay)
+        for field, value in JsonFieldStream().feed(json.dumps(self.realized)):
+            on_field(field, value)
+        return dict(self.realized)
+
+
+def _rc(recent=()):
+    return RequestContext(placement=Placement.INVESTMENT_DASHBOARD, trigger=Trigger.APP_OPEN, recent_headlines=list(recent))
+
+
+def _bundle():
+    # Unique facts so each test starts from a cold realization cache.
+    return SignalBundle(kind="goal_portfolio", facts=[f"Goal progress is 71% ({uuid.uuid4()})."], citations=[])
+
+
+def test_repeat_aborts_the_stream_and_skips_the_bundle():
+    llm = _StreamingLLM(REALIZED)
+    assert realize_checked(llm, _bundle(), _rc([REALIZED["headline"]]), "t") is None
+    assert llm.calls == 1
+
+
+def test_one_users_repeat_does_not_abort_other_users_sharing_the_facts():
+    llm = _StreamingLLM(REALIZED)
+    bundle = _bundle()
+
+    def seen_it():
+        return realize_checked(llm, bundle, _rc([REALIZED["headline"]]), "a")
+
+    def new_user():
+        time.sleep(0.01)
+        return realize_checked(llm, bundle, _rc(), "b")
+
+    with ThreadPoolExecutor(2) as pool:
+        a, b = pool.submit(seen_it), pool.submit(new_user)
+        assert a.result() is None
+        assert b.result() == REALIZED
+
+
+def test_users_without_recent_headlines_share_one_stream():
+    llm = _StreamingLLM(REALIZED)
+    bundle = _bundle()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: realize_checked(llm, bundle, _rc(), "t"), range(4)))
+    assert results == [REALIZED] * 4
+    assert llm.calls == 1
+
+
+def test_policy_abort_raises_field_and_reason():
+    stream_llm = _StreamingLLM(dict(REALIZED, explanation="You should buy more now."))
+    with pytest.raises(ValueError, match="Non-advisory"):
+        realize_checked(stream_llm, _bundle(), _rc(), "t")
+    assert stream_llm.calls == 2  # one retry after the first abort
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_cached_headline_the_user_has_seen_is_realized_afresh(monkeypatch, streaming):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "realize_streaming_enabled", streaming)
+    bundle = _bundle()
+    assert realize_checked(_StreamingLLM(REALIZED), bundle, _rc(), "a") == REALIZED
+
+    fresh = dict(REALIZED, headline="Your goal is 72% funded")
+    llm = _StreamingLLM(fresh)
+    assert realize_checked(llm, bundle, _rc([REALIZED["headline"]]), "b") == fresh
+    assert llm.calls == 1
+    # The shared entry is kept for users who have not seen it.
+    assert realize_checked(llm, bundle, _rc(), "c") == REALIZED
+    assert llm.calls == 1
+
+
+def test_cached_headline_the_user_has_seen_is_realized_afresh_async():
+    bundle = _bundle()
+    assert asyncio.run(arealize_checked(_StreamingLLM(REALIZED), bundle, _rc(), "a")) == REALIZED
+
+    fresh = dict(REALIZED, headline="Your goal is 72% funded")
+    llm = _StreamingLLM(fresh)
+    assert asyncio.run(arealize_checked(llm, bundle, _rc([REALIZED["headline"]]), "b")) == fresh
+    assert asyncio.run(arealize_checked(llm, bundle, _rc(), "c")) == REALIZED
+    assert llm.calls == 1
+
+
+def test_cancelled_bounded_run_cancels_bundles_in_flight():
+    cancelled = []
+
+    async def slow(bundle):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(bundle)
+            raise
+
+    bundles = [_bundle() for _ in range(4)]
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(_arun_bounded(slow, bundles, cap=2), timeout=0.02)
+        return list(cancelled)
+
+    assert asyncio.run(run()) == bundles[:2]
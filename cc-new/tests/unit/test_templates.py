@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from app.api.schemas import GenerateInsightsRequest
+from app.engine.generator import plan_bundles
+from app.engine.normalize import normalize_pipeline_payload
+from app.engine.templates import TEMPLATES, realize_bundles_from_templates, templates_for
+from cc_common.compliance import CompiledPolicy, DEFAULT_POLICY
+
+SLOTS = {
+    "focus_ticker": "AAPL",
+    "holdings_count": 4,
+    "goal_progress_pct": "62",
+    "retirement_goal_year": 2045,
+    "top_ticker": "MSFT",
+    "top_tickers": "MSFT, AAPL, VTI",
+    "largest_pct": "38",
+    "dividend_yield_pct": "1.85",
+    "equiv_positions": "3.1",
+}
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks", "fixtures", "requests.jsonl")
+
+ALL = sorted({t for ts in TEMPLATES.values() for t in ts}, key=lambda t: t.id)
+
+
+@pytest.mark.parametrize("template", ALL, ids=lambda t: t.id)
+def test_every_template_renders_within_compliance_policy(template):
+    policy = CompiledPolicy.from_dict(DEFAULT_POLICY)
+
+    realized = template.render(SLOTS)
+
+    for text in realized.values():
+        assert policy.scan(text) == [], text
+
+
+def test_template_ids_are_unique():
+    assert len({t.id for t in ALL}) == len(ALL)
+
+
+def test_archetype_and_tier_variants_come_before_generic():
+    ids = [t.id for t in templates_for("goal_portfolio", "ADVANCED", "OVER_1M")]
+
+    assert ids[0] == "goal_portfolio.advanced.effective_count"
+    assert ids.index("goal_portfolio.advanced.effective_count") < ids.index(TEMPLATES[("goal_portfolio", None, "OVER_1M")][0].id)
+    assert ids[-1] == TEMPLATES[("goal_portfolio", None, None)][-1].id
+    assert "goal_portfolio.everyday.progress" not in ids
+    assert "goal_portfolio.under_250k.building" not in ids
+
+
+def test_every_kind_ends_with_a_slot_free_fallback():
+    for (kind, archetype, tier), templates in TEMPLATES.items():
+        if archetype is None and tier is None:
+            assert not templates[-1].slots and templates[-1].when is None, kind
+
+
+def test_variant_is_skipped_when_its_slots_are_missing():
+    slots = dict(SLOTS, dividend_yield_pct=None)
+
+    applicable = [t.id for t in templates_for("advanced_performance", "ADVANCED", "OVER_1M") if t.applies(slots)]
+
+    assert "advanced_performance.over_1m.income" not in applicable
+    assert applicable
+
+
+def _plan(placement, level, assets, focus_ticker=None):
+    with open(FIXTURES, encoding="utf-8") as fh:
+        body = json.loads(fh.readline())
+    body["payload"]["user"]["investment_experience_level"] = level
+    body["payload"]["wealth_snapshot"]["total_investable_assets"] = assets
+    body["request_context"].update(placement=placement, focus_ticker=focus_ticker)
+    req = GenerateInsightsRequest.model_validate(body)
+    context = normalize_pipeline_payload(req.payload)
+    return plan_bundles(context, req.request_context, []), context, req.request_context
+
+
+@pytest.mark.parametrize(
+    "placement, level, assets, focus_ticker, expected",
+    [
+        ("INVESTMENT_DASHBOARD", "advanced", 1_050_000, None, "goal_portfolio.advanced.effective_count"),
+        ("INVESTMENT_DASHBOARD", "beginner", 120_000, None, "goal_portfolio.everyday.progress"),
+        ("POSITIONS", "advanced", 1_050_000, "AAPL", "advanced_positions.over_1m.total_return"),
+        ("POSITIONS", "beginner", 120_000, "AAPL", "everyday_positions.under_250k.few"),
+        ("PERFORMANCE", "advanced", 1_050_000, None, "advanced_performance.over_1m.income"),
+        ("PERFORMANCE", "beginner", 120_000, None, "everyday_performance.under_250k.contributions"),
+    ],
+)
+def test_planned_bundles_select_their_archetype_and_tier_variants(placement, level, assets, focus_ticker, expected):
+    bundles, context, rc = _plan(placement, level, assets, focus_ticker)
+
+    realized = realize_bundles_from_templates(bundles, context, rc, "t")
+
+    assert f"pre-approved template {expected}" in [rb.verdict["reason"] for rb in realized]
+
+
+def test_every_archetype_variant_is_for_a_kind_planned_for_that_archetype():
+    planned = {
+        archetype: {
+            bundle.kind
+            for placement in ("INVESTMENT_DASHBOARD", "POSITIONS", "PERFORMANCE")
+            for bundle in _plan(placement, level, 1_050_000, "AAPL")[0]
+        }
+        for archetype, level in (("ADVANCED", "advanced"), ("EVERYDAY", "beginner"))
+    }
+
+    for kind, archetype, _ in TEMPLATES:
+        if archetype is not None:
+            assert kind in planned[archetype], (kind, archetype)
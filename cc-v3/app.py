@@ -3,12 +3,12 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
+from cc_common.ticker_catalog import TickerCatalog, TickerEntry
 from llm import AnthropicLLM
 from market_data import AlphaVantageClient
 
@@ -50,28 +50,35 @@ class ZeroBalanceResponse(BaseModel):
 
 # --- Helper Functions ---
 
-def load_static_tickers() -> list[dict]:
-    """Load top tickers from static file."""
-    static_file = Path("static_top_tickers.txt")
-    if not static_file.exists():
-        logger.warning(f"Static tickers file not found at {static_file.absolute()}")
-        return []
-
-    entries = []
-    with static_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            parts = [p.strip() for p in line.split("|")]
-            entries.append({
-                "symbol": parts[0].upper(),
-                "name": parts[1] if len(parts) > 1 else parts[0],
-                "change": parts[2] if len(parts) > 2 else "",
-                "note": parts[3] if len(parts) > 3 else "strong recent momentum"
-            })
-    logger.debug(f"Loaded {len(entries)} static tickers")
-    return entries
+def render_suggestion(top_3: tuple[TickerEntry, ...], months: int | None) -> tuple[str, tuple[dict, ...]]:
+    """Header and suggestion rows for a dormant user inactive for `months`."""
+    if months:
+        month_label = "months" if months > 1 else "month"
+        header = (
+            f"We noticed you haven't been active for about {months} {month_label}. "
+            "Here are three stocks that have been performing well recently to help you get back into the flow."
+        )
+    else:
+        header = (
+            "Welcome back! Here are three stocks that have been performing well recently "
+            "to help you get back into the flow."
+        )
+
+    suggestions = tuple(
+        {
+            "symbol": e.symbol,
+            "name": e.name,
+            "change": e.change,
+            "note": e.note,
+            "display": f"{e.symbol} ({e.name}) - {e.note} {e.change}"
+        }
+        for e in top_3
+    )
+    return header, suggestions
+
+
+# Parsed once and re-read on change; suggestions are pre-rendered per month bucket.
+static_tickers = TickerCatalog("static_top_tickers.txt", render_suggestion)
 
 
 def calculate_inactive_months(last_activity: str | None) -> int | None:
@@ -130,42 +137,18 @@ def zero_balance_suggestion(request: ZeroBalanceRequest):
     """Generate suggestions for zero-balance/dormant users using static top tickers."""
     logger.info(f"[/zero_balance_suggestion] account_id={request.account_id}")
 
-    entries = load_static_tickers()
-    if not entries:
+    rendered = static_tickers.suggestion(calculate_inactive_months(request.last_activity_date))
+    if rendered is None:
         logger.error("[/zero_balance_suggestion] Static tickers file not found or empty")
         raise HTTPException(status_code=500, detail="Static tickers file not found")
 
-    top_3 = entries[:3]
-
-    # Build personalized message
-    months = calculate_inactive_months(request.last_activity_date)
-    if months:
-        month_label = "months" if months > 1 else "month"
-        header = (
-            f"We noticed you haven't been active for about {months} {month_label}. "
-            "Here are three stocks that have been performing well recently to help you get back into the flow."
-        )
-    else:
-        header = (
-            "Welcome back! Here are three stocks that have been performing well recently "
-            "to help you get back into the flow."
-        )
-
-    suggestions = []
-    for e in top_3:
-        suggestions.append({
-            "symbol": e["symbol"],
-            "name": e["name"],
-            "change": e["change"],
-            "note": e["note"],
-            "display": f"{e['symbol']} ({e['name']}) - {e['note']} {e['change']}"
-        })
+    header, suggestions = rendered
 
     logger.info(f"[/zero_balance_suggestion] Returning {len(suggestions)} suggestions")
     return ZeroBalanceResponse(
         account_id=request.account_id,
         message=header,
-        suggestions=suggestions
+        suggestions=[dict(s) for s in suggestions]
     )
 
 
@@ -0,0 +1,30 @@
+"""httpx clients that record/replay through the shared cassette transport.
+
+The transport lives in cc_common.cassette (../cc-common, installed by
+requirements.txt). Configured with CASSETTE_MODE, CASSETTE_DIR and
+CASSETTE_TIMING.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+
+from cc_common.cassette import wrap_transport
+
+load_dotenv()
+
+
+def http_client(name: str, **kwargs: Any) -> httpx.Client:
+    """httpx.Client for upstream `name`, recording/replaying per CASSETTE_MODE."""
+    transport = wrap_transport(
+        name,
+        httpx.HTTPTransport(),
+        mode=os.getenv("CASSETTE_MODE", "off"),
+        directory=os.getenv("CASSETTE_DIR", "cassettes"),
+        timing=os.getenv("CASSETTE_TIMING", "none"),
+    )
+    return httpx.Client(transport=transport, **kwargs)
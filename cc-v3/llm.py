@@ -8,10 +8,35 @@ import os
 import httpx
 from dotenv import load_dotenv
 
+from cassette import http_client
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Shared across requests (keep-alive); records/replays per CASSETTE_MODE.
+_http = http_client("anthropic", timeout=30)
+
+# Fixed instructions, sent as a cache_control system prefix so repeat calls
+# read them from Anthropic's prompt cache; only holdings and market data vary.
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "1") != "0"
+
+INSIGHT_SYSTEM = """
+You generate investor-friendly insights for a wealth app.
+
+Style:
+- Concise, confident, consumer-friendly.
+- Phrase anything action-ish as educational exploration (e.g., "Some investors explore...", "It may be useful to learn...").
+- No direct advice or calls to action (no "you should", no "buy/sell", no "% shift").
+- NEVER use these words anywhere: buy, sell, short, long.
+- If you would normally use them, replace with neutral phrasing like:
+  "increase exposure", "reduce exposure", "positioning", "market sentiment".
+- Use ONLY the facts provided. Do not invent numbers.
+
+Return ONLY JSON with this structure:
+{ "headline": "...", "explanation": "...", "personal_relevance": "..." }
+""".strip()
+
 
 def _strip_code_fences(text: str) -> str:
     """Claude often wraps JSON in ```json ... ``` fences. Strip those safely."""
@@ -57,18 +82,34 @@ class AnthropicLLM:
         first = blocks[0] if blocks else {}
         return (first.get("text") or "").strip()
 
-    def _call_api(self, prompt: str, max_tokens: int = 300) -> str:
+    def _system(self, text: str) -> str | list[dict]:
+        if not PROMPT_CACHE_ENABLED:
+            return text
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+    def _log_usage(self, usage: dict | None) -> None:
+        """input_tokens excludes prompt-cache reads and writes."""
+        usage = usage or {}
+        logger.info(
+            f"Anthropic usage: cached_input={usage.get('cache_read_input_tokens') or 0} "
+            f"uncached_input={usage.get('input_tokens') or 0} "
+            f"cache_write={usage.get('cache_creation_input_tokens') or 0} "
+            f"output={usage.get('output_tokens') or 0}"
+        )
+
+    def _call_api(self, system: str, prompt: str, max_tokens: int = 300) -> str:
         """Make API call and return extracted text."""
         body = {
             "model": self.MODEL,
             "max_tokens": max_tokens,
+            "system": self._system(system),
             "messages": [{"role": "user", "content": prompt}],
         }
         logger.debug(f"Calling Anthropic API with model={self.MODEL}, max_tokens={max_tokens}")
         logger.debug(f"Prompt length: {len(prompt)} chars")
 
         try:
-            r = httpx.post(self.BASE_URL, headers=self._headers(), json=body, timeout=30)
+            r = _http.post(self.BASE_URL, headers=self._headers(), json=body)
             logger.debug(f"Anthropic API response status: {r.status_code}")
 
             if r.status_code != 200:
@@ -76,6 +117,7 @@ class AnthropicLLM:
 
             r.raise_for_status()
             response_json = r.json()
+            self._log_usage(response_json.get("usage"))
             text = _strip_code_fences(self._extract_text(response_json))
             logger.debug(f"Extracted response text ({len(text)} chars): {text[:200]}...")
             return text
@@ -92,27 +134,13 @@ class AnthropicLLM:
         logger.debug(f"Market data: {market_data}")
 
         prompt = f"""
-You generate investor-friendly insights for a wealth app.
-
-Style:
-- Concise, confident, consumer-friendly.
-- Phrase anything action-ish as educational exploration (e.g., "Some investors explore...", "It may be useful to learn...").
-- No direct advice or calls to action (no "you should", no "buy/sell", no "% shift").
-- NEVER use these words anywhere: buy, sell, short, long.
-- If you would normally use them, replace with neutral phrasing like:
-  "increase exposure", "reduce exposure", "positioning", "market sentiment".
-- Use ONLY the facts provided. Do not invent numbers.
-
-Return ONLY JSON with this structure:
-{{ "headline": "...", "explanation": "...", "personal_relevance": "..." }}
-
 User's Holdings: {', '.join(tickers)}
 
 Market Data:
 {json.dumps(market_data, indent=2)}
 """.strip()
 
-        text = self._call_api(prompt)
+        text = self._call_api(INSIGHT_SYSTEM, prompt)
         if not text:
             logger.error("Anthropic returned empty response")
             raise RuntimeError("Anthropic returned empty response")
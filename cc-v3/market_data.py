@@ -7,10 +7,15 @@ import os
 import httpx
 from dotenv import load_dotenv
 
+from cassette import http_client
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Shared across requests (keep-alive); records/replays per CASSETTE_MODE.
+_http = http_client("alphavantage", timeout=15)
+
 
 class AlphaVantageClient:
     """Fetch stock price data from Alpha Vantage API."""
@@ -49,7 +54,7 @@ class AlphaVantageClient:
                     "outputsize": "compact",
                     "apikey": self.api_key,
                 }
-                r = httpx.get(self.BASE_URL, params=params, timeout=15)
+                r = _http.get(self.BASE_URL, params=params)
                 logger.debug(f"Alpha Vantage response for {symbol}: status={r.status_code}")
 
                 if r.status_code != 200:
@@ -98,7 +98,14 @@ def _hypothesize_themes(state: InsightsState, deps: InsightsFlowDeps) -> dict:
 
     themes = _safe_json(resp.text).get("themes") or []
     themes = [t.strip() for t in themes if isinstance(t, str) and t.strip()]
-    logger.info("insights.hypothesize_themes", fields={"themes_count": len(themes)})
+    logger.info(
+        "insights.hypothesize_themes",
+        fields={
+            "themes_count": len(themes),
+            "input_tokens": resp.input_tokens,
+            "cached_input_tokens": resp.cached_input_tokens,
+        },
+    )
     return {"themes": themes}
 
 
@@ -131,7 +138,14 @@ def _synthesize_insights(state: InsightsState, deps: InsightsFlowDeps) -> dict:
     )
     drafts = _safe_json(resp.text).get("insights") or []
     drafts = [d for d in drafts if isinstance(d, dict)]
-    logger.info("insights.synthesize_insights", fields={"drafts": len(drafts)})
+    logger.info(
+        "insights.synthesize_insights",
+        fields={
+            "drafts": len(drafts),
+            "input_tokens": resp.input_tokens,
+            "cached_input_tokens": resp.cached_input_tokens,
+        },
+    )
     return {"insight_drafts": drafts}
 
 
@@ -0,0 +1,26 @@
+#src/core/cassette.py
+"""
+httpx clients that record/replay through the shared cassette transport
+(cc_common.cassette), configured from settings.cassette_*.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+from cc_common.cassette import wrap_transport
+from core.config.settings import settings
+
+
+def http_client(name: str, **kwargs: Any) -> httpx.Client:
+    """httpx.Client for upstream `name`, recording/replaying per settings.cassette_mode."""
+    transport = wrap_transport(
+        name,
+        httpx.HTTPTransport(),
+        mode=settings.cassette_mode,
+        directory=settings.cassette_dir,
+        timing=settings.cassette_timing,
+    )
+    return httpx.Client(transport=transport, **kwargs)
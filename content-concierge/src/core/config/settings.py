@@ -36,6 +36,22 @@ class Settings(BaseSettings):
 
     benzinga_analyst_base_url: str = "https://api.benzinga.com/api/v1/analyst/insights"
     benzinga_api_key: str | None = None
+    # Per-symbol cache for analyst insights; misses are batched into few calls
+    benzinga_cache_ttl_s: int = 900
+    benzinga_symbols_per_call: int = 50
+    benzinga_batch_page_size: int = 500
+    benzinga_batch_max_pages: int = 4
+    benzinga_items_per_symbol: int = 10
+
+    # Record/replay of upstream HTTP (off | record | replay | auto); replay timing
+    # "none" returns immediately, "original" sleeps for the recorded latency.
+    cassette_mode: str = "off"
+    cassette_dir: str = "cassettes"
+    cassette_timing: str = "none"
+
+    # Compliance phrase policy (JSON); built-in rules when unset. Re-read on change.
+    compliance_policy_path: str | None = None
+    compliance_reload_interval_s: float = 2.0
 
 
 
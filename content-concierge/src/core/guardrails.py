@@ -1,24 +1,21 @@
 #src/core/guardrails.py
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from typing import Iterable
 
+from cc_common.compliance import DEFAULT_POLICY, ComplianceScanner
+from core.config.settings import settings
 
-PRESCRIPTIVE_PATTERNS = [
-    r"\bshould buy\b",
-    r"\bshould sell\b",
-    r"\bbuy now\b",
-    r"\bsell now\b",
-    r"\brecommend\b",
-    r"\byou should\b",
-    r"\bstrong buy\b",
-    r"\bstrong sell\b",
-    r"\btarget price\b",
-]
 
-PRESCRIPTIVE_RE = re.compile("|".join(PRESCRIPTIVE_PATTERNS), re.IGNORECASE)
+PRESCRIPTIVE = "prescriptive"
+
+PRESCRIPTIVE_PATTERNS = [rule["pattern"] for rule in DEFAULT_POLICY["rule_sets"][PRESCRIPTIVE]]
+
+compliance_scanner = ComplianceScanner(
+    settings.compliance_policy_path,
+    check_interval_s=settings.compliance_reload_interval_s,
+)
 
 
 @dataclass(frozen=True)
@@ -28,7 +25,7 @@ class GuardrailResult:
 
 
 def check_non_prescriptive(text: str) -> GuardrailResult:
-    if PRESCRIPTIVE_RE.search(text):
+    if compliance_scanner.has_hit(text, (PRESCRIPTIVE,)):
         return GuardrailResult(ok=False, reasons=["Prescriptive/advice-like language detected"])
     return GuardrailResult(ok=True, reasons=[])
 
@@ -2,8 +2,7 @@ from __future__ import annotations
 
 from typing import Sequence
 
-import httpx
-
+from core.cassette import http_client
 from core.config.settings import settings
 from core.llm.types import LlmClient, LlmMessage, LlmResponse
 
@@ -12,7 +11,7 @@ class OllamaClient(LlmClient):
     def __init__(self) -> None:
         self.base_url = settings.ollama_base_url.rstrip("/")
         self.model = settings.ollama_model
-        self._http = httpx.Client(timeout=60)
+        self._http = http_client("ollama", timeout=60)
 
     def generate(self, *, messages: Sequence[LlmMessage], temperature: float = 0.0) -> LlmResponse:
         # Ollama chat endpoint
@@ -28,4 +27,5 @@ class OllamaClient(LlmClient):
         data = r.json()
         # Ollama returns: { message: { role, content }, ... }
         text = (data.get("message") or {}).get("content") or ""
-        return LlmResponse(text=text)
+        # prompt_eval_count covers only tokens not reused from the loaded prompt prefix.
+        return LlmResponse(text=text, input_tokens=data.get("prompt_eval_count") or 0)
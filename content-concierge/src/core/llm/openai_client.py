@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import hashlib
 from typing import Sequence
 
 from openai import OpenAI
 
+from core.cassette import http_client
 from core.config.settings import settings
 from core.llm.types import LlmClient, LlmMessage, LlmResponse
 
@@ -12,7 +14,7 @@ class OpenAiClient(LlmClient):
     def __init__(self) -> None:
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required when LLM_PROVIDER=openai")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = OpenAI(api_key=settings.openai_api_key, http_client=http_client("openai"))
         self.model = settings.llm_model
 
     def generate(self, *, messages: Sequence[LlmMessage], temperature: float = 0.0) -> LlmResponse:
@@ -20,6 +22,20 @@ class OpenAiClient(LlmClient):
             model=self.model,
             temperature=temperature,
             messages=[{"role": m.role, "content": m.content} for m in messages],
+            extra_body={"prompt_cache_key": _prompt_cache_key(messages)},
         )
         text = resp.choices[0].message.content or ""
-        return LlmResponse(text=text)
+        usage = resp.usage
+        prompt_tokens = (usage.prompt_tokens if usage else 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) if details else 0) or 0
+        return LlmResponse(text=text, input_tokens=prompt_tokens - cached, cached_input_tokens=cached)
+
+
+def _prompt_cache_key(messages: Sequence[LlmMessage]) -> str:
+    """
+    OpenAI caches prompt prefixes automatically; calls that share a key are
+    routed to the same cache. Keyed on the system prompt (the fixed prefix).
+    """
+    system = next((m.content for m in messages if m.role == "system"), "")
+    return "concierge:" + hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
@@ -16,6 +16,10 @@ class LlmMessage:
 @dataclass(frozen=True)
 class LlmResponse:
     text: str
+    # Prompt tokens billed at the full rate vs. read from the provider's
+    # prompt cache (0 when the provider does not report it).
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
 
 
 class LlmClient:
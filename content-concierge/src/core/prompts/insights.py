@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+# System prompts hold every fixed instruction and the output format so they
+# form an identical, cacheable prefix on each call; the user templates carry
+# only the per-user context.
+
 INSIGHT_HYPOTHESIS_SYSTEM = """You propose insight THEMES only for a wealth app content concierge.
 Do not provide advice, recommendations, or predictions.
-Return concise JSON only as specified."""
+Return concise JSON only as specified.
+
+Given the user context, propose 3-5 insight themes (no factual claims).
 
-INSIGHT_HYPOTHESIS_USER = """Given this user context, propose 3-5 insight themes (no factual claims).
-UserContext (summary):
+Output JSON:
+{
+  "themes": ["..."]
+}"""
+
+INSIGHT_HYPOTHESIS_USER = """UserContext (summary):
 - Portfolio tickers: {tickers}
 - Top holdings: {top_holdings}
 - Goal types: {goal_types}
 - Inactivity flag: {inactive}
-
-Output JSON:
-{{
-  "themes": ["..."]
-}}
 """
 
 INSIGHT_SYNTHESIS_SYSTEM = """
@@ -35,33 +40,28 @@ Allowed:
 
 Rewrite any analyst opinion into neutral, educational language.
 
-Return JSON only.
-"""
-
-
-INSIGHT_SYNTHESIS_USER = """Create 2-3 insights following this structure:
+Create 2-3 insights following this structure:
 - headline (single takeaway)
 - explanation (2-3 short sentences)
 - personal_relevance (why it matters for this user's portfolio/goals/inactivity)
 Do NOT use prescriptive language.
 
-UserContext:
-{user_context}
-
-AnalystInsights (Benzinga):
-{news_items}
-
-NewsItems:
-{news_items}
-
-Output JSON:
-{{
+Return JSON only:
+{
   "insights": [
-    {{
+    {
       "headline": "...",
       "explanation": "...",
       "personal_relevance": "..."
-    }}
+    }
   ]
-}}
+}
+"""
+
+
+INSIGHT_SYNTHESIS_USER = """UserContext:
+{user_context}
+
+AnalystInsights (Benzinga):
+{news_items}
 """
@@ -1,31 +1,42 @@
 from __future__ import annotations
 
 import httpx
-from app.core.config import settings
+
+from core.cassette import http_client
+from core.config.settings import settings
+from data.providers.symbol_cache import SymbolTTLCache
+
+# Shared by every provider instance (routes build one per request).
+_analyst_cache = SymbolTTLCache(ttl_s=settings.benzinga_cache_ttl_s)
 
 
 class BenzingaAnalystInsightsProvider:
     """
     Benzinga Analyst Insights:
     GET https://api.benzinga.com/api/v1/analyst/insights?token=...&symbols=AAPL,MSFT
+
+    Raw insights are cached per symbol, so only symbols not seen recently are
+    requested (batched) and each customer's list is rebuilt from the cache.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        http: httpx.Client | None = None,
+        cache: SymbolTTLCache | None = None,
+    ) -> None:
         if not settings.benzinga_api_key:
             raise ValueError("BENZINGA_API_KEY is required")
         self.base_url = settings.benzinga_analyst_base_url.rstrip("/")
         self.api_key = settings.benzinga_api_key
-        self.http = httpx.Client(timeout=30)
-
-    def fetch(self, symbols: list[str], page: int = 1, page_size: int = 10) -> list[dict]:
-        if not symbols:
-            return []
+        self.http = http or http_client("benzinga", timeout=30)
+        self.cache = cache or _analyst_cache
 
+    def _fetch_page(self, symbols: list[str], page: int) -> list[dict]:
         params = {
             "token": self.api_key,
-            "symbols": ",".join(sorted(set(symbols))),
+            "symbols": ",".join(symbols),
             "page": page,
-            "pageSize": page_size,
+            "pageSize": settings.benzinga_batch_page_size,
         }
         r = self.http.get(self.base_url, params=params)
         r.raise_for_status()
@@ -41,7 +52,65 @@ class BenzingaAnalystInsightsProvider:
             insights = data
         else:
             insights = []
-            
+        return insights
+
+    def _fetch_batch(self, symbols: list[str]) -> tuple[dict[str, list[dict]], set[str]]:
+        """
+        (insights per symbol, symbols whose list is known to be complete).
+
+        Pages are read until one comes back short, every symbol has
+        benzinga_items_per_symbol items, or benzinga_batch_max_pages is hit.
+        After a full last page a symbol's list may be cut off, so it is only
+        complete when it already has benzinga_items_per_symbol items.
+        """
+        per_symbol = settings.benzinga_items_per_symbol
+        grouped: dict[str, list[dict]] = {}
+        short_page = False
+        for page in range(1, max(1, settings.benzinga_batch_max_pages) + 1):
+            insights = self._fetch_page(symbols, page)
+            for it in insights:
+                sec = it.get("security") or {}
+                symbol = (sec.get("symbol") or it.get("symbol") or "").upper()
+                if symbol:
+                    grouped.setdefault(symbol, []).append(it)
+            if len(insights) < settings.benzinga_batch_page_size:
+                short_page = True
+                break
+            if all(len(grouped.get(s, ())) >= per_symbol for s in symbols):
+                break
+
+        out: dict[str, list[dict]] = {}
+        complete: set[str] = set()
+        for symbol in symbols:
+            found = grouped.get(symbol)
+            if found or short_page:
+                found = sorted(found or [], key=lambda it: str(it.get("date") or ""), reverse=True)
+                out[symbol] = found[:per_symbol]
+            if short_page or len(found or ()) >= per_symbol:
+                complete.add(symbol)
+        return out, complete
+
+    def _insights_for(self, symbols: list[str]) -> list[dict]:
+        by_symbol, missing = self.cache.get_many(symbols)
+
+        step = max(1, settings.benzinga_symbols_per_call)
+        for i in range(0, len(missing), step):
+            fetched, complete = self._fetch_batch(missing[i : i + step])
+            self.cache.set_many({s: found for s, found in fetched.items() if s in complete})
+            by_symbol.update(fetched)
+
+        merged = [it for found in by_symbol.values() for it in found]
+        merged.sort(key=lambda it: str(it.get("date") or ""), reverse=True)
+        return merged
+
+    def fetch(self, symbols: list[str], page: int = 1, page_size: int = 10) -> list[dict]:
+        if not symbols:
+            return []
+
+        insights = self._insights_for(sorted({s.upper() for s in symbols if s}))
+        start = max(0, page - 1) * page_size
+        insights = insights[start : start + page_size]
+
         if not insights:
             return []
 
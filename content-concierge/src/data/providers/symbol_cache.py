@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+class SymbolTTLCache:
+    """
+    Thread-safe per-symbol LRU with a fixed TTL.
+    Lets providers cache upstream results per ticker instead of per ticker set.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int = 4096) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, symbols: Iterable[str]) -> tuple[dict[str, Any], list[str]]:
+        """Returns (hits by symbol, missing symbols in input order)."""
+        now = time.monotonic()
+        hits: dict[str, Any] = {}
+        missing: list[str] = []
+        with self._lock:
+            for s in symbols:
+                entry = self._data.get(s)
+                if entry is None or entry[0] <= now:
+                    self._data.pop(s, None)
+                    missing.append(s)
+                    continue
+                self._data.move_to_end(s)
+                hits[s] = entry[1]
+        return hits, missing
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.ttl_s
+        with self._lock:
+            for s, v in values.items():
+                self._data[s] = (expires_at, v)
+                self._data.move_to_end(s)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
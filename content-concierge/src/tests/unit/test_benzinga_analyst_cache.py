@@ -0,0 +1,89 @@
+import httpx
+
+from core.config.settings import settings
+from data.providers.benzinga_analyst import BenzingaAnalystInsightsProvider
+from data.providers.symbol_cache import SymbolTTLCache
+
+
+def _provider(monkeypatch, calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbols"].split(",")
+        calls.append(symbols)
+        insights = [
+            {"security": {"symbol": s}, "firm": "Firm", "rating": "Neutral", "date": f"2026-01-0{i + 1}"}
+            for i, s in enumerate(symbols)
+            if s != "NONE"
+        ]
+        return httpx.Response(200, json={"analyst-insights": insights})
+
+    monkeypatch.setattr(settings, "benzinga_api_key", "test-token")
+    return BenzingaAnalystInsightsProvider(
+        http=httpx.Client(transport=httpx.MockTransport(handler)),
+        cache=SymbolTTLCache(ttl_s=60),
+    )
+
+
+def test_fetch_only_requests_missing_symbols(monkeypatch):
+    calls = []
+    provider = _provider(monkeypatch, calls)
+
+    first = provider.fetch(["msft", "AAPL", "NONE"])
+    second = provider.fetch(["AAPL", "MSFT", "NONE", "VOO"])
+
+    assert calls == [["AAPL", "MSFT", "NONE"], ["VOO"]]
+    assert {i["symbol"] for i in first} == {"AAPL", "MSFT"}
+    assert {i["symbol"] for i in second} == {"AAPL", "MSFT", "VOO"}
+
+
+def test_fetch_batches_misses(monkeypatch):
+    calls = []
+    provider = _provider(monkeypatch, calls)
+    monkeypatch.setattr(settings, "benzinga_symbols_per_call", 2)
+
+    out = provider.fetch(["A", "B", "C"], page_size=10)
+
+    assert calls == [["A", "B"], ["C"]]
+    assert out[0]["symbol"] == "B"  # newest first across batches
+    assert {i["symbol"] for i in out} == {"A", "B", "C"}
+
+
+def test_symbols_cut_off_by_a_full_page_are_not_cached(monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        calls.append(page)
+        # AAA has plenty of insights and fills every page; BBB's single item
+        # would only arrive on a later page.
+        insights = [
+            {"security": {"symbol": "AAA"}, "date": f"2026-01-{page:02d}T00:00:{i:02d}"} for i in range(2)
+        ]
+        return httpx.Response(200, json={"analyst-insights": insights})
+
+    monkeypatch.setattr(settings, "benzinga_api_key", "test-token")
+    monkeypatch.setattr(settings, "benzinga_batch_page_size", 2)
+    monkeypatch.setattr(settings, "benzinga_batch_max_pages", 2)
+    monkeypatch.setattr(settings, "benzinga_items_per_symbol", 3)
+    cache = SymbolTTLCache(ttl_s=60)
+    provider = BenzingaAnalystInsightsProvider(
+        http=httpx.Client(transport=httpx.MockTransport(handler)),
+        cache=cache,
+    )
+
+    out = provider.fetch(["AAA", "BBB"])
+
+    assert calls == [1, 2]
+    assert [i["symbol"] for i in out] == ["AAA"] * 3
+    cached, missing = cache.get_many(["AAA", "BBB"])
+    assert set(cached) == {"AAA"}  # has benzinga_items_per_symbol items
+    assert missing == ["BBB"]  # may have been cut off; asked again next time
+
+
+def test_short_page_caches_every_symbol(monkeypatch):
+    calls = []
+    provider = _provider(monkeypatch, calls)
+
+    provider.fetch(["AAPL", "NONE"])
+    provider.fetch(["AAPL", "NONE"])
+
+    assert calls == [["AAPL", "NONE"]]
@@ -0,0 +1,55 @@
+import json
+
+import httpx
+from openai import OpenAI
+
+from core.llm.openai_client import OpenAiClient
+from core.llm.types import LlmMessage
+from core.prompts.insights import INSIGHT_SYNTHESIS_SYSTEM, INSIGHT_SYNTHESIS_USER
+
+
+def _client(bodies):
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            json={
+                "id": "x",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}
+                ],
+                "usage": {
+                    "prompt_tokens": 1200,
+                    "completion_tokens": 5,
+                    "total_tokens": 1205,
+                    "prompt_tokens_details": {"cached_tokens": 1024},
+                },
+            },
+        )
+
+    client = OpenAiClient.__new__(OpenAiClient)
+    client.client = OpenAI(api_key="test", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    client.model = "gpt-4o-mini"
+    return client
+
+
+def test_openai_reports_cached_tokens_and_keys_on_system_prefix():
+    bodies = []
+    llm = _client(bodies)
+
+    resp = None
+    for user_context in ("a", "b"):
+        resp = llm.generate(
+            messages=[
+                LlmMessage(role="system", content=INSIGHT_SYNTHESIS_SYSTEM),
+                LlmMessage(role="user", content=INSIGHT_SYNTHESIS_USER.format(user_context=user_context, news_items=[])),
+            ]
+        )
+
+    assert (resp.input_tokens, resp.cached_input_tokens) == (176, 1024)
+    assert bodies[0]["prompt_cache_key"] == bodies[1]["prompt_cache_key"]
+    assert bodies[0]["messages"][0] == bodies[1]["messages"][0]
+    assert "Output JSON" not in bodies[0]["messages"][1]["content"]
@@ -2,16 +2,23 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Body, UploadFile, File
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import io
 import csv
-from datetime import datetime
-from typing import List
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import uuid
 
 from app.engine.generator import generate_insights
 from app.api.schemas import GenerateInsightsRequest, GenerateInsightsResponse, ErrorResponse
 from app.api.schemas import InsightType
+from cc_common.ticker_catalog import CatalogSnapshot, TickerCatalog, TickerEntry
 from pathlib import Path
 
 router = APIRouter(prefix="/v1/insights", tags=["insights"])
@@ -33,6 +40,83 @@ def generate(req: GenerateInsightsRequest) -> GenerateInsightsResponse:
 
 
 
+STATIC_TICKERS_FILE = Path("app/data/static_top_tickers.txt")
+DORMANT_AFTER_DAYS = 180
+
+# Streaming bulk-generate: rows processed at once / rows read ahead of results
+BULK_MAX_WORKERS = 8
+BULK_MAX_PENDING = 256
+
+
+def _parse_row(r: Any) -> Tuple[str, float, Optional[datetime]]:
+    """(customer_id, balance, last activity) from a CSV/XLSX row dict."""
+    # normalize column access (lowercase keys)
+    row = {str(k).strip().lower(): v for k, v in (r.items() if isinstance(r, dict) else []) if k is not None}
+    try:
+        balance = float(row.get('current_balance') or row.get('balance') or 0)
+    except Exception:
+        balance = 0
+
+    last_activity = row.get('last_activity_date') or row.get('last_activity') or row.get('last_login_at')
+    last_dt = None
+    if isinstance(last_activity, datetime):
+        last_dt = last_activity
+    elif last_activity:
+        try:
+            last_dt = datetime.fromisoformat(str(last_activity))
+        except Exception:
+            try:
+                last_dt = datetime.strptime(str(last_activity), "%Y-%m-%d")
+            except Exception:
+                last_dt = None
+    if last_dt is not None and last_dt.tzinfo is not None:
+        # compared against naive utcnow() below
+        last_dt = last_dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return str(row.get('customer_id') or 'unknown'), balance, last_dt
+
+
+def _is_dormant(balance: float, last_dt: Optional[datetime]) -> bool:
+    # zero balance and inactive >180 days
+    return balance == 0 and last_dt is not None and (datetime.utcnow() - last_dt).days > DORMANT_AFTER_DAYS
+
+
+def _inactive_months(last_dt: Optional[datetime]) -> Optional[int]:
+    return max(1, (datetime.utcnow() - last_dt).days // 30) if last_dt else None
+
+
+def _render_suggestion(top_n: Tuple[TickerEntry, ...], months: Optional[int]) -> str:
+    """Top-3 suggestion text for a dormant account inactive for `months`."""
+    # Build human-friendly recommendation header including inactivity length
+    if months:
+        month_label = "months" if months > 1 else "month"
+        header = (
+            f"We noticed you haven't been active for about {months} {month_label}. "
+            "Here are three stocks that have been performing well recently to help you get back into the flow.\n"
+        )
+    else:
+        header = (
+            "Welcome back — here are three stocks that have been performing well recently to help you get back into the flow.\n"
+        )
+
+    # Short, conversational ticker lines
+    ticker_lines = []
+    for e in top_n:
+        pct_part = f" {e.change}" if e.change else ""
+        # Example: AAPL (Apple Inc.) — strong recent momentum (+3.5%)
+        ticker_lines.append(f"{e.symbol} ({e.name}) — {e.note}{pct_part}")
+
+    # Add a brief CTA per user's request (no informational disclaimer)
+    footer = "\nIf you'd like, we can add these to a watchlist or send a short market note. If you need any help from our end, we can help you engage them. That can help you to reach your goals."
+
+    return header + "\n".join(ticker_lines) + footer
+
+
+# Parsed once, re-read on change; suggestions are pre-rendered per month bucket.
+static_tickers: TickerCatalog[str] = TickerCatalog(str(STATIC_TICKERS_FILE), _render_suggestion)
+
+
+
 
 @router.post(
     "/bulk-generate",
@@ -73,89 +157,161 @@ def bulk_generate(file: UploadFile = File(...)) -> PlainTextResponse:
         raise HTTPException(status_code=400, detail={"error": "unsupported_file", "details": "Provide CSV or XLSX file."})
 
     lines: List[str] = []
-    now_iso = datetime.utcnow().isoformat() + "Z"
+    catalog = static_tickers.snapshot
 
     for r in rows:
-        # normalize column access (lowercase keys)
-        row = {k.strip().lower(): v for k, v in (r.items() if isinstance(r, dict) else [])}
+        cid, balance, last_dt = _parse_row(r)
+        if not _is_dormant(balance, last_dt):
+            continue
         try:
-            balance = float(row.get('current_balance') or row.get('balance') or 0)
+            block = catalog.suggestion(_inactive_months(last_dt))
+            if not catalog.available:
+                lines.append(f"{cid}: (no static list available)")
+            elif block is None:
+                lines.append(f"{cid}: (no candidates)")
+            else:
+                lines.append(f"{cid}: {block}")
         except Exception:
-            balance = 0
+            lines.append(f"{cid}: (error generating suggestion)")
+
+    if not lines:
+        return PlainTextResponse(content="No matching rows found or no suggestions generated.")
+    return PlainTextResponse(content="\n\n".join(lines))
+
 
-        last_activity = row.get('last_activity_date') or row.get('last_activity') or row.get('last_login_at')
-        last_dt = None
-        if last_activity:
-            try:
-                last_dt = datetime.fromisoformat(str(last_activity))
-            except Exception:
-                try:
-                    last_dt = datetime.strptime(str(last_activity), "%Y-%m-%d")
-                except Exception:
-                    last_dt = None
-
-        # check criteria: zero balance and inactive >180 days
-        inactive = False
-        if last_dt:
-            inactive = (datetime.utcnow() - last_dt).days > 180
-
-        if balance == 0 and inactive:
-            # Use a static curated tickers file to produce top-3 suggestions per matching row.
-            try:
-                static_file = Path("app/data/static_top_tickers.txt")
-                cid = row.get('customer_id') or 'unknown'
-                if not static_file.exists():
-                    lines.append(f"{cid}: (no static list available)")
-                    continue
 
-                with static_file.open("r", encoding="utf-8") as fh:
-                    entries = []
-                    for line in fh:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        parts = [p.strip() for p in line.split("|")]
-                        symbol = parts[0].upper()
-                        name = parts[1] if len(parts) > 1 and parts[1] else symbol
-                        pct = parts[2] if len(parts) > 2 else ""
-                        note = parts[3] if len(parts) > 3 else "strong recent momentum"
-                        entries.append({"symbol": symbol, "name": name, "pct": pct, "note": note})
-
-                top_n = entries[:3]
-                if not top_n:
-                    lines.append(f"{cid}: (no candidates)")
+def _spool_upload(file: UploadFile) -> str:
+    """Copies the upload to a temp file we own, in chunks, so it outlives the handler."""
+    suffix = Path(file.filename or "upload").suffix.lower()
+    fd, path = tempfile.mkstemp(prefix="bulk_", suffix=suffix)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(file.file, out, length=1024 * 1024)
+    return path
+
+
+def _iter_upload_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Rows as dicts, read incrementally (csv reader / openpyxl read-only)."""
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as fh:
+            yield from csv.DictReader(fh)
+        return
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, None) or ()
+        for row in rows:
+            yield {h: v for h, v in zip(headers, row)}
+    finally:
+        wb.close()
+
+
+def _bulk_row_result(n: int, r: Dict[str, Any], catalog: CatalogSnapshot[str]) -> Optional[Dict[str, Any]]:
+    try:
+        cid, balance, last_dt = _parse_row(r)
+        if not _is_dormant(balance, last_dt):
+            return None
+    except Exception as e:
+        # One bad row is reported, not allowed to end the stream.
+        return {"row": n, "status": "invalid_row", "details": f"{type(e).__name__}: {e}"}
+    record: Dict[str, Any] = {"row": n, "customer_id": cid}
+    try:
+        block = catalog.suggestion(_inactive_months(last_dt))
+        if not catalog.available:
+            record.update(status="no_static_list")
+        elif block is None:
+            record.update(status="no_candidates")
+        else:
+            record.update(status="ok", suggestion=block)
+    except Exception as e:
+        record.update(status="error", details=str(e))
+    return record
+
+
+@router.post(
+    "/bulk-generate/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"model": ErrorResponse},
+        415: {"model": ErrorResponse},
+    },
+)
+def bulk_generate_stream(file: UploadFile = File(...)) -> StreamingResponse:
+    """Streaming `/bulk-generate` for large uploads: same matching rules, NDJSON output.
+
+    The upload is spooled to disk and parsed row by row; matching rows are
+    processed on a bounded worker pool and each result is written as one JSON
+    line as soon as it finishes (so output order can differ from file order;
+    `row` is the 1-based data row). A row that cannot be read is reported as
+    `{"row", "status": "invalid_row", "details"}` and counted in `errors`.
+    The last line is `{"summary": {rows, matched, ok, errors, elapsed_s}}`.
+
+    Legacy `.xls` workbooks are rejected with 415: they are read with
+    openpyxl, which only handles `.xlsx`. Save them as `.xlsx` or CSV.
+    """
+    fname = (file.filename or "upload").lower()
+    if fname.endswith(".xls"):
+        raise HTTPException(status_code=415, detail={
+            "error": "xls_not_supported",
+            "details": "Legacy .xls workbooks cannot be read; save the file as .xlsx or CSV and upload again.",
+        })
+    if not fname.endswith((".csv", ".xlsx")):
+        raise HTTPException(status_code=400, detail={"error": "unsupported_file", "details": "Provide CSV or XLSX file."})
+    if fname.endswith(".xlsx"):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as e:
+            raise HTTPException(status_code=400, detail={
+                "error": "xlsx_not_supported",
+                "details": "XLSX requires openpyxl installed on the server or upload CSV instead. " + str(e),
+            })
+
+    path = _spool_upload(file)
+    catalog = static_tickers.snapshot
+
+    def _body() -> Iterator[str]:
+        start = time.perf_counter()
+        summary = {"rows": 0, "matched": 0, "ok": 0, "errors": 0}
+        pending = set()
+
+        def _drain(return_when: str) -> Iterator[str]:
+            done, _ = wait(pending, return_when=return_when)
+            for fut in done:
+                pending.discard(fut)
+                record = fut.result()
+                if record is None:
                     continue
+                if record["status"] != "invalid_row":
+                    summary["matched"] += 1
+                summary["ok" if record["status"] == "ok" else "errors"] += 1
+                yield json.dumps(record, ensure_ascii=False) + "\n"
 
-                # Build human-friendly recommendation header including inactivity length
-                if last_dt:
-                    months = max(1, (datetime.utcnow() - last_dt).days // 30)
-                    month_label = "months" if months > 1 else "month"
-                    header = (
-                        f"We noticed you haven't been active for about {months} {month_label}. "
-                        "Here are three stocks that have been performing well recently to help you get back into the flow.\n"
-                    )
-                else:
-                    header = (
-                        "Welcome back — here are three stocks that have been performing well recently to help you get back into the flow.\n"
-                    )
-
-                # Short, conversational ticker lines
-                ticker_lines = []
-                for e in top_n:
-                    pct_part = f" {e['pct']}" if e['pct'] else ""
-                    # Example: AAPL (Apple Inc.) — strong recent momentum (+3.5%)
-                    ticker_lines.append(f"{e['symbol']} ({e['name']}) — {e['note']}{pct_part}")
-
-                # Add a brief CTA per user's request (no informational disclaimer)
-                footer = "\nIf you'd like, we can add these to a watchlist or send a short market note. If you need any help from our end, we can help you engage them. That can help you to reach your goals."
-
-                block = header + "\n".join(ticker_lines) + footer
-                lines.append(f"{cid}: {block}")
-            except Exception:
-                lines.append(f"{row.get('customer_id') or 'unknown'}: (error generating suggestion)")
-                continue
+        pool = ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS, thread_name_prefix="bulk")
+        try:
+            for n, r in enumerate(_iter_upload_rows(path), start=1):
+                summary["rows"] = n
+                pending.add(pool.submit(_bulk_row_result, n, r, catalog))
+                if len(pending) >= BULK_MAX_PENDING:
+                    yield from _drain(FIRST_COMPLETED)
+            if pending:
+                yield from _drain(ALL_COMPLETED)
+        except Exception as e:
+            summary["failed"] = f"{type(e).__name__}: {e}"
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
 
-    if not lines:
-        return PlainTextResponse(content="No matching rows found or no suggestions generated.")
-    return PlainTextResponse(content="\n\n".join(lines))
+        summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+        yield json.dumps({"summary": summary}) + "\n"
 
+    return StreamingResponse(
+        _body(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )